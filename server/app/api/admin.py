@@ -0,0 +1,87 @@
+"""
+Administrative endpoints for operating live workers.
+
+Each request is served by a single worker process, so a profile covers only
+the worker that received it.
+"""
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.auth import require_admin
+from app.core.config import settings
+from app.core.profiling import ProfilerBusyError, StackSampler, get_profiler
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _profile_response(sampler: StackSampler) -> PlainTextResponse:
+    """Collapsed stacks as a downloadable file."""
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{get_profiler().filename()}"',
+            "X-Profile-Samples": str(sampler.samples),
+        }
+    )
+
+
+def _ensure_enabled() -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Profiling is disabled (PROFILING_ENABLED=false)"
+        )
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, description="Profile duration in seconds"),
+    _admin: dict = Depends(require_admin)
+) -> PlainTextResponse:
+    """
+    Sample-profile this worker for a fixed duration.
+
+    Returns a flamegraph-compatible collapsed-stack file
+    (`thread;module:function;... count` per line).
+    """
+    _ensure_enabled()
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Profile duration cannot exceed {settings.PROFILING_MAX_SECONDS} seconds"
+        )
+
+    try:
+        sampler = await get_profiler().profile_for(seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    return _profile_response(sampler)
+
+
+@router.post("/profile/requests", response_class=PlainTextResponse)
+async def profile_requests(
+    path: str = Query(..., description="Request path to profile, e.g. /api/v1/chat"),
+    count: int = Query(10, ge=1, le=1000, description="Number of requests to profile"),
+    timeout: float = Query(60.0, gt=0, description="Longest time to wait for the requests, in seconds"),
+    _admin: dict = Depends(require_admin)
+) -> PlainTextResponse:
+    """
+    Sample-profile this worker while the next `count` requests to `path` are in flight.
+
+    Responds once the requests have completed or the timeout expires,
+    with a flamegraph-compatible collapsed-stack file.
+    """
+    _ensure_enabled()
+    if timeout > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Timeout cannot exceed {settings.PROFILING_MAX_SECONDS} seconds"
+        )
+
+    try:
+        sampler = await get_profiler().profile_requests(path, count, timeout)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    return _profile_response(sampler)
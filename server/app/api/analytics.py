@@ -1,12 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
 from enum import Enum
-import uuid
 
-from app.db.database import get_db
-from app.core.auth import require_auth
-from app.models.user import User
+from app.db.async_database import get_async_db
+from app.core.auth import require_principal
+from app.core.principal import Principal
+from app.core.health import get_health_checker
+from app.services.analytics_snapshot import AnalyticsSnapshotLoader, get_analytics_snapshot_cache
 from app.services.logging_service import LoggingService
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
@@ -19,16 +20,23 @@ class TimeRange(str, Enum):
     quarter = "quarter"
 
 
-def get_logging_service(db: Session = Depends(get_db)) -> LoggingService:
+def get_logging_service(db: AsyncSession = Depends(get_async_db)) -> LoggingService:
     """Dependency to get LoggingService instance."""
     return LoggingService(db)
 
 
+def get_snapshot_loader(
+    logging_service: LoggingService = Depends(get_logging_service)
+) -> AnalyticsSnapshotLoader:
+    """Dependency to get the request's AnalyticsSnapshotLoader (stats computed once per request)."""
+    return AnalyticsSnapshotLoader(logging_service, get_analytics_snapshot_cache())
+
+
 @router.get("/stats")
 async def get_emotion_stats(
     time_range: TimeRange = Query(TimeRange.month, description="Time range for statistics"),
-    current_user: User = Depends(require_auth),
-    logging_service: LoggingService = Depends(get_logging_service)
+    current_user: Principal = Depends(require_principal),
+    snapshots: AnalyticsSnapshotLoader = Depends(get_snapshot_loader)
 ) -> Dict[str, Any]:
     """
     Get emotion statistics and trends for analytics dashboard.
@@ -52,12 +60,9 @@ async def get_emotion_stats(
     """
     try:
         # Get emotion statistics
-        stats = await logging_service.get_emotion_stats(
-            user_id=current_user.id,
-            time_range=time_range.value
-        )
+        snapshot = await snapshots.get(current_user.id, time_range.value)
         
-        return stats
+        return snapshot.stats
         
     except Exception as e:
         raise HTTPException(
@@ -69,8 +74,8 @@ async def get_emotion_stats(
 @router.get("/patterns")
 async def get_emotion_patterns(
     time_range: TimeRange = Query(TimeRange.month, description="Time range for pattern analysis"),
-    current_user: User = Depends(require_auth),
-    logging_service: LoggingService = Depends(get_logging_service)
+    current_user: Principal = Depends(require_principal),
+    snapshots: AnalyticsSnapshotLoader = Depends(get_snapshot_loader)
 ) -> List[Dict[str, Any]]:
     """
     Identify emotional patterns and provide insights.
@@ -95,12 +100,9 @@ async def get_emotion_patterns(
     """
     try:
         # Identify patterns
-        patterns = await logging_service.identify_patterns(
-            user_id=current_user.id,
-            time_range=time_range.value
-        )
+        snapshot = await snapshots.get(current_user.id, time_range.value)
         
-        return patterns
+        return snapshot.patterns
         
     except Exception as e:
         raise HTTPException(
@@ -112,8 +114,8 @@ async def get_emotion_patterns(
 @router.get("/summary")
 async def get_analytics_summary(
     time_range: TimeRange = Query(TimeRange.month, description="Time range for summary"),
-    current_user: User = Depends(require_auth),
-    logging_service: LoggingService = Depends(get_logging_service)
+    current_user: Principal = Depends(require_principal),
+    snapshots: AnalyticsSnapshotLoader = Depends(get_snapshot_loader)
 ) -> Dict[str, Any]:
     """
     Get a comprehensive analytics summary combining stats and patterns.
@@ -131,16 +133,10 @@ async def get_analytics_summary(
     - metadata: Analysis metadata (date ranges, totals, etc.)
     """
     try:
-        # Get both stats and patterns
-        stats = await logging_service.get_emotion_stats(
-            user_id=current_user.id,
-            time_range=time_range.value
-        )
-        
-        patterns = await logging_service.identify_patterns(
-            user_id=current_user.id,
-            time_range=time_range.value
-        )
+        # Get both stats and patterns (patterns are derived from the same stats)
+        snapshot = await snapshots.get(current_user.id, time_range.value)
+        stats = snapshot.stats
+        patterns = snapshot.patterns
         
         # Generate high-level insights
         insights = _generate_insights(stats, patterns)
@@ -169,8 +165,8 @@ async def get_analytics_summary(
 async def get_top_emotions(
     time_range: TimeRange = Query(TimeRange.month, description="Time range for analysis"),
     limit: int = Query(5, ge=1, le=10, description="Number of top emotions to return"),
-    current_user: User = Depends(require_auth),
-    logging_service: LoggingService = Depends(get_logging_service)
+    current_user: Principal = Depends(require_principal),
+    snapshots: AnalyticsSnapshotLoader = Depends(get_snapshot_loader)
 ) -> List[Dict[str, Any]]:
     """
     Get the top emotions by frequency for the user.
@@ -188,42 +184,10 @@ async def get_top_emotions(
     """
     try:
         # Get emotion statistics
-        stats = await logging_service.get_emotion_stats(
-            user_id=current_user.id,
-            time_range=time_range.value
-        )
-        
-        emotion_counts = stats.get("emotion_counts", {})
-        total_interactions = stats.get("total_interactions", 0)
-        
-        if total_interactions == 0:
-            return []
-        
-        # Sort emotions by count and take top N
-        sorted_emotions = sorted(
-            emotion_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:limit]
-        
-        # Add emoji and color information
-        from app.services.emotion_detection import EmotionDetectionService
-        emotion_service = EmotionDetectionService()
+        snapshot = await snapshots.get(current_user.id, time_range.value)
         
-        top_emotions = []
-        for emotion, count in sorted_emotions:
-            emotion_info = emotion_service.emotion_emoji_map.get(emotion, {
-                "emoji": "😐",
-                "color": "#F3F4F6"
-            })
-            
-            top_emotions.append({
-                "emotion": emotion,
-                "count": count,
-                "percentage": round((count / total_interactions) * 100, 1),
-                "emoji": emotion_info["emoji"],
-                "color": emotion_info["color"]
-            })
+        # Sorted by count, with emoji and color information
+        top_emotions = snapshot.top_emotions(limit)
         
         return top_emotions
         
@@ -235,31 +199,22 @@ async def get_top_emotions(
 
 
 @router.get("/health")
-async def analytics_service_health(
-    logging_service: LoggingService = Depends(get_logging_service)
-) -> dict:
+async def analytics_service_health() -> dict:
     """
     Health check endpoint for the analytics service.
     
-    Returns the status of the analytics service and its dependencies.
+    Returns the cached database status and snapshot cache counters.
     """
-    try:
-        # Test by getting stats for a dummy user (this tests the service logic)
-        dummy_user_id = uuid.uuid4()
-        stats = await logging_service.get_emotion_stats(dummy_user_id, "week")
-        
-        return {
-            "status": "healthy",
-            "database_connected": True,
-            "analytics_functional": True,
-            "message": "Analytics service is operational"
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "message": "Analytics service is not operational"
-        }
+    database_status = get_health_checker().component("database")
+    connected = database_status["status"] == "healthy"
+    snapshot_cache = get_analytics_snapshot_cache()
+    
+    return {
+        "status": "healthy" if connected else "unhealthy",
+        "database_connected": connected,
+        "snapshot_cache": snapshot_cache.stats() if snapshot_cache is not None else None,
+        "message": f"Analytics service is {'operational' if connected else 'not operational'}"
+    }
 
 
 def _generate_insights(stats: Dict[str, Any], patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
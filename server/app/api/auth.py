@@ -2,15 +2,18 @@
 Authentication endpoints for user management.
 """
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
-from app.db.database import get_db
+from app.db.async_database import get_async_db
 from app.core.auth import require_auth, optional_auth
+from app.core.firebase import firebase_service
+from app.core.principal import get_principal_cache
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
+from app.services.activity_tracker import get_activity_tracker
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -54,7 +57,8 @@ async def get_current_user_profile(
         email=current_user.email,
         display_name=current_user.display_name,
         created_at=current_user.created_at,
-        last_active=current_user.last_active,
+        # Include activity not yet flushed to the database
+        last_active=get_activity_tracker().last_seen(current_user.id) or current_user.last_active,
         preferences=current_user.preferences or {}
     )
 
@@ -63,7 +67,7 @@ async def get_current_user_profile(
 async def update_user_profile(
     request: UpdateProfileRequest,
     current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserProfileResponse:
     """
     Update current user's profile information.
@@ -90,8 +94,11 @@ async def update_user_profile(
         # Update last active timestamp
         current_user.last_active = datetime.utcnow()
         
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        await db.refresh(current_user)
+        
+        # Cached principals carry the display name
+        get_principal_cache().invalidate(current_user.firebase_uid)
         
         return UserProfileResponse(
             id=str(current_user.id),
@@ -104,7 +111,7 @@ async def update_user_profile(
         )
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update profile: {str(e)}"
@@ -114,7 +121,7 @@ async def update_user_profile(
 @router.delete("/me")
 async def delete_user_account(
     current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     """
     Delete current user's account and all associated data.
@@ -131,8 +138,12 @@ async def delete_user_account(
     """
     try:
         # Delete user (cascade will handle related data)
-        db.delete(current_user)
-        db.commit()
+        await db.delete(current_user)
+        await db.commit()
+        
+        # Cached tokens and identity of the deleted account must not authenticate again
+        firebase_service.invalidate_user(current_user.firebase_uid)
+        get_principal_cache().invalidate(current_user.firebase_uid)
         
         return {
             "message": "Account successfully deleted",
@@ -141,7 +152,7 @@ async def delete_user_account(
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete account: {str(e)}"
@@ -189,12 +200,13 @@ async def auth_service_health() -> dict:
     Returns the status of Firebase authentication service.
     """
     try:
-        from app.core.firebase import firebase_service
-        
         if firebase_service.is_initialized():
             return {
                 "status": "healthy",
                 "firebase_initialized": True,
+                **firebase_service.cache_stats(),
+                "activity_tracker": get_activity_tracker().stats(),
+                "principal_cache": get_principal_cache().stats(),
                 "message": "Authentication service is operational"
             }
         else:
@@ -1,21 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.core.auth import require_auth, optional_auth
-from app.models.user import User
+from fastapi import APIRouter, HTTPException, Depends, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_database import get_async_db, AsyncSessionLocal
+from app.core.admission import AdmissionRejected, admit_request, get_admission_controller
+from app.core.auth import optional_principal
+from app.core.principal import Principal
+from app.core.config import settings
+from app.core import degradation
+from app.core.degradation import get_degradation_controller
+from app.core.health import get_health_checker
+from app.core.metrics import span
+from app.core.timing import StageTimer
 from app.services.emotion_detection import get_emotion_service, EmotionDetectionService
-from app.services.vector_search import VectorSearchService
+from app.services.vector_search import VectorSearchService, get_vector_search_service
 from app.services.reflection_generation import get_reflection_service, ReflectionGenerationService
 from app.services.conversation_manager import ConversationManager
-from app.services.logging_service import LoggingService
 from app.services.intent_classification import get_intent_service, IntentClassificationService
 from app.services.casual_chat import get_casual_chat_service, CasualChatService
+from app.services.llm_client import LLMUnavailableError
+from app.services.persistence_queue import get_persistence_queue, TurnRecord
+from app.services.response_cache import get_casual_response_cache
 from app.schemas.emotion import EmotionData
 from app.schemas.verse import VerseSearchResult
 from app.schemas.reflection import ConversationMessage
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 import uuid
+import json
 import logging
 from datetime import datetime
 
@@ -23,13 +35,15 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+VALID_MODES = ["socratic", "wisdom", "story"]
+
 
 class ChatRequest(BaseModel):
     """Request model for the main chat endpoint."""
     user_input: str = Field(..., min_length=1, max_length=5000, description="User's message")
     session_id: Optional[uuid.UUID] = Field(None, description="Conversation session ID (optional for new sessions)")
     interaction_mode: str = Field("wisdom", description="Interaction mode: 'socratic', 'wisdom', or 'story'")
-    
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -50,7 +64,12 @@ class ChatResponse(BaseModel):
     intent: str = Field(..., description="Classified intent: casual_chat, emotional_query, or spiritual_guidance")
     intent_confidence: float = Field(..., description="Confidence score for intent classification")
     fallback_used: bool = Field(False, description="Whether any fallback mechanisms were used")
-    
+    degradation_level: int = Field(
+        0,
+        description="Degradation level that served the request: 0 normal, 1 heuristic intent, "
+                    "2 cached retrieval, 3 template reflection"
+    )
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -73,76 +92,386 @@ class ChatResponse(BaseModel):
                 ],
                 "session_id": "550e8400-e29b-41d4-a716-446655440001",
                 "interaction_mode": "wisdom",
-                "fallback_used": False
+                "fallback_used": False,
+                "degradation_level": 0
             }
         }
 
 
-# Global service instances (will be initialized on first use)
-_vector_service: Optional[VectorSearchService] = None
+class ChatTurn:
+    """
+    State of a single chat exchange as it moves through the pipeline.
+
+    Shared by the blocking /chat endpoint and the /chat/stream SSE endpoint so
+    both run the same intent, emotion, search, context and persistence steps.
+    """
+
+    def __init__(self, request: ChatRequest, current_user: Optional[Principal], degradation_level: int = 0):
+        self.request = request
+        self.current_user = current_user
+        self.degradation_level = degradation_level
+        self.intent = "casual_chat"
+        self.intent_confidence = 0.5
+        self.emotion: Optional[EmotionData] = None
+        self.verses: List[VerseSearchResult] = []
+        self.session_id: Optional[uuid.UUID] = None
+        self.conversation_history: List[ConversationMessage] = []
+        self.conversation_summary: Optional[str] = None
+        self.fallback_used = False
+
+    def emotion_dict(self) -> Dict[str, Any]:
+        """Emotion data for the generation services (neutral when none was detected)."""
+        return self.emotion.model_dump() if self.emotion else {"label": "neutral", "confidence": 0.5}
+
+    def verse_dicts(self) -> List[Dict[str, Any]]:
+        return [verse.model_dump() for verse in self.verses]
+
+    def history_dicts(self) -> List[Dict[str, Any]]:
+        return [msg.model_dump() for msg in self.conversation_history]
 
 
 def get_vector_service() -> VectorSearchService:
-    """Dependency to get or create VectorSearchService instance."""
-    global _vector_service
-    if _vector_service is None:
-        try:
-            _vector_service = VectorSearchService()
-            # Initialize database if CSV file exists
-            try:
-                _vector_service.initialize_database("Bhagwad_Gita.csv")
-            except Exception as e:
-                logger.warning(f"Could not initialize database from CSV: {e}")
-        except Exception as e:
-            logger.error(f"Failed to initialize VectorSearchService: {e}")
-            raise HTTPException(status_code=500, detail="Vector search service unavailable")
-    
-    return _vector_service
+    """Dependency to get the shared VectorSearchService instance."""
+    try:
+        return get_vector_search_service()
+    except Exception as e:
+        logger.error(f"Failed to initialize VectorSearchService: {e}")
+        raise HTTPException(status_code=500, detail="Vector search service unavailable")
 
 
-def get_conversation_manager(db: Session = Depends(get_db)) -> ConversationManager:
+def get_conversation_manager(db: AsyncSession = Depends(get_async_db)) -> ConversationManager:
     """Dependency to get conversation manager."""
     return ConversationManager(db)
 
 
-def get_logging_service(db: Session = Depends(get_db)) -> LoggingService:
-    """Dependency to get logging service."""
-    return LoggingService(db)
+def _validate_interaction_mode(interaction_mode: str) -> None:
+    """Raise a 400 for unknown interaction modes."""
+    if interaction_mode not in VALID_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid interaction mode '{interaction_mode}'. Must be one of: {VALID_MODES}"
+        )
+
+
+async def _classify_intent(turn: ChatTurn, intent_service: IntentClassificationService) -> None:
+    """Step 0: Classify intent to determine routing."""
+    if turn.degradation_level >= degradation.HEURISTIC_INTENT:
+        turn.intent, turn.intent_confidence = intent_service.classify_intent_fast(turn.request.user_input)
+        logger.info(f"Classified intent by heuristics (degraded): {turn.intent}")
+        return
+    try:
+        async with get_admission_controller().model_slot("intent"):
+            turn.intent, turn.intent_confidence = await run_in_threadpool(
+                intent_service.classify_intent, turn.request.user_input
+            )
+        logger.info(f"Classified intent: {turn.intent} (confidence: {turn.intent_confidence})")
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        logger.warning(f"Intent classification failed, defaulting to casual_chat: {e}")
+        turn.intent = "casual_chat"
+        turn.intent_confidence = 0.5
+
+
+async def _detect_emotion(turn: ChatTurn, emotion_service: EmotionDetectionService) -> None:
+    """Step 1: Detect emotions (only called for emotional_query intent)."""
+    try:
+        async with get_admission_controller().model_slot("emotion"):
+            emotions_data = await run_in_threadpool(
+                emotion_service.detect_emotion,
+                text=turn.request.user_input,
+                threshold=0.3
+            )
+        dominant_emotion_data = emotion_service.get_dominant_emotion(emotions_data)
+        turn.emotion = EmotionData(**dominant_emotion_data)
+        logger.info(f"Detected emotion: {turn.emotion.label} (confidence: {turn.emotion.confidence})")
+
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        logger.warning(f"Emotion detection failed, using neutral fallback: {e}")
+        turn.fallback_used = True
+        turn.emotion = EmotionData(
+            label="neutral",
+            confidence=0.5,
+            emoji="😐",
+            color="#F3F4F6"
+        )
+
+
+async def _search_verses(turn: ChatTurn, vector_service: VectorSearchService) -> None:
+    """Step 2: Search for relevant verses (skipped for casual_chat)."""
+    try:
+        # For emotional queries, include emotion in search
+        # For spiritual guidance, search by query only
+        search_emotion = turn.emotion.label if turn.intent == "emotional_query" and turn.emotion else None
+
+        if turn.degradation_level >= degradation.CACHED_RETRIEVAL:
+            # Degraded: reuse recent results instead of encoding the query
+            verses_data = vector_service.cached_search(
+                query=turn.request.user_input,
+                emotion=search_emotion,
+                top_k=3
+            )
+        else:
+            async with get_admission_controller().model_slot("embedding"):
+                verses_data = await run_in_threadpool(
+                    vector_service.search_verses,
+                    query=turn.request.user_input,
+                    emotion=search_emotion,
+                    top_k=3
+                )
+        turn.verses = [VerseSearchResult(**verse) for verse in verses_data]
+        logger.info(f"Found {len(turn.verses)} relevant verses")
+
+        if not turn.verses:
+            raise Exception("No verses found")
+
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        logger.warning(f"Verse search failed, using fallback verse: {e}")
+        turn.fallback_used = True
+        # Fallback to a default verse (BG2.47 - famous karma yoga verse)
+        turn.verses = [VerseSearchResult(
+            id="BG2.47",
+            chapter=2,
+            verse=47,
+            shloka="कर्मण्येवाधिकारस्ते मा फलेषु कदाचन। मा कर्मफलहेतुर्भूर्मा ते सङ्गोऽस्त्वकर्मणि॥",
+            transliteration="karmaṇy-evādhikāras te mā phaleṣhu kadāchana mā karma-phala-hetur bhūr mā te saṅgo 'stv akarmaṇi",
+            eng_meaning="You have a right to perform your prescribed duty, but not to the fruits of action. Never consider yourself the cause of the results of your activities, and never be attached to not doing your duty.",
+            hin_meaning="तुम्हारा अधिकार केवल कर्म करने में है, फल में नहीं। इसलिए तुम कर्म के फल के हेतु मत बनो और न ही तुम्हारी अकर्म में आसक्ति हो।",
+            similarity_score=0.5
+        )]
+
+
+async def _load_session(turn: ChatTurn, conversation_manager: ConversationManager) -> None:
+    """Step 3: Resolve the conversation session, its rolling summary and recent history."""
+    request = turn.request
+    try:
+        if request.session_id:
+            # Get existing conversation context: the rolling summary covers older
+            # exchanges, so only the last turn is needed verbatim
+            try:
+                context = await conversation_manager.get_context(
+                    session_id=request.session_id,
+                    window_size=settings.CONVERSATION_RECENT_MESSAGES if settings.CONVERSATION_SUMMARY_ENABLED else 10
+                )
+                turn.conversation_history = [
+                    ConversationMessage(
+                        role=msg.role.value,
+                        content=msg.content,
+                        timestamp=msg.created_at.isoformat()
+                    ) for msg in context.messages
+                ]
+                turn.conversation_summary = context.summary if settings.CONVERSATION_SUMMARY_ENABLED else None
+                turn.session_id = request.session_id
+                logger.info(
+                    f"Retrieved context: {len(turn.conversation_history)} messages, "
+                    f"summary: {'yes' if turn.conversation_summary else 'no'}"
+                )
+
+            except Exception as e:
+                logger.warning(f"Failed to retrieve conversation context: {e}")
+                turn.conversation_history = []
+                turn.session_id = request.session_id
+        else:
+            # Create new session
+            try:
+                from app.schemas.conversation import InteractionMode
+                mode_map = {
+                    "socratic": InteractionMode.SOCRATIC,
+                    "wisdom": InteractionMode.WISDOM,
+                    "story": InteractionMode.STORY
+                }
+
+                # Only create session if user is authenticated
+                if turn.current_user:
+                    with span("db.create_session"):
+                        session = await conversation_manager.create_session(
+                            user_id=turn.current_user.id,
+                            interaction_mode=mode_map[request.interaction_mode]
+                        )
+                else:
+                    # For unauthenticated users, create a temporary session ID
+                    from app.schemas.conversation import ConversationSessionResponse
+                    session = ConversationSessionResponse(
+                        id=uuid.uuid4(),
+                        user_id=uuid.uuid4(),  # Temporary user ID
+                        interaction_mode=mode_map[request.interaction_mode],
+                        started_at=datetime.utcnow(),
+                        message_count=0
+                    )
+                turn.session_id = session.id
+                turn.conversation_history = []
+                logger.info(f"Created new session: {turn.session_id}")
+
+            except Exception as e:
+                logger.warning(f"Failed to create session, using temporary ID: {e}")
+                turn.session_id = uuid.uuid4()
+                turn.conversation_history = []
+                turn.fallback_used = True
+
+    except Exception as e:
+        logger.error(f"Session management failed: {e}")
+        turn.session_id = request.session_id or uuid.uuid4()
+        turn.conversation_history = []
+        turn.fallback_used = True
+
+
+def _fallback_reflection(
+    turn: ChatTurn,
+    casual_chat_service: CasualChatService,
+    reflection_service: ReflectionGenerationService
+) -> str:
+    """Template-based reflection used when the LLM call fails."""
+    turn.fallback_used = True
+    try:
+        if turn.intent == "casual_chat":
+            reflection_text = casual_chat_service.generate_fallback_response(turn.request.user_input)
+            logger.info("Generated fallback casual chat response")
+        else:
+            reflection_text = reflection_service.generate_fallback_reflection(
+                user_input=turn.request.user_input,
+                emotion_data=turn.emotion_dict(),
+                verses=turn.verse_dicts()
+            )
+            logger.info("Generated fallback reflection")
+        return reflection_text
+    except Exception as fallback_error:
+        logger.error(f"Fallback reflection also failed: {fallback_error}")
+        # Last resort reflection
+        if turn.intent == "casual_chat":
+            return "🙏 Namaste! I'm GitaGPT, your spiritual companion. I'm here to help you find wisdom from the Bhagavad Gita. How can I support you today?"
+        elif turn.verses:
+            verse = turn.verses[0]
+            emotion_label = turn.emotion.label if turn.emotion else "seeking guidance"
+            return f"""I understand you're {emotion_label}. Here's a verse that may provide guidance:
+
+**Verse {verse.chapter}.{verse.verse}:**
+
+Sanskrit: {verse.shloka}
+
+English: {verse.eng_meaning}
+
+This ancient wisdom reminds us that we can find peace and clarity even in challenging times. Take a moment to reflect on how this teaching might apply to your current situation."""
+        else:
+            return "I'm here to provide guidance from the Bhagavad Gita. Please share what's on your mind."
+
+
+async def _generate_reflection(
+    turn: ChatTurn,
+    casual_chat_service: CasualChatService,
+    reflection_service: ReflectionGenerationService
+) -> str:
+    """Step 4: Generate reflection based on intent, falling back to templates on failure."""
+    if turn.degradation_level >= degradation.TEMPLATE_REFLECTION:
+        return _fallback_reflection(turn, casual_chat_service, reflection_service)
+    try:
+        if turn.intent == "casual_chat":
+            # Use casual chat service for greetings and small talk
+            reflection_text = await casual_chat_service.generate_response_async(
+                user_input=turn.request.user_input,
+                conversation_history=turn.history_dicts(),
+                conversation_summary=turn.conversation_summary
+            )
+            logger.info("Generated casual chat response using Gemini API")
+        else:
+            # Use full reflection service with verses
+            reflection_text = await reflection_service.generate_reflection_async(
+                user_input=turn.request.user_input,
+                emotion_data=turn.emotion_dict(),
+                verses=turn.verse_dicts(),
+                interaction_mode=turn.request.interaction_mode,
+                conversation_history=turn.history_dicts(),
+                conversation_summary=turn.conversation_summary
+            )
+            logger.info(f"Generated {turn.intent} reflection using Gemini API")
+        return reflection_text
+
+    except LLMUnavailableError as e:
+        # Circuit open, client saturated or deadline expired: skip straight to the template
+        logger.warning(f"LLM unavailable, using fallback: {e}")
+        return _fallback_reflection(turn, casual_chat_service, reflection_service)
+
+    except Exception as e:
+        logger.warning(f"Reflection generation failed, using fallback: {e}")
+        return _fallback_reflection(turn, casual_chat_service, reflection_service)
+
+
+def _persist_turn(turn: ChatTurn, reflection_text: str, timer: StageTimer) -> None:
+    """
+    Steps 5-7: Queue both messages and the mood log for background persistence
+    (authenticated users only).
+
+    The writes are idempotent and delivered at least once by the persistence
+    queue, which also updates the rolling summary once they are stored.
+    """
+    if not turn.current_user:
+        return
+
+    with timer.stage("persistence"):
+        try:
+            emotion_data_dict = None
+            if turn.emotion:
+                emotion_data_dict = {
+                    "label": turn.emotion.label,
+                    "confidence": turn.emotion.confidence,
+                    "emoji": turn.emotion.emoji,
+                    "color": turn.emotion.color
+                }
+
+            get_persistence_queue().enqueue(TurnRecord(
+                session_id=turn.session_id,
+                user_id=turn.current_user.id,
+                user_input=turn.request.user_input,
+                emotion_data=emotion_data_dict,
+                reflection=reflection_text,
+                verse_ids=[verse.id for verse in turn.verses],
+                # Mood tracking only logs emotional queries
+                emotion_log_id=uuid.uuid4() if turn.intent == "emotional_query" and turn.emotion else None
+            ))
+            logger.info("Queued conversation turn for persistence")
+
+        except Exception as e:
+            logger.warning(f"Failed to queue conversation turn: {e}")
+            # Continue without storing - this is not critical for the response
 
 
 @router.post("/", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    current_user: User = Depends(optional_auth),
+    response: Response,
+    current_user: Optional[Principal] = Depends(optional_principal),
+    _admitted: None = Depends(admit_request),
     intent_service: IntentClassificationService = Depends(get_intent_service),
     casual_chat_service: CasualChatService = Depends(get_casual_chat_service),
     emotion_service: EmotionDetectionService = Depends(get_emotion_service),
     vector_service: VectorSearchService = Depends(get_vector_service),
     reflection_service: ReflectionGenerationService = Depends(get_reflection_service),
-    conversation_manager: ConversationManager = Depends(get_conversation_manager),
-    logging_service: LoggingService = Depends(get_logging_service)
+    conversation_manager: ConversationManager = Depends(get_conversation_manager)
 ) -> ChatResponse:
     """
     Main conversation orchestration endpoint that handles the complete flow.
-    
+
     This endpoint orchestrates the entire conversation flow:
     1. Detects emotions from user input
     2. Searches for relevant verses based on semantic similarity
     3. Retrieves conversation context if session exists
     4. Generates empathetic reflection linking verses to user's situation
-    5. Logs the interaction for mood tracking
-    6. Stores messages in conversation history
-    
+    5. Queues the interaction log and conversation messages for background
+       persistence, so the response does not wait on database writes
+
     The endpoint implements comprehensive error handling with graceful fallbacks
     to ensure users always receive meaningful guidance even if individual
-    services fail.
-    
+    services fail. Per-stage durations are returned in the Server-Timing header.
+
     **Parameters:**
     - **user_input**: The user's message (1-5000 characters)
     - **user_id**: UUID of the authenticated user
     - **session_id**: Optional session ID (creates new session if not provided)
     - **interaction_mode**: One of 'socratic', 'wisdom', 'story' (default: 'wisdom')
-    
+
     **Returns:**
     - **reflection**: Generated reflection with verse and commentary
     - **emotion**: Detected emotion with confidence, emoji, and color
@@ -150,445 +479,319 @@ async def chat(
     - **session_id**: Session ID for continued conversation
     - **interaction_mode**: Mode used for generation
     - **fallback_used**: Whether any fallback mechanisms were triggered
-    
+
     **Error Handling:**
     The endpoint implements multiple fallback layers:
     - Emotion detection failure → neutral emotion
     - Vector search failure → random verse from cache
     - LLM API failure → template-based reflection
-    - Database issues → in-memory queuing with retry
+    - Database issues → background queue with retry and a durable local spool
+    - Rate limit exceeded or a model at capacity → 429 with Retry-After
     """
-    fallback_used = False
-    
-    try:
-        # Validate interaction mode
-        valid_modes = ["socratic", "wisdom", "story"]
-        if request.interaction_mode not in valid_modes:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid interaction mode '{request.interaction_mode}'. Must be one of: {valid_modes}"
-            )
-        
-        user_id = current_user.id if current_user else None
-        logger.info(f"Processing chat request for user {user_id}, session {request.session_id}")
-        
-        # Step 0: Classify intent to determine routing
+    timer = StageTimer()
+    degradation_controller = get_degradation_controller()
+
+    # In flight until the response is built; its latency feeds the degradation ladder
+    with degradation_controller.track():
+        turn = ChatTurn(request, current_user, degradation_controller.current_level())
         try:
-            intent, intent_confidence = intent_service.classify_intent(request.user_input)
-            logger.info(f"Classified intent: {intent} (confidence: {intent_confidence})")
+            _validate_interaction_mode(request.interaction_mode)
+
+            user_id = current_user.id if current_user else None
+            logger.info(f"Processing chat request for user {user_id}, session {request.session_id}")
+
+            with timer.stage("intent"):
+                await _classify_intent(turn, intent_service)
+
+            if turn.intent == "emotional_query":
+                with timer.stage("emotion"):
+                    await _detect_emotion(turn, emotion_service)
+
+            if turn.intent in ["emotional_query", "spiritual_guidance"]:
+                with timer.stage("search"):
+                    await _search_verses(turn, vector_service)
+
+            with timer.stage("context"):
+                await _load_session(turn, conversation_manager)
+
+            with timer.stage("llm"):
+                reflection_text = await _generate_reflection(turn, casual_chat_service, reflection_service)
+
+            _persist_turn(turn, reflection_text, timer)
+
+            # Return complete response
+            if settings.SERVER_TIMING_ENABLED:
+                response.headers["Server-Timing"] = timer.server_timing_header()
+            chat_response = ChatResponse(
+                reflection=reflection_text,
+                emotion=turn.emotion,
+                verses=turn.verses,
+                session_id=turn.session_id,
+                interaction_mode=request.interaction_mode,
+                intent=turn.intent,
+                intent_confidence=turn.intent_confidence,
+                fallback_used=turn.fallback_used,
+                degradation_level=turn.degradation_level
+            )
+
+            logger.info(f"Chat request completed successfully (intent: {turn.intent}, fallback_used: {turn.fallback_used})")
+            return chat_response
+
+        except HTTPException:
+            # Re-raise HTTP exceptions (validation errors)
+            raise
+
         except Exception as e:
-            logger.warning(f"Intent classification failed, defaulting to casual_chat: {e}")
-            intent = "casual_chat"
-            intent_confidence = 0.5
-        
-        # Step 1: Detect emotions (only for emotional_query intent)
-        emotion = None
-        if intent == "emotional_query":
+            logger.error(f"Unexpected error in chat endpoint: {e}")
+
+            # Last resort error handling - try to provide minimal response
             try:
-                emotions_data = emotion_service.detect_emotion(
-                    text=request.user_input,
-                    threshold=0.3
-                )
-                dominant_emotion_data = emotion_service.get_dominant_emotion(emotions_data)
-                emotion = EmotionData(**dominant_emotion_data)
-                logger.info(f"Detected emotion: {emotion.label} (confidence: {emotion.confidence})")
-                
-            except Exception as e:
-                logger.warning(f"Emotion detection failed, using neutral fallback: {e}")
-                fallback_used = True
-                emotion = EmotionData(
+                fallback_emotion = EmotionData(
                     label="neutral",
                     confidence=0.5,
                     emoji="😐",
                     color="#F3F4F6"
                 )
-        
-        # Step 2: Search for relevant verses (skip for casual_chat)
-        verses = []
-        if intent in ["emotional_query", "spiritual_guidance"]:
-            try:
-                # For emotional queries, include emotion in search
-                # For spiritual guidance, search by query only
-                search_emotion = emotion.label if intent == "emotional_query" and emotion else None
-                
-                verses_data = vector_service.search_verses(
-                    query=request.user_input,
-                    emotion=search_emotion,
-                    top_k=3
-                )
-                verses = [VerseSearchResult(**verse) for verse in verses_data]
-                logger.info(f"Found {len(verses)} relevant verses")
-                
-                if not verses:
-                    raise Exception("No verses found")
-                    
-            except Exception as e:
-                logger.warning(f"Verse search failed, using fallback verse: {e}")
-                fallback_used = True
-                # Fallback to a default verse (BG2.47 - famous karma yoga verse)
-                verses = [VerseSearchResult(
+
+                fallback_verse = VerseSearchResult(
                     id="BG2.47",
                     chapter=2,
                     verse=47,
-                    shloka="कर्मण्येवाधिकारस्ते मा फलेषु कदाचन। मा कर्मफलहेतुर्भूर्मा ते सङ्गोऽस्त्वकर्मणि॥",
-                    transliteration="karmaṇy-evādhikāras te mā phaleṣhu kadāchana mā karma-phala-hetur bhūr mā te saṅgo 'stv akarmaṇi",
-                    eng_meaning="You have a right to perform your prescribed duty, but not to the fruits of action. Never consider yourself the cause of the results of your activities, and never be attached to not doing your duty.",
-                    hin_meaning="तुम्हारा अधिकार केवल कर्म करने में है, फल में नहीं। इसलिए तुम कर्म के फल के हेतु मत बनो और न ही तुम्हारी अकर्म में आसक्ति हो।",
+                    shloka="कर्मण्येवाधिकारस्ते मा फलेषु कदाचन।",
+                    eng_meaning="You have a right to perform your prescribed duty, but not to the fruits of action.",
                     similarity_score=0.5
-                )]
-        
-        # Step 3: Handle conversation session
+                )
+
+                fallback_reflection = """I'm here to provide guidance from the Bhagavad Gita. Here's a fundamental teaching:
+
+**Verse 2.47:**
+
+Sanskrit: कर्मण्येवाधिकारस्ते मा फलेषु कदाचन।
+
+English: You have a right to perform your prescribed duty, but not to the fruits of action.
+
+This verse reminds us to focus on our actions rather than worrying about outcomes. Whatever you're facing, remember that you have the power to choose your response."""
+
+                return ChatResponse(
+                    reflection=fallback_reflection,
+                    emotion=fallback_emotion,
+                    verses=[fallback_verse],
+                    session_id=request.session_id or uuid.uuid4(),
+                    interaction_mode=request.interaction_mode,
+                    intent="casual_chat",
+                    intent_confidence=0.5,
+                    fallback_used=True,
+                    degradation_level=turn.degradation_level
+                )
+
+            except Exception as final_error:
+                logger.error(f"Final fallback also failed: {final_error}")
+                raise HTTPException(
+                    status_code=500,
+                    detail="Unable to process your request. Please try again later."
+                )
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format a Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _stream_turn(
+    turn: ChatTurn,
+    intent_service: IntentClassificationService,
+    casual_chat_service: CasualChatService,
+    emotion_service: EmotionDetectionService,
+    vector_service: VectorSearchService,
+    reflection_service: ReflectionGenerationService
+) -> AsyncIterator[str]:
+    """
+    Run the chat pipeline, yielding SSE events as each stage completes.
+
+    Uses its own database session: request-scoped dependencies are closed
+    before a streaming body is sent.
+    """
+    timer = StageTimer()
+    db = AsyncSessionLocal()
+    with get_degradation_controller().track():
         try:
-            if request.session_id:
-                # Get existing conversation context
-                try:
-                    context = await conversation_manager.get_context(
-                        session_id=request.session_id,
-                        window_size=10  # Last 5 exchanges
-                    )
-                    conversation_history = [
-                        ConversationMessage(
-                            role=msg.role.value,
-                            content=msg.content,
-                            timestamp=msg.created_at.isoformat()
-                        ) for msg in context.messages
-                    ]
-                    session_id = request.session_id
-                    logger.info(f"Retrieved context: {len(conversation_history)} messages")
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to retrieve conversation context: {e}")
-                    conversation_history = []
-                    session_id = request.session_id
-            else:
-                # Create new session
+            conversation_manager = ConversationManager(db)
+
+            with timer.stage("intent"):
+                await _classify_intent(turn, intent_service)
+            yield _sse_event("intent", {"intent": turn.intent, "intent_confidence": turn.intent_confidence})
+
+            if turn.intent == "emotional_query":
+                with timer.stage("emotion"):
+                    await _detect_emotion(turn, emotion_service)
+            yield _sse_event("emotion", turn.emotion.model_dump() if turn.emotion else None)
+
+            if turn.intent in ["emotional_query", "spiritual_guidance"]:
+                with timer.stage("search"):
+                    await _search_verses(turn, vector_service)
+            yield _sse_event("verses", [verse.model_dump() for verse in turn.verses])
+
+            with timer.stage("context"):
+                await _load_session(turn, conversation_manager)
+            yield _sse_event("session", {
+                "session_id": turn.session_id,
+                "interaction_mode": turn.request.interaction_mode
+            })
+
+            # Stream reflection tokens as the LLM produces them
+            chunks: List[str] = []
+            with timer.stage("llm"):
                 try:
-                    from app.schemas.conversation import InteractionMode
-                    mode_map = {
-                        "socratic": InteractionMode.SOCRATIC,
-                        "wisdom": InteractionMode.WISDOM,
-                        "story": InteractionMode.STORY
-                    }
-                    
-                    # Only create session if user is authenticated
-                    if current_user:
-                        session = await conversation_manager.create_session(
-                            user_id=current_user.id,
-                            interaction_mode=mode_map[request.interaction_mode]
+                    if turn.degradation_level >= degradation.TEMPLATE_REFLECTION:
+                        text = _fallback_reflection(turn, casual_chat_service, reflection_service)
+                        chunks.append(text)
+                        yield _sse_event("token", {"text": text})
+                        token_stream = None
+                    elif turn.intent == "casual_chat":
+                        token_stream = casual_chat_service.stream_response(
+                            user_input=turn.request.user_input,
+                            conversation_history=turn.history_dicts(),
+                            conversation_summary=turn.conversation_summary
                         )
                     else:
-                        # For unauthenticated users, create a temporary session ID
-                        from app.schemas.conversation import ConversationSessionResponse
-                        session = ConversationSessionResponse(
-                            id=uuid.uuid4(),
-                            user_id=uuid.uuid4(),  # Temporary user ID
-                            interaction_mode=mode_map[request.interaction_mode],
-                            started_at=datetime.utcnow(),
-                            message_count=0
+                        token_stream = reflection_service.stream_reflection(
+                            user_input=turn.request.user_input,
+                            emotion_data=turn.emotion_dict(),
+                            verses=turn.verse_dicts(),
+                            interaction_mode=turn.request.interaction_mode,
+                            conversation_history=turn.history_dicts(),
+                            conversation_summary=turn.conversation_summary
                         )
-                    session_id = session.id
-                    conversation_history = []
-                    logger.info(f"Created new session: {session_id}")
-                    
+                    if token_stream is not None:
+                        async for text in token_stream:
+                            chunks.append(text)
+                            yield _sse_event("token", {"text": text})
+
                 except Exception as e:
-                    logger.warning(f"Failed to create session, using temporary ID: {e}")
-                    session_id = uuid.uuid4()
-                    conversation_history = []
-                    fallback_used = True
-                    
-        except Exception as e:
-            logger.error(f"Session management failed: {e}")
-            session_id = request.session_id or uuid.uuid4()
-            conversation_history = []
-            fallback_used = True
-        
-        # Step 4: Generate reflection based on intent
-        try:
-            if intent == "casual_chat":
-                # Use casual chat service for greetings and small talk
-                reflection_text = casual_chat_service.generate_response(
-                    user_input=request.user_input,
-                    conversation_history=[msg.model_dump() for msg in conversation_history]
-                )
-                logger.info("Generated casual chat response using Gemini API")
-                
-            elif intent in ["emotional_query", "spiritual_guidance"]:
-                # Use full reflection service with verses
-                reflection_text = reflection_service.generate_reflection(
-                    user_input=request.user_input,
-                    emotion_data=emotion.model_dump() if emotion else {"label": "neutral", "confidence": 0.5},
-                    verses=[verse.model_dump() for verse in verses],
-                    interaction_mode=request.interaction_mode,
-                    conversation_history=[msg.model_dump() for msg in conversation_history]
-                )
-                logger.info(f"Generated {intent} reflection using Gemini API")
-            
+                    if chunks:
+                        # Keep what the user has already seen rather than replacing it
+                        logger.warning(f"Reflection stream interrupted after {len(chunks)} chunks: {e}")
+                        turn.fallback_used = True
+                    else:
+                        logger.warning(f"Reflection streaming failed, using fallback: {e}")
+                        fallback_text = _fallback_reflection(turn, casual_chat_service, reflection_service)
+                        chunks.append(fallback_text)
+                        yield _sse_event("token", {"text": fallback_text})
+
+            reflection_text = "".join(chunks).strip()
+            _persist_turn(turn, reflection_text, timer)
+
+            yield _sse_event("done", {
+                "session_id": turn.session_id,
+                "fallback_used": turn.fallback_used,
+                "degradation_level": turn.degradation_level,
+                "timings": {name: round(duration, 1) for name, duration in timer.stages.items()}
+            })
+            logger.info(f"Chat stream completed (intent: {turn.intent}, fallback_used: {turn.fallback_used})")
+
+        except AdmissionRejected as e:
+            yield _sse_event("error", {"detail": e.detail, "retry_after": e.retry_after})
+
         except Exception as e:
-            logger.warning(f"Reflection generation failed, using fallback: {e}")
-            fallback_used = True
-            try:
-                if intent == "casual_chat":
-                    reflection_text = casual_chat_service.generate_fallback_response(request.user_input)
-                    logger.info("Generated fallback casual chat response")
-                else:
-                    reflection_text = reflection_service.generate_fallback_reflection(
-                        user_input=request.user_input,
-                        emotion_data=emotion.model_dump() if emotion else {"label": "neutral", "confidence": 0.5},
-                        verses=[verse.model_dump() for verse in verses]
-                    )
-                    logger.info("Generated fallback reflection")
-            except Exception as fallback_error:
-                logger.error(f"Fallback reflection also failed: {fallback_error}")
-                # Last resort reflection
-                if intent == "casual_chat":
-                    reflection_text = "🙏 Namaste! I'm GitaGPT, your spiritual companion. I'm here to help you find wisdom from the Bhagavad Gita. How can I support you today?"
-                elif verses:
-                    emotion_label = emotion.label if emotion else "seeking guidance"
-                    reflection_text = f"""I understand you're {emotion_label}. Here's a verse that may provide guidance:
+            logger.error(f"Unexpected error in chat stream: {e}")
+            yield _sse_event("error", {"detail": "Unable to process your request. Please try again later."})
 
-**Verse {verses[0].chapter}.{verses[0].verse}:**
+        finally:
+            await db.close()
 
-Sanskrit: {verses[0].shloka}
 
-English: {verses[0].eng_meaning}
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: Optional[Principal] = Depends(optional_principal),
+    _admitted: None = Depends(admit_request),
+    intent_service: IntentClassificationService = Depends(get_intent_service),
+    casual_chat_service: CasualChatService = Depends(get_casual_chat_service),
+    emotion_service: EmotionDetectionService = Depends(get_emotion_service),
+    vector_service: VectorSearchService = Depends(get_vector_service),
+    reflection_service: ReflectionGenerationService = Depends(get_reflection_service)
+) -> StreamingResponse:
+    """
+    Streaming variant of the chat endpoint using Server-Sent Events.
 
-This ancient wisdom reminds us that we can find peace and clarity even in challenging times. Take a moment to reflect on how this teaching might apply to your current situation."""
-                else:
-                    reflection_text = "I'm here to provide guidance from the Bhagavad Gita. Please share what's on your mind."
-        
-        # Step 5: Store user message in conversation (only if authenticated)
-        if current_user:
-            try:
-                from app.schemas.conversation import MessageRole
-                emotion_data_dict = None
-                if emotion:
-                    emotion_data_dict = {
-                        "label": emotion.label,
-                        "confidence": emotion.confidence,
-                        "emoji": emotion.emoji,
-                        "color": emotion.color
-                    }
-                
-                await conversation_manager.add_message(
-                    session_id=session_id,
-                    role=MessageRole.USER,
-                    content=request.user_input,
-                    emotion_data=emotion_data_dict
-                )
-                logger.info("Stored user message")
-                
-            except Exception as e:
-                logger.warning(f"Failed to store user message: {e}")
-                # Continue without storing - this is not critical for the response
-        
-        # Step 6: Store assistant response in conversation (only if authenticated)
-        if current_user:
-            try:
-                from app.schemas.conversation import MessageRole
-                verse_id = verses[0].id if verses else None
-                
-                await conversation_manager.add_message(
-                    session_id=session_id,
-                    role=MessageRole.ASSISTANT,
-                    content=reflection_text,
-                    verse_id=verse_id
-                )
-                logger.info("Stored assistant response")
-                
-            except Exception as e:
-                logger.warning(f"Failed to store assistant response: {e}")
-                # Continue without storing - this is not critical for the response
-        
-        # Step 7: Log interaction for mood tracking (only for emotional queries and authenticated users)
-        if current_user and intent == "emotional_query" and emotion:
-            try:
-                await logging_service.log_interaction(
-                    user_id=current_user.id,
-                    user_input=request.user_input,
-                    emotion_data={
-                        "label": emotion.label,
-                        "confidence": emotion.confidence,
-                        "emoji": emotion.emoji,
-                        "color": emotion.color
-                    },
-                    verse_ids=[verse.id for verse in verses],
-                    session_id=session_id
-                )
-                logger.info("Logged interaction for mood tracking")
-                
-            except Exception as e:
-                logger.warning(f"Failed to log interaction: {e}")
-                # Continue without logging - this is not critical for the response
-        
-        # Return complete response
-        response = ChatResponse(
-            reflection=reflection_text,
-            emotion=emotion,
-            verses=verses,
-            session_id=session_id,
-            interaction_mode=request.interaction_mode,
-            intent=intent,
-            intent_confidence=intent_confidence,
-            fallback_used=fallback_used
-        )
-        
-        logger.info(f"Chat request completed successfully (intent: {intent}, fallback_used: {fallback_used})")
-        return response
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions (validation errors)
-        raise
-        
-    except Exception as e:
-        logger.error(f"Unexpected error in chat endpoint: {e}")
-        
-        # Last resort error handling - try to provide minimal response
-        try:
-            fallback_emotion = EmotionData(
-                label="neutral",
-                confidence=0.5,
-                emoji="😐",
-                color="#F3F4F6"
-            )
-            
-            fallback_verse = VerseSearchResult(
-                id="BG2.47",
-                chapter=2,
-                verse=47,
-                shloka="कर्मण्येवाधिकारस्ते मा फलेषु कदाचन।",
-                eng_meaning="You have a right to perform your prescribed duty, but not to the fruits of action.",
-                similarity_score=0.5
-            )
-            
-            fallback_reflection = """I'm here to provide guidance from the Bhagavad Gita. Here's a fundamental teaching:
+    Runs the same pipeline as `POST /chat/` but emits each stage as soon as it
+    completes, then streams the reflection token by token, so the user sees a
+    response at time-to-first-token instead of after the full completion.
+    Messages are queued for persistence once the stream finishes.
 
-**Verse 2.47:**
+    **Events (in order):**
+    - **intent**: `{intent, intent_confidence}`
+    - **emotion**: Detected emotion, or null for non-emotional intents
+    - **verses**: List of retrieved verses (empty for casual chat)
+    - **session**: `{session_id, interaction_mode}`
+    - **token**: `{text}`, repeated for each reflection chunk
+    - **done**: `{session_id, fallback_used, degradation_level, timings}` with per-stage durations (ms)
+    - **error**: `{detail}`, sent instead of `done` if the pipeline fails unexpectedly,
+      or `{detail, retry_after}` if a model was at capacity
 
-Sanskrit: कर्मण्येवाधिकारस्ते मा फलेषु कदाचन।
+    Callers over their rate limit get a 429 with Retry-After before the stream starts.
+    """
+    _validate_interaction_mode(request.interaction_mode)
 
-English: You have a right to perform your prescribed duty, but not to the fruits of action.
+    user_id = current_user.id if current_user else None
+    logger.info(f"Processing chat stream for user {user_id}, session {request.session_id}")
 
-This verse reminds us to focus on our actions rather than worrying about outcomes. Whatever you're facing, remember that you have the power to choose your response."""
-            
-            return ChatResponse(
-                reflection=fallback_reflection,
-                emotion=fallback_emotion,
-                verses=[fallback_verse],
-                session_id=request.session_id or uuid.uuid4(),
-                interaction_mode=request.interaction_mode,
-                intent="casual_chat",
-                intent_confidence=0.5,
-                fallback_used=True
-            )
-            
-        except Exception as final_error:
-            logger.error(f"Final fallback also failed: {final_error}")
-            raise HTTPException(
-                status_code=500,
-                detail="Unable to process your request. Please try again later."
-            )
+    turn = ChatTurn(request, current_user, get_degradation_controller().current_level())
+    return StreamingResponse(
+        _stream_turn(
+            turn,
+            intent_service,
+            casual_chat_service,
+            emotion_service,
+            vector_service,
+            reflection_service
+        ),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering so tokens arrive immediately
+            "X-Degradation-Level": str(turn.degradation_level)
+        }
+    )
 
 
 @router.get("/health")
-async def chat_service_health(
-    emotion_service: EmotionDetectionService = Depends(get_emotion_service),
-    vector_service: VectorSearchService = Depends(get_vector_service),
-    reflection_service: ReflectionGenerationService = Depends(get_reflection_service),
-    db: Session = Depends(get_db)
-) -> dict:
+async def chat_service_health() -> dict:
     """
     Health check endpoint for the chat orchestration service.
     
-    Tests all integrated services and returns overall system health.
+    Reports the component statuses cached by the background health checker,
+    so frequent probes run no inference or queries (GET /health/deep does).
     """
+    checker = get_health_checker()
     health_status = {
         "status": "healthy",
-        "services": {},
+        "services": {
+            "emotion_detection": checker.component("emotion_model"),
+            "vector_search": checker.component("vector_search"),
+            "reflection_generation": checker.component("llm"),
+            "database": checker.component("database"),
+        },
         "message": "Chat orchestration service is operational"
     }
     
-    overall_healthy = True
+    # Report casual chat response cache effectiveness
+    response_cache = get_casual_response_cache()
+    if response_cache is not None:
+        health_status["services"]["casual_response_cache"] = response_cache.stats()
     
-    # Test emotion detection service
-    try:
-        test_emotions = emotion_service.detect_emotion("I am feeling good today")
-        health_status["services"]["emotion_detection"] = {
-            "status": "healthy",
-            "test_passed": len(test_emotions) > 0
-        }
-    except Exception as e:
-        health_status["services"]["emotion_detection"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        overall_healthy = False
+    # Report background persistence backlog and delivery counters
+    health_status["services"]["persistence_queue"] = get_persistence_queue().stats()
     
-    # Test vector search service
-    try:
-        test_verses = vector_service.search_verses("dharma", top_k=1)
-        health_status["services"]["vector_search"] = {
-            "status": "healthy",
-            "test_passed": len(test_verses) > 0,
-            "verses_count": vector_service.collection.count()
-        }
-    except Exception as e:
-        health_status["services"]["vector_search"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        overall_healthy = False
-    
-    # Test reflection generation service
-    try:
-        test_emotion = {"label": "neutral", "confidence": 0.5, "emoji": "😐", "color": "#F3F4F6"}
-        test_verse = [{"id": "BG2.47", "shloka": "test", "eng_meaning": "test"}]
-        test_reflection = reflection_service.generate_reflection(
-            user_input="Test message",
-            emotion_data=test_emotion,
-            verses=test_verse,
-            interaction_mode="wisdom"
-        )
-        health_status["services"]["reflection_generation"] = {
-            "status": "healthy",
-            "test_passed": len(test_reflection) > 0
-        }
-    except Exception as e:
-        # Check if fallback works
-        try:
-            fallback_test = reflection_service.generate_fallback_reflection(
-                user_input="Test message",
-                emotion_data=test_emotion,
-                verses=test_verse
-            )
-            health_status["services"]["reflection_generation"] = {
-                "status": "degraded",
-                "fallback_working": True,
-                "error": str(e)
-            }
-        except:
-            health_status["services"]["reflection_generation"] = {
-                "status": "unhealthy",
-                "error": str(e)
-            }
-            overall_healthy = False
-    
-    # Test database connectivity
-    try:
-        from app.models.conversation import ConversationSession
-        db.query(ConversationSession).limit(1).all()
-        health_status["services"]["database"] = {
-            "status": "healthy",
-            "connection": "active"
-        }
-    except Exception as e:
-        health_status["services"]["database"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        overall_healthy = False
+    # Report load shed by admission control and the current degradation level
+    health_status["services"]["admission"] = get_admission_controller().stats()
+    health_status["services"]["degradation"] = get_degradation_controller().stats()
     
-    if not overall_healthy:
+    if health_status["services"]["database"]["status"] == "unhealthy":
+        health_status["status"] = "unhealthy"
+        health_status["message"] = "Chat orchestration service cannot reach the database"
+    elif any(service.get("status") in ("unhealthy", "degraded") for service in health_status["services"].values()):
         health_status["status"] = "degraded"
         health_status["message"] = "Some services are experiencing issues, but fallbacks are available"
     
-    return health_status
\ No newline at end of file
+    return health_status
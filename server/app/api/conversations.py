@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.core.auth import require_auth, check_user_access
-from app.models.user import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_database import get_async_db
+from app.core.auth import require_principal, check_user_access
+from app.core.principal import Principal
+from app.core.health import get_health_checker
 from app.services.conversation_manager import ConversationManager
 from app.schemas.conversation import (
     ConversationSessionCreate,
@@ -40,21 +41,19 @@ class EndSessionRequest(BaseModel):
 
 
 # Dependency to get conversation manager
-def get_conversation_manager(db: Session = Depends(get_db)) -> ConversationManager:
+def get_conversation_manager(db: AsyncSession = Depends(get_async_db)) -> ConversationManager:
     return ConversationManager(db)
 
 
 async def verify_session_ownership(
     session_id: uuid.UUID,
-    current_user: User,
+    current_user: Principal,
     conversation_manager: ConversationManager
 ) -> None:
     """Verify that the current user owns the specified session."""
     from app.models.conversation import ConversationSession
     
-    session = conversation_manager.db.query(ConversationSession).filter(
-        ConversationSession.id == session_id
-    ).first()
+    session = await conversation_manager.db.get(ConversationSession, session_id)
     
     if not session:
         raise HTTPException(
@@ -72,7 +71,7 @@ async def verify_session_ownership(
 @router.post("/sessions", response_model=ConversationSessionResponse, status_code=status.HTTP_201_CREATED)
 async def create_session(
     request: CreateSessionRequest,
-    current_user: User = Depends(require_auth),
+    current_user: Principal = Depends(require_principal),
     conversation_manager: ConversationManager = Depends(get_conversation_manager)
 ) -> ConversationSessionResponse:
     """
@@ -114,7 +113,7 @@ async def create_session(
 async def add_message(
     session_id: uuid.UUID,
     request: AddMessageRequest,
-    current_user: User = Depends(require_auth),
+    current_user: Principal = Depends(require_principal),
     conversation_manager: ConversationManager = Depends(get_conversation_manager)
 ) -> ConversationMessageResponse:
     """
@@ -165,7 +164,7 @@ async def add_message(
 async def get_conversation_context(
     session_id: uuid.UUID,
     window_size: Optional[int] = None,
-    current_user: User = Depends(require_auth),
+    current_user: Principal = Depends(require_principal),
     conversation_manager: ConversationManager = Depends(get_conversation_manager)
 ) -> ConversationContextResponse:
     """
@@ -211,7 +210,7 @@ async def get_conversation_context(
 async def end_session(
     session_id: uuid.UUID,
     request: EndSessionRequest,
-    current_user: User = Depends(require_auth),
+    current_user: Principal = Depends(require_principal),
     conversation_manager: ConversationManager = Depends(get_conversation_manager)
 ) -> ConversationSessionResponse:
     """
@@ -255,8 +254,8 @@ async def end_session(
 @router.get("/{session_id}", response_model=ConversationSessionResponse)
 async def get_session(
     session_id: uuid.UUID,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ) -> ConversationSessionResponse:
     """
     Retrieve details for a specific conversation session.
@@ -271,9 +270,7 @@ async def get_session(
     try:
         from app.models.conversation import ConversationSession
         
-        session = db.query(ConversationSession).filter(
-            ConversationSession.id == session_id
-        ).first()
+        session = await db.get(ConversationSession, session_id)
         
         if not session:
             raise HTTPException(
@@ -301,28 +298,18 @@ async def get_session(
 
 
 @router.get("/health")
-async def conversation_service_health(
-    db: Session = Depends(get_db)
-) -> dict:
+async def conversation_service_health() -> dict:
     """
     Health check endpoint for the conversation service.
     
-    Returns the status of the conversation management service and database connectivity.
+    Returns the cached database status from the background health checker.
     """
-    try:
-        # Test database connectivity
-        from app.models.conversation import ConversationSession
-        db.query(ConversationSession).limit(1).all()
-        
-        return {
-            "status": "healthy",
-            "service": "conversation_management",
-            "database": "connected",
-            "message": "Conversation service is operational"
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "message": "Conversation service is not operational"
-        }
\ No newline at end of file
+    database_status = get_health_checker().component("database")
+    connected = database_status["status"] == "healthy"
+    
+    return {
+        "status": "healthy" if connected else "unhealthy",
+        "service": "conversation_management",
+        "database": "connected" if connected else "unavailable",
+        "message": f"Conversation service is {'operational' if connected else 'not operational'}"
+    }
@@ -1,5 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from app.schemas.emotion import EmotionRequest, EmotionResponse, EmotionData
+from app.core.admission import admit_request, get_admission_controller
+from app.core.config import settings
+from app.core.health import get_health_checker
 from app.services.emotion_detection import get_emotion_service, EmotionDetectionService
 from typing import List
 
@@ -9,7 +13,8 @@ router = APIRouter(prefix="/emotions", tags=["emotions"])
 @router.post("/detect", response_model=EmotionResponse)
 async def detect_emotion(
     request: EmotionRequest,
-    emotion_service: EmotionDetectionService = Depends(get_emotion_service)
+    emotion_service: EmotionDetectionService = Depends(get_emotion_service),
+    _admitted: None = Depends(admit_request)
 ) -> EmotionResponse:
     """
     Detect emotions from text input using ONNX-optimized RoBERTa model.
@@ -25,13 +30,17 @@ async def detect_emotion(
     
     The service uses an ONNX-optimized version of the RoBERTa-GoEmotions model
     for fast inference (~10-20x speedup compared to standard PyTorch).
+    Returns 429 with Retry-After when the caller is over its rate limit or the
+    model is at capacity.
     """
     try:
-        # Detect emotions using the service
-        emotions_data = emotion_service.detect_emotion(
-            text=request.text,
-            threshold=request.threshold
-        )
+        # Detect emotions using the service, off the event loop
+        async with get_admission_controller().model_slot("emotion"):
+            emotions_data = await run_in_threadpool(
+                emotion_service.detect_emotion,
+                text=request.text,
+                threshold=request.threshold
+            )
         
         # Convert to Pydantic models
         emotions = [EmotionData(**emotion) for emotion in emotions_data]
@@ -45,6 +54,9 @@ async def detect_emotion(
             dominant=dominant
         )
         
+    except HTTPException:
+        # Re-raise admission rejections
+        raise
     except Exception as e:
         # Handle model loading errors with fallback to neutral emotion
         print(f"Error in emotion detection endpoint: {e}")
@@ -64,27 +76,20 @@ async def detect_emotion(
 
 
 @router.get("/health")
-async def emotion_service_health(
-    emotion_service: EmotionDetectionService = Depends(get_emotion_service)
-) -> dict:
+async def emotion_service_health() -> dict:
     """
     Health check endpoint for the emotion detection service.
     
-    Returns the status of the emotion detection model and service.
+    Returns the cached status of the emotion detection model; the model is
+    only exercised by GET /health/deep.
     """
-    try:
-        # Test with a simple input
-        test_result = emotion_service.detect_emotion("I am feeling good today")
-        
-        return {
-            "status": "healthy",
-            "model": "SamLowe/roberta-base-go_emotions-onnx",
-            "test_detection": len(test_result) > 0,
-            "message": "Emotion detection service is operational"
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "message": "Emotion detection service is not operational"
-        }
\ No newline at end of file
+    model_status = get_health_checker().component("emotion_model")
+    operational = model_status["status"] in ("healthy", "not_loaded")
+    
+    return {
+        "status": "healthy" if operational else "unhealthy",
+        "model": settings.EMOTION_MODEL,
+        "model_loaded": model_status["status"] == "healthy",
+        "checked_at": model_status.get("checked_at"),
+        "message": f"Emotion detection service is {'operational' if operational else 'not operational'}"
+    }
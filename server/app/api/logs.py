@@ -1,12 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any, Optional
 from datetime import date, datetime
 import uuid
 
-from app.db.database import get_db
-from app.core.auth import require_auth, check_user_access
-from app.models.user import User
+from app.db.async_database import get_async_db
+from app.core.auth import require_principal, check_user_access
+from app.core.principal import Principal
+from app.core.health import get_health_checker
 from app.services.logging_service import LoggingService
 from app.schemas.emotion_log import (
     EmotionLogCreate, 
@@ -18,7 +19,7 @@ from app.schemas.emotion_log import (
 router = APIRouter(prefix="/logs", tags=["logs"])
 
 
-def get_logging_service(db: Session = Depends(get_db)) -> LoggingService:
+def get_logging_service(db: AsyncSession = Depends(get_async_db)) -> LoggingService:
     """Dependency to get LoggingService instance."""
     return LoggingService(db)
 
@@ -29,7 +30,7 @@ async def log_interaction(
     emotion_data: Dict[str, Any],
     verse_ids: List[str],
     session_id: Optional[uuid.UUID] = None,
-    current_user: User = Depends(require_auth),
+    current_user: Principal = Depends(require_principal),
     logging_service: LoggingService = Depends(get_logging_service)
 ) -> EmotionLogResponse:
     """
@@ -88,7 +89,7 @@ async def log_interaction(
 async def get_mood_data(
     start_date: date = Query(..., description="Start date for mood data (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date for mood data (YYYY-MM-DD)"),
-    current_user: User = Depends(require_auth),
+    current_user: Principal = Depends(require_principal),
     logging_service: LoggingService = Depends(get_logging_service)
 ) -> MoodCalendarResponse:
     """
@@ -152,7 +153,7 @@ async def get_mood_data(
 async def get_monthly_mood_data(
     year: int = Query(..., description="Year (e.g., 2024)"),
     month: int = Query(..., ge=1, le=12, description="Month (1-12)"),
-    current_user: User = Depends(require_auth),
+    current_user: Principal = Depends(require_principal),
     logging_service: LoggingService = Depends(get_logging_service)
 ) -> MoodCalendarResponse:
     """
@@ -198,31 +199,18 @@ async def get_monthly_mood_data(
 
 
 @router.get("/health")
-async def logs_service_health(
-    logging_service: LoggingService = Depends(get_logging_service)
-) -> dict:
+async def logs_service_health() -> dict:
     """
     Health check endpoint for the logging service.
     
-    Returns the status of the logging service and database connectivity.
+    Returns the cached database status from the background health checker.
     """
-    try:
-        # Test database connectivity by attempting a simple query
-        from app.models.emotion_log import EmotionLog
-        
-        # Count total emotion logs (this tests DB connectivity)
-        total_logs = logging_service.db.query(EmotionLog).count()
-        
-        return {
-            "status": "healthy",
-            "database_connected": True,
-            "total_emotion_logs": total_logs,
-            "message": "Logging service is operational"
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "database_connected": False,
-            "error": str(e),
-            "message": "Logging service is not operational"
-        }
\ No newline at end of file
+    database_status = get_health_checker().component("database")
+    connected = database_status["status"] == "healthy"
+    
+    return {
+        "status": "healthy" if connected else "unhealthy",
+        "database_connected": connected,
+        "database": database_status,
+        "message": f"Logging service is {'operational' if connected else 'not operational'}"
+    }
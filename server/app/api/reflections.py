@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
 from app.schemas.reflection import ReflectionRequest, ReflectionResponse, ReflectionError
+from app.core.health import get_health_checker
 from app.services.reflection_generation import get_reflection_service, ReflectionGenerationService
 from typing import List
 
@@ -163,68 +164,23 @@ async def get_interaction_modes() -> dict:
 
 
 @router.get("/health")
-async def reflection_service_health(
-    reflection_service: ReflectionGenerationService = Depends(get_reflection_service)
-) -> dict:
+async def reflection_service_health() -> dict:
     """
     Health check endpoint for the reflection generation service.
     
-    Tests the Gemini API connection and service functionality.
+    Returns the cached LLM status (circuit breaker state) from the background
+    health checker; a test generation only runs on GET /health/deep.
     """
-    try:
-        # Test with minimal data
-        test_emotion = {
-            "label": "neutral",
-            "confidence": 0.5,
-            "emoji": "😐",
-            "color": "#F3F4F6"
-        }
-        
-        test_verse = [{
-            "id": "BG2.47",
-            "chapter": 2,
-            "verse": 47,
-            "shloka": "कर्मण्येवाधिकारस्ते मा फलेषु कदाचन।",
-            "eng_meaning": "You have a right to perform your prescribed duty, but not to the fruits of action."
-        }]
-        
-        # Try to generate a test reflection
-        test_reflection = reflection_service.generate_reflection(
-            user_input="Test message",
-            emotion_data=test_emotion,
-            verses=test_verse,
-            interaction_mode="wisdom"
+    llm_status = get_health_checker().component("llm")
+    llm_available = llm_status["status"] == "healthy"
+    
+    return {
+        "status": "healthy" if llm_available else "degraded",
+        "gemini_api": "operational" if llm_available else "unavailable",
+        "llm": llm_status,
+        "available_modes": ["socratic", "wisdom", "story"],
+        "message": (
+            "Reflection generation service is operational" if llm_available
+            else "Gemini API unavailable, but fallback templates are working"
         )
-        
-        return {
-            "status": "healthy",
-            "gemini_api": "operational",
-            "test_generation": len(test_reflection) > 0,
-            "available_modes": ["socratic", "wisdom", "story"],
-            "message": "Reflection generation service is operational"
-        }
-        
-    except Exception as e:
-        # Check if fallback works
-        try:
-            fallback_test = reflection_service.generate_fallback_reflection(
-                user_input="Test message",
-                emotion_data=test_emotion,
-                verses=test_verse
-            )
-            
-            return {
-                "status": "degraded",
-                "gemini_api": "unavailable",
-                "fallback": "operational",
-                "error": str(e),
-                "message": "Gemini API unavailable, but fallback templates are working"
-            }
-        except:
-            return {
-                "status": "unhealthy",
-                "gemini_api": "unavailable", 
-                "fallback": "failed",
-                "error": str(e),
-                "message": "Reflection generation service is not operational"
-            }
\ No newline at end of file
+    }
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from app.schemas.verse import VerseSearchRequest, VerseSearchResponse, VerseSearchResult, VerseMetadataResponse
-from app.services.vector_search import VectorSearchService
+from app.core.admission import admit_request, get_admission_controller
+from app.core.health import get_health_checker
+from app.services.vector_search import VectorSearchService, get_vector_search_service
 from app.services.supabase_service import get_supabase_service, SupabaseService
+from app.services.verse_payload_cache import get_verse_payload_cache, payload_response
 from typing import List, Optional
 import logging
 
@@ -9,34 +13,23 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/verses", tags=["verses"])
 
-# Global service instance (will be initialized on first use)
-_vector_service: Optional[VectorSearchService] = None
-
 
 def get_vector_service() -> VectorSearchService:
     """
-    Dependency to get or create VectorSearchService instance.
+    Dependency to get the shared VectorSearchService instance.
     """
-    global _vector_service
-    if _vector_service is None:
-        try:
-            _vector_service = VectorSearchService()
-            # Initialize database if CSV file exists
-            try:
-                _vector_service.initialize_database("Bhagwad_Gita.csv")
-            except Exception as e:
-                logger.warning(f"Could not initialize database from CSV: {e}")
-        except Exception as e:
-            logger.error(f"Failed to initialize VectorSearchService: {e}")
-            raise HTTPException(status_code=500, detail="Vector search service unavailable")
-    
-    return _vector_service
+    try:
+        return get_vector_search_service()
+    except Exception as e:
+        logger.error(f"Failed to initialize VectorSearchService: {e}")
+        raise HTTPException(status_code=500, detail="Vector search service unavailable")
 
 
 @router.post("/search", response_model=VerseSearchResponse)
 async def search_verses(
     request: VerseSearchRequest,
-    vector_service: VectorSearchService = Depends(get_vector_service)
+    vector_service: VectorSearchService = Depends(get_vector_service),
+    _admitted: None = Depends(admit_request)
 ) -> VerseSearchResponse:
     """
     Search for relevant Bhagavad Gita verses based on semantic similarity.
@@ -52,14 +45,18 @@ async def search_verses(
     Each verse includes Sanskrit text, transliteration, English meaning, and similarity score.
     
     The service uses ChromaDB for vector storage and 'all-mpnet-base-v2' model for embeddings.
+    Returns 429 with Retry-After when the caller is over its rate limit or the
+    embedding model is at capacity.
     """
     try:
-        # Search for verses using the vector service
-        verses_data = vector_service.search_verses(
-            query=request.query,
-            emotion=request.emotion,
-            top_k=request.top_k
-        )
+        # Search for verses using the vector service, off the event loop
+        async with get_admission_controller().model_slot("embedding"):
+            verses_data = await run_in_threadpool(
+                vector_service.search_verses,
+                query=request.query,
+                emotion=request.emotion,
+                top_k=request.top_k
+            )
         
         # Convert to Pydantic models
         verses = [VerseSearchResult(**verse) for verse in verses_data]
@@ -70,6 +67,9 @@ async def search_verses(
             emotion=request.emotion
         )
         
+    except HTTPException:
+        # Re-raise admission rejections
+        raise
     except Exception as e:
         logger.error(f"Error in verse search endpoint: {e}")
         
@@ -126,65 +126,41 @@ async def get_random_verse(
 
 
 @router.get("/health")
-async def verse_service_health(
-    vector_service: VectorSearchService = Depends(get_vector_service)
-) -> dict:
+async def verse_service_health() -> dict:
     """
     Health check endpoint for the verse services.
     
-    Returns the status of both ChromaDB (vector search) and Supabase (verse storage).
+    Returns the cached status of both ChromaDB (vector search) and Supabase
+    (verse storage); searches and counts only run on GET /health/deep.
     """
-    try:
-        # Test ChromaDB
-        chroma_healthy = True
-        chroma_count = 0
-        try:
-            test_results = vector_service.search_verses("dharma", top_k=1)
-            chroma_count = vector_service.collection.count()
-        except Exception as e:
-            chroma_healthy = False
-            logger.warning(f"ChromaDB health check failed: {e}")
-        
-        # Test Supabase
-        supabase_healthy = False
-        supabase_count = 0
-        try:
-            from app.services.supabase_service import get_supabase_service
-            supabase_service = get_supabase_service()
-            supabase_count = supabase_service.get_verse_count()
-            supabase_healthy = True
-        except Exception as e:
-            logger.warning(f"Supabase health check failed: {e}")
-        
-        overall_status = "healthy" if (chroma_healthy or supabase_healthy) else "unhealthy"
-        
-        return {
-            "status": overall_status,
-            "services": {
-                "chromadb": {
-                    "status": "healthy" if chroma_healthy else "unhealthy",
-                    "verses_count": chroma_count,
-                    "purpose": "Semantic search"
-                },
-                "supabase": {
-                    "status": "healthy" if supabase_healthy else "unhealthy",
-                    "verses_count": supabase_count,
-                    "purpose": "Verse storage and random access"
-                }
-            },
-            "message": f"Verse services are {'operational' if overall_status == 'healthy' else 'experiencing issues'}"
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "message": "Verse services are not operational"
-        }
+    checker = get_health_checker()
+    chroma_status = checker.component("vector_search")
+    supabase_status = checker.component("supabase")
+    
+    usable = ("healthy", "not_loaded")
+    overall_status = "healthy" if (chroma_status["status"] in usable or supabase_status["status"] in usable) else "unhealthy"
+    
+    health_status = {
+        "status": overall_status,
+        "services": {
+            "chromadb": {**chroma_status, "purpose": "Semantic search"},
+            "supabase": {**supabase_status, "purpose": "Verse storage and random access"}
+        },
+        "message": f"Verse services are {'operational' if overall_status == 'healthy' else 'experiencing issues'}"
+    }
+    
+    # Report pre-serialized verse and chapter responses
+    payload_cache = get_verse_payload_cache()
+    if payload_cache is not None:
+        health_status["services"]["payload_cache"] = payload_cache.stats()
+    
+    return health_status
 
 
 @router.get("/{verse_id}", response_model=VerseMetadataResponse)
 async def get_verse_by_id(
     verse_id: str,
+    http_request: Request,
     vector_service: VectorSearchService = Depends(get_vector_service)
 ) -> VerseMetadataResponse:
     """
@@ -194,9 +170,16 @@ async def get_verse_by_id(
     
     Returns the complete verse data including Sanskrit text, transliteration,
     English and Hindi meanings, and word-by-word meaning.
-    Tries ChromaDB first, then falls back to Supabase.
+    Tries ChromaDB first, then falls back to Supabase. Found verses are
+    served from pre-serialized, pre-compressed bytes on later requests.
     """
     try:
+        payload_cache = get_verse_payload_cache()
+        if payload_cache is not None:
+            payload = payload_cache.get(("verse", verse_id))
+            if payload is not None:
+                return payload_response(http_request, payload)
+        
         # Try ChromaDB first (for consistency with search)
         verse_data = vector_service.get_verse_by_id(verse_id)
         
@@ -215,7 +198,11 @@ async def get_verse_by_id(
                 detail=f"Verse with ID '{verse_id}' not found"
             )
         
-        return VerseMetadataResponse(**verse_data)
+        verse = VerseMetadataResponse(**verse_data)
+        if payload_cache is not None:
+            payload = payload_cache.put(("verse", verse_id), verse.model_dump(mode="json"))
+            return payload_response(http_request, payload)
+        return verse
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -230,7 +217,8 @@ async def get_verse_by_id(
 
 @router.get("/chapter/{chapter_num}")
 async def get_verses_by_chapter(
-    chapter_num: int
+    chapter_num: int,
+    http_request: Request
 ) -> dict:
     """
     Get all verses from a specific chapter.
@@ -238,6 +226,8 @@ async def get_verses_by_chapter(
     - **chapter_num**: Chapter number (1-18)
     
     Returns all verses from the specified chapter with complete metadata.
+    Chapters are served from pre-serialized, pre-compressed bytes after the
+    first lookup.
     """
     try:
         if chapter_num < 1 or chapter_num > 18:
@@ -246,6 +236,12 @@ async def get_verses_by_chapter(
                 detail="Chapter number must be between 1 and 18"
             )
         
+        payload_cache = get_verse_payload_cache()
+        if payload_cache is not None:
+            payload = payload_cache.get(("chapter", chapter_num))
+            if payload is not None:
+                return payload_response(http_request, payload)
+        
         # Try Supabase for chapter verses
         try:
             from app.services.supabase_service import get_supabase_service
@@ -260,6 +256,14 @@ async def get_verses_by_chapter(
         
         verses = [VerseMetadataResponse(**verse) for verse in verses_data]
         
+        if payload_cache is not None and verses:
+            payload = payload_cache.put(("chapter", chapter_num), {
+                "chapter": chapter_num,
+                "verse_count": len(verses),
+                "verses": [verse.model_dump(mode="json") for verse in verses]
+            })
+            return payload_response(http_request, payload)
+        
         return {
             "chapter": chapter_num,
             "verse_count": len(verses),
@@ -0,0 +1,233 @@
+"""
+Admission control for the model-backed endpoints.
+
+Two limits shed excess load with 429 and a Retry-After header before it
+queues behind the CPU-bound models:
+- a token bucket per caller: the user ID when authenticated, otherwise the
+  client IP. Buckets live in a RateLimitStore: in-process by default, or a
+  shared Redis store (ADMISSION_STORE_URL) so the limit holds across
+  workers and pods.
+- a cap on in-flight inference calls per model in this worker. A call that
+  finds its model at the cap is rejected immediately instead of waiting.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+import logging
+import math
+import threading
+import time
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.core.auth import optional_principal
+from app.core.config import settings
+from app.core.principal import Principal
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(HTTPException):
+    """The request was shed; the client should retry after `retry_after` seconds."""
+    def __init__(self, detail: str, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class RateLimitStore(ABC):
+    """Token bucket storage; implementations must update a bucket atomically."""
+
+    @abstractmethod
+    async def take(self, key: str, rate_per_second: float, burst: int, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens from a bucket.
+
+        Args:
+            key: Bucket key
+            rate_per_second: Refill rate
+            burst: Bucket capacity (a new bucket starts full)
+            cost: Tokens needed by the request
+
+        Returns:
+            0 if the tokens were taken, otherwise seconds until they are available
+        """
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Per-process buckets in LRU order; each worker enforces its own limit."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate_per_second: float, burst: int, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - updated_at) * rate_per_second)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate_per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+# Token bucket in one round trip; timestamps come from the Redis server so pods need not agree on time
+_REDIS_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(now - updated_at, 0) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Buckets shared by all workers and pods through Redis (requires the `redis` package)."""
+
+    def __init__(self, url: str, prefix: str = "admission:"):
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._take = self._client.register_script(_REDIS_TAKE_SCRIPT)
+
+    async def take(self, key: str, rate_per_second: float, burst: int, cost: float = 1.0) -> float:
+        wait = await self._take(keys=[self.prefix + key], args=[rate_per_second, burst, cost])
+        return float(wait)
+
+
+class AdmissionController:
+    """Per-caller rate limiting and per-model in-flight caps."""
+
+    def __init__(self, store: Optional[RateLimitStore] = None):
+        """
+        Args:
+            store: Token bucket storage (default: in-process)
+        """
+        self.store = store or InMemoryRateLimitStore()
+        self.rate_per_second = settings.ADMISSION_RATE_PER_MINUTE / 60
+        self.burst = settings.ADMISSION_BURST
+        self.model_limits: Dict[str, int] = {
+            "intent": settings.ADMISSION_MAX_INFLIGHT_INTENT,
+            "emotion": settings.ADMISSION_MAX_INFLIGHT_EMOTION,
+            "embedding": settings.ADMISSION_MAX_INFLIGHT_EMBEDDING,
+        }
+        self._inflight: Dict[str, int] = {model: 0 for model in self.model_limits}
+        self.counters = {"admitted": 0, "rate_limited": 0, "shed": 0, "store_errors": 0}
+
+    async def check_rate(self, key: str) -> None:
+        """
+        Take a token from a caller's bucket.
+
+        Args:
+            key: Caller key ("user:<id>" or "ip:<address>")
+
+        Raises:
+            AdmissionRejected: If the bucket is empty
+        """
+        try:
+            wait = await self.store.take(key, self.rate_per_second, self.burst)
+        except Exception as e:
+            # An unreachable shared store must not take the API down with it
+            self.counters["store_errors"] += 1
+            logger.warning(f"Rate limit store unavailable, admitting request: {e}")
+            return
+        if wait > 0:
+            self.counters["rate_limited"] += 1
+            raise AdmissionRejected("Too many requests, please slow down", wait)
+        self.counters["admitted"] += 1
+
+    @asynccontextmanager
+    async def model_slot(self, model: str):
+        """
+        Hold one of a model's in-flight slots for the duration of an inference call.
+
+        Args:
+            model: Model name ("intent", "emotion" or "embedding")
+
+        Raises:
+            AdmissionRejected: If the model is already at its cap
+        """
+        limit = self.model_limits.get(model) if settings.ADMISSION_ENABLED else None
+        if limit is not None and self._inflight[model] >= limit:
+            self.counters["shed"] += 1
+            raise AdmissionRejected(
+                f"The {model} model is at capacity, please retry shortly",
+                settings.ADMISSION_RETRY_AFTER_SECONDS
+            )
+        if limit is not None:
+            self._inflight[model] += 1
+        try:
+            yield
+        finally:
+            if limit is not None:
+                self._inflight[model] -= 1
+
+    def stats(self) -> Dict:
+        """In-flight calls per model and admission counters for health checks."""
+        return {
+            "store": type(self.store).__name__,
+            "inflight": dict(self._inflight),
+            "limits": dict(self.model_limits),
+            **self.counters,
+        }
+
+
+# Singleton instance
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get or create the singleton admission controller with the configured store."""
+    global _admission_controller
+    if _admission_controller is None:
+        store = RedisRateLimitStore(settings.ADMISSION_STORE_URL) if settings.ADMISSION_STORE_URL else None
+        _admission_controller = AdmissionController(store)
+    return _admission_controller
+
+
+def client_key(request: Request, principal: Optional[Principal]) -> str:
+    """Rate limit key of a caller: the user when authenticated, otherwise the client IP."""
+    if principal is not None:
+        return f"user:{principal.id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def admit_request(
+    request: Request,
+    principal: Optional[Principal] = Depends(optional_principal)
+) -> None:
+    """
+    Dependency that rate-limits the caller of a model-backed endpoint.
+
+    Raises:
+        AdmissionRejected: 429 with Retry-After if the caller's bucket is empty
+    """
+    if not settings.ADMISSION_ENABLED:
+        return
+    await get_admission_controller().check_rate(client_key(request, principal))
@@ -3,13 +3,17 @@ Authentication middleware and utilities for Firebase JWT token verification.
 """
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Union
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.firebase import firebase_service
-from app.db.database import get_db
+from app.core.principal import Principal, get_principal_cache
+from app.db.async_database import get_async_db
 from app.models.user import User
+from app.services.activity_tracker import get_activity_tracker
 
 
 # Security scheme for Bearer token
@@ -62,7 +66,7 @@ async def verify_firebase_token(
 
 async def get_current_user(
     token: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Get current authenticated user from database.
@@ -87,7 +91,7 @@ async def get_current_user(
             raise AuthenticationError("Invalid token: missing user ID")
         
         # Try to get existing user
-        user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
+        user = await db.scalar(select(User).where(User.firebase_uid == firebase_uid))
         
         if not user:
             # Create new user on first login
@@ -99,24 +103,23 @@ async def get_current_user(
                 preferences={}
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             print(f"Created new user: {firebase_uid} ({email})")
         else:
-            # Update last active timestamp
-            user.last_active = datetime.utcnow()
-            db.commit()
+            # Record activity; last_active is written in periodic batches
+            get_activity_tracker().touch(user.id)
         
         return user
     
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise AuthenticationError(f"User authentication failed: {str(e)}")
 
 
 async def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     """
     Get current user if authenticated, otherwise return None.
@@ -143,12 +146,11 @@ async def get_optional_user(
             return None
         
         # Get user from database
-        user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
+        user = await db.scalar(select(User).where(User.firebase_uid == firebase_uid))
         
         if user:
-            # Update last active timestamp
-            user.last_active = datetime.utcnow()
-            db.commit()
+            # Record activity; last_active is written in periodic batches
+            get_activity_tracker().touch(user.id)
         
         return user
     
@@ -156,6 +158,74 @@ async def get_optional_user(
         return None
 
 
+async def get_current_principal(
+    token: dict = Depends(verify_firebase_token),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Get the cached identity of the authenticated user.
+    Loads (or creates) the user only when the principal is not cached.
+    
+    Args:
+        token: Decoded Firebase token
+        db: Database session (not used on a cache hit)
+        
+    Returns:
+        Principal of the current user
+        
+    Raises:
+        AuthenticationError: If user creation/retrieval fails
+    """
+    principal = get_principal_cache().get(token.get("uid") or "")
+    if principal is not None:
+        # Record activity; last_active is written in periodic batches
+        get_activity_tracker().touch(principal.id)
+        return principal
+    
+    user = await get_current_user(token, db)
+    principal = Principal.from_user(user)
+    get_principal_cache().put(principal)
+    return principal
+
+
+async def get_optional_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[Principal]:
+    """
+    Get the cached identity of the user if authenticated, otherwise None.
+    
+    Args:
+        credentials: Optional HTTP Bearer token credentials
+        db: Database session (not used on a cache hit)
+        
+    Returns:
+        Principal if authenticated, None otherwise
+    """
+    if not credentials:
+        return None
+    
+    try:
+        token = firebase_service.verify_token(credentials.credentials)
+        if not token or not token.get("uid"):
+            return None
+        
+        principal = get_principal_cache().get(token["uid"])
+        if principal is None:
+            user = await db.scalar(select(User).where(User.firebase_uid == token["uid"]))
+            if not user:
+                return None
+            principal = Principal.from_user(user)
+            get_principal_cache().put(principal)
+        
+        # Record activity; last_active is written in periodic batches
+        get_activity_tracker().touch(principal.id)
+        return principal
+    
+    except Exception:
+        return None
+
+
 def require_auth(user: User = Depends(get_current_user)) -> User:
     """
     Dependency that requires authentication.
@@ -184,8 +254,57 @@ def optional_auth(user: Optional[User] = Depends(get_optional_user)) -> Optional
     return user
 
 
+def require_principal(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """
+    Dependency that requires authentication, without loading the user row.
+    Use this for protected endpoints that only need the user's identity.
+    
+    Args:
+        principal: Current authenticated user's principal
+        
+    Returns:
+        Principal of the current user
+    """
+    return principal
+
+
+def optional_principal(principal: Optional[Principal] = Depends(get_optional_principal)) -> Optional[Principal]:
+    """
+    Dependency for optional authentication, without loading the user row.
+    
+    Args:
+        principal: Current user's principal if authenticated, None otherwise
+        
+    Returns:
+        Principal or None
+    """
+    return principal
+
+
+async def require_admin(token: dict = Depends(verify_firebase_token)) -> dict:
+    """
+    Dependency that requires an administrator (a Firebase UID listed in ADMIN_FIREBASE_UIDS).
+    
+    Args:
+        token: Decoded Firebase token
+        
+    Returns:
+        Decoded Firebase token of the administrator
+        
+    Raises:
+        HTTPException: 403 if the user is not an administrator
+    """
+    admin_uids = {uid.strip() for uid in settings.ADMIN_FIREBASE_UIDS.split(",") if uid.strip()}
+    if token.get("uid") not in admin_uids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required"
+        )
+    return token
+
+
 # Utility functions for checking user permissions
-def check_user_access(current_user: User, target_user_id: str) -> bool:
+def check_user_access(current_user: Union[User, Principal], target_user_id: str) -> bool:
     """
     Check if current user has access to target user's data.
     
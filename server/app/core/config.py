@@ -29,16 +29,131 @@ class Settings(BaseSettings):
     
     # Firebase
     FIREBASE_CREDENTIALS_PATH: str = os.getenv("FIREBASE_CREDENTIALS_PATH", "")
+    # Verified ID token cache (revocation window = max age) and pinned signing keys
+    AUTH_TOKEN_CACHE_ENABLED: bool = os.getenv("AUTH_TOKEN_CACHE_ENABLED", "true").lower() == "true"
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    AUTH_TOKEN_CACHE_MAX_AGE_SECONDS: float = float(os.getenv("AUTH_TOKEN_CACHE_MAX_AGE_SECONDS", "300"))
+    AUTH_PINNED_KEYS_ENABLED: bool = os.getenv("AUTH_PINNED_KEYS_ENABLED", "true").lower() == "true"
+    # Firebase UIDs allowed to use the admin API (comma-separated)
+    ADMIN_FIREBASE_UIDS: str = os.getenv("ADMIN_FIREBASE_UIDS", "")
     
     # Model Settings
     EMOTION_MODEL: str = "SamLowe/roberta-base-go_emotions-onnx"
     EMOTION_MODEL_FILE: str = "onnx/model_quantized.onnx"
     EMBEDDING_MODEL: str = "all-mpnet-base-v2"
     LLM_MODEL: str = "gemini-2.0-flash"  # Updated model name
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "gemini")  # gemini or fake (load testing)
+    LLM_CONTEXT_CACHE_ENABLED: bool = os.getenv("LLM_CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CONTEXT_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CONTEXT_CACHE_TTL_SECONDS", "3600"))
     INTENT_MODEL: str = os.getenv("INTENT_MODEL", "facebook/bart-large-mnli")
     
+    # Verse Search Backend (chroma: HNSW, exact: in-memory NumPy scan, hybrid: exact + BM25)
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "chroma")
+    HYBRID_LEXICAL_WEIGHT: float = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "0.3"))
+    
+    # Verse Index Compression (reduction: none/truncate/pca, quantization: none/int8; chroma and hybrid only, exact stays full precision)
+    EMBEDDING_REDUCTION: str = os.getenv("EMBEDDING_REDUCTION", "none")
+    EMBEDDING_REDUCED_DIM: int = int(os.getenv("EMBEDDING_REDUCED_DIM", "256"))
+    EMBEDDING_QUANTIZATION: str = os.getenv("EMBEDDING_QUANTIZATION", "none")
+    EMBEDDING_RESCORE_CANDIDATES: int = int(os.getenv("EMBEDDING_RESCORE_CANDIDATES", "50"))
+    
+    # Fake LLM backend (load testing without Gemini quota)
+    FAKE_LLM_LATENCY_MS: float = float(os.getenv("FAKE_LLM_LATENCY_MS", "400"))
+    FAKE_LLM_TOKENS_PER_SECOND: float = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "80"))
+    FAKE_LLM_OUTPUT_TOKENS: int = int(os.getenv("FAKE_LLM_OUTPUT_TOKENS", "250"))
+    
+    # LLM Client (per-call deadline, concurrency cap, retries, circuit breaker)
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BACKOFF_SECONDS: float = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    LLM_CIRCUIT_RESET_SECONDS: float = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+    
+    # Admission control for model-backed endpoints (token bucket per user/IP, in-flight cap per model)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_RATE_PER_MINUTE: float = float(os.getenv("ADMISSION_RATE_PER_MINUTE", "30"))
+    ADMISSION_BURST: int = int(os.getenv("ADMISSION_BURST", "10"))
+    ADMISSION_MAX_INFLIGHT_INTENT: int = int(os.getenv("ADMISSION_MAX_INFLIGHT_INTENT", "4"))
+    ADMISSION_MAX_INFLIGHT_EMOTION: int = int(os.getenv("ADMISSION_MAX_INFLIGHT_EMOTION", "4"))
+    ADMISSION_MAX_INFLIGHT_EMBEDDING: int = int(os.getenv("ADMISSION_MAX_INFLIGHT_EMBEDDING", "4"))
+    ADMISSION_RETRY_AFTER_SECONDS: float = float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+    ADMISSION_STORE_URL: str = os.getenv("ADMISSION_STORE_URL", "")  # redis://... shares buckets across workers
+    
+    # Degradation ladder for /chat under load (heuristic intent -> cached retrieval -> template reflection)
+    DEGRADATION_ENABLED: bool = os.getenv("DEGRADATION_ENABLED", "true").lower() == "true"
+    DEGRADATION_MAX_INFLIGHT: int = int(os.getenv("DEGRADATION_MAX_INFLIGHT", "32"))
+    DEGRADATION_LATENCY_SLO_MS: float = float(os.getenv("DEGRADATION_LATENCY_SLO_MS", "5000"))
+    DEGRADATION_RECOVER_RATIO: float = float(os.getenv("DEGRADATION_RECOVER_RATIO", "0.6"))
+    DEGRADATION_ESCALATE_SECONDS: float = float(os.getenv("DEGRADATION_ESCALATE_SECONDS", "5"))
+    DEGRADATION_RECOVER_SECONDS: float = float(os.getenv("DEGRADATION_RECOVER_SECONDS", "30"))
+    DEGRADATION_WINDOW_SECONDS: float = float(os.getenv("DEGRADATION_WINDOW_SECONDS", "30"))
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "1000"))
+    
+    # Pre-serialized verse and chapter responses (orjson bytes plus gzip/brotli variants)
+    VERSE_PAYLOAD_CACHE_ENABLED: bool = os.getenv("VERSE_PAYLOAD_CACHE_ENABLED", "true").lower() == "true"
+    VERSE_PAYLOAD_CACHE_MAX_ENTRIES: int = int(os.getenv("VERSE_PAYLOAD_CACHE_MAX_ENTRIES", "1000"))
+    VERSE_PAYLOAD_MAX_AGE_SECONDS: int = int(os.getenv("VERSE_PAYLOAD_MAX_AGE_SECONDS", "86400"))
+    
+    # Single-flight inference (identical concurrent intent/emotion/embedding calls share one computation)
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    
+    # Casual chat response cache (exact + embedding-similarity matching)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "500"))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = float(os.getenv("RESPONSE_CACHE_SIMILARITY_THRESHOLD", "0.9"))
+    RESPONSE_CACHE_VARIANTS: int = int(os.getenv("RESPONSE_CACHE_VARIANTS", "3"))
+    RESPONSE_CACHE_MAX_HISTORY: int = int(os.getenv("RESPONSE_CACHE_MAX_HISTORY", "2"))  # served only; stored replies have no history
+    
+    # Cached principals (firebase_uid -> user id and profile), invalidated by PUT/DELETE /auth/me
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "300"))
+    
+    # Coalesced last_active updates (at most one write per user per interval)
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("ACTIVITY_FLUSH_INTERVAL_SECONDS", "60"))
+    ACTIVITY_FLUSH_BATCH_SIZE: int = int(os.getenv("ACTIVITY_FLUSH_BATCH_SIZE", "500"))
+    
+    # Analytics snapshots (stats + patterns per user and time range), invalidated on new mood logs
+    ANALYTICS_CACHE_ENABLED: bool = os.getenv("ANALYTICS_CACHE_ENABLED", "true").lower() == "true"
+    ANALYTICS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "1000"))
+    ANALYTICS_CACHE_TTL_SECONDS: float = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
+    
+    # Reflection prompt token budget (request prompt only; the persona is a cached system instruction)
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+    PROMPT_USER_INPUT_MAX_TOKENS: int = int(os.getenv("PROMPT_USER_INPUT_MAX_TOKENS", "600"))
+    PROMPT_HISTORY_MESSAGE_MAX_TOKENS: int = int(os.getenv("PROMPT_HISTORY_MESSAGE_MAX_TOKENS", "80"))
+    
+    # Background persistence of chat messages and mood logs (JSONL spool when the DB is unavailable)
+    PERSISTENCE_SPOOL_PATH: str = os.getenv("PERSISTENCE_SPOOL_PATH", "./persistence_spool.jsonl")
+    PERSISTENCE_QUEUE_MAX_SIZE: int = int(os.getenv("PERSISTENCE_QUEUE_MAX_SIZE", "1000"))
+    PERSISTENCE_MAX_RETRIES: int = int(os.getenv("PERSISTENCE_MAX_RETRIES", "3"))
+    PERSISTENCE_RETRY_BACKOFF_SECONDS: float = float(os.getenv("PERSISTENCE_RETRY_BACKOFF_SECONDS", "0.5"))
+    PERSISTENCE_SPOOL_REPLAY_SECONDS: float = float(os.getenv("PERSISTENCE_SPOOL_REPLAY_SECONDS", "30"))
+    PERSISTENCE_SHUTDOWN_TIMEOUT_SECONDS: float = float(os.getenv("PERSISTENCE_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+    
+    # Health checks (probes read statuses cached by a background checker; only /health/deep runs inference)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "15"))
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "5"))
+    HEALTH_DEEP_CHECK_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_DEEP_CHECK_TIMEOUT_SECONDS", "30"))
+    
+    # Latency metrics (per-span histograms at GET /metrics; per-request breakdown in the Server-Timing header)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    
+    # On-demand sampling profiler (admin API; idle unless a profile is running)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+    PROFILING_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "10"))
+    PROFILING_MAX_SECONDS: float = float(os.getenv("PROFILING_MAX_SECONDS", "120"))
+    
     # Conversation Settings
     CONVERSATION_MEMORY_WINDOW: int = 5
+    
+    # Rolling conversation summary (prompts carry the summary plus the most recent messages)
+    CONVERSATION_SUMMARY_ENABLED: bool = os.getenv("CONVERSATION_SUMMARY_ENABLED", "true").lower() == "true"
+    CONVERSATION_SUMMARY_MAX_TOKENS: int = int(os.getenv("CONVERSATION_SUMMARY_MAX_TOKENS", "200"))
+    CONVERSATION_SUMMARY_MAX_CONCURRENCY: int = int(os.getenv("CONVERSATION_SUMMARY_MAX_CONCURRENCY", "4"))  # own LLM client and breaker
+    CONVERSATION_RECENT_MESSAGES: int = int(os.getenv("CONVERSATION_RECENT_MESSAGES", "2"))
     EMOTION_CONFIDENCE_THRESHOLD: float = 0.3
     INTENT_CONFIDENCE_THRESHOLD: float = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.6"))
     
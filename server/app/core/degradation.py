@@ -0,0 +1,163 @@
+"""
+Load-aware degradation ladder for the chat pipeline.
+
+Under saturation /chat steps down to cheaper paths before requests start
+timing out, instead of waiting for individual stages to fail:
+
+    0 normal               full pipeline
+    1 heuristic_intent     keyword heuristics instead of the BART intent model
+    2 cached_retrieval     + verses from the retrieval cache instead of a vector search
+    3 template_reflection  + template reflections instead of the LLM
+
+Pressure is the larger of in-flight chat requests over
+DEGRADATION_MAX_INFLIGHT and recent p95 latency over DEGRADATION_LATENCY_SLO_MS.
+The ladder has hysteresis: it climbs one level at most every
+DEGRADATION_ESCALATE_SECONDS while pressure is at or above 1, and descends one
+level only after pressure has stayed below DEGRADATION_RECOVER_RATIO for
+DEGRADATION_RECOVER_SECONDS. Levels are per worker.
+"""
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NORMAL = 0
+HEURISTIC_INTENT = 1
+CACHED_RETRIEVAL = 2
+TEMPLATE_REFLECTION = 3
+
+LEVEL_NAMES = {
+    NORMAL: "normal",
+    HEURISTIC_INTENT: "heuristic_intent",
+    CACHED_RETRIEVAL: "cached_retrieval",
+    TEMPLATE_REFLECTION: "template_reflection",
+}
+
+# Fewer recent requests than this do not produce a latency signal
+_MIN_LATENCY_SAMPLES = 10
+
+
+class DegradationController:
+    """Tracks chat load and picks the degradation level for new requests."""
+
+    def __init__(
+        self,
+        max_inflight: Optional[int] = None,
+        latency_slo_ms: Optional[float] = None,
+        recover_ratio: Optional[float] = None,
+        escalate_seconds: Optional[float] = None,
+        recover_seconds: Optional[float] = None,
+        window_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            max_inflight: In-flight chat requests at which pressure reaches 1
+            latency_slo_ms: p95 latency at which pressure reaches 1
+            recover_ratio: Pressure below which the ladder may step down
+            escalate_seconds: Minimum time between two steps up
+            recover_seconds: Time pressure must stay low before each step down
+            window_seconds: Age of the latency samples used for the p95
+        """
+        self.max_inflight = max_inflight or settings.DEGRADATION_MAX_INFLIGHT
+        self.latency_slo_ms = latency_slo_ms or settings.DEGRADATION_LATENCY_SLO_MS
+        self.recover_ratio = recover_ratio or settings.DEGRADATION_RECOVER_RATIO
+        self.escalate_seconds = escalate_seconds or settings.DEGRADATION_ESCALATE_SECONDS
+        self.recover_seconds = recover_seconds or settings.DEGRADATION_RECOVER_SECONDS
+        self.window_seconds = window_seconds or settings.DEGRADATION_WINDOW_SECONDS
+
+        self.level = NORMAL
+        self._inflight = 0
+        self._latencies: Deque[Tuple[float, float]] = deque(maxlen=1000)
+        self._last_change = float("-inf")
+        self._calm_since: Optional[float] = None
+        self._lock = threading.Lock()
+        self.transitions = 0
+        self.served = {name: 0 for name in LEVEL_NAMES.values()}
+
+    @contextmanager
+    def track(self):
+        """Count a chat request as in flight and record its latency."""
+        with self._lock:
+            self._inflight += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            now = time.monotonic()
+            with self._lock:
+                self._inflight -= 1
+                self._latencies.append((now, (now - start) * 1000))
+
+    def current_level(self) -> int:
+        """Re-evaluate the ladder and return the level for a new request."""
+        if not settings.DEGRADATION_ENABLED:
+            return NORMAL
+        now = time.monotonic()
+        with self._lock:
+            pressure = self._pressure(now)
+            previous = self.level
+            if pressure >= 1.0:
+                self._calm_since = None
+                if self.level < TEMPLATE_REFLECTION and now - self._last_change >= self.escalate_seconds:
+                    self.level += 1
+            elif pressure < self.recover_ratio:
+                if self._calm_since is None:
+                    self._calm_since = now
+                if (
+                    self.level > NORMAL
+                    and now - self._calm_since >= self.recover_seconds
+                    and now - self._last_change >= self.recover_seconds
+                ):
+                    self.level -= 1
+                    self._calm_since = now
+            else:
+                self._calm_since = None
+
+            if self.level != previous:
+                self._last_change = now
+                self.transitions += 1
+                logger.warning(
+                    f"Chat degradation {LEVEL_NAMES[previous]} -> {LEVEL_NAMES[self.level]} "
+                    f"(pressure {pressure:.2f})"
+                )
+            self.served[LEVEL_NAMES[self.level]] += 1
+            return self.level
+
+    def _pressure(self, now: float) -> float:
+        """Load relative to the thresholds (caller holds the lock)."""
+        inflight_pressure = self._inflight / self.max_inflight
+        recent = sorted(latency for finished_at, latency in self._latencies if now - finished_at <= self.window_seconds)
+        latency_pressure = 0.0
+        if len(recent) >= _MIN_LATENCY_SAMPLES:
+            latency_pressure = recent[int(len(recent) * 0.95) - 1] / self.latency_slo_ms
+        return max(inflight_pressure, latency_pressure)
+
+    def stats(self) -> Dict:
+        """Current level, load and counters for health checks."""
+        with self._lock:
+            return {
+                "level": self.level,
+                "mode": LEVEL_NAMES[self.level],
+                "pressure": round(self._pressure(time.monotonic()), 2),
+                "inflight": self._inflight,
+                "transitions": self.transitions,
+                "served": dict(self.served),
+            }
+
+
+# Singleton instance
+_degradation_controller: Optional[DegradationController] = None
+
+
+def get_degradation_controller() -> DegradationController:
+    """Get or create the singleton degradation controller."""
+    global _degradation_controller
+    if _degradation_controller is None:
+        _degradation_controller = DegradationController()
+    return _degradation_controller
@@ -1,5 +1,10 @@
 """
 Firebase Admin SDK configuration and initialization.
+
+Verified ID tokens are cached (see app/core/token_cache.py), so repeat
+requests with the same token skip signature verification. Cache misses are
+verified locally against pinned Google signing keys, falling back to the
+Admin SDK when the keys are unavailable.
 """
 import firebase_admin
 from firebase_admin import credentials, auth
@@ -7,12 +12,24 @@ from typing import Optional
 import os
 import json
 from .config import settings
+from .token_cache import SigningKeyCache, VerifiedTokenCache
+
+
+class SigningKeyUnavailable(Exception):
+    """The token's signing key is not pinned; verify through the Admin SDK instead."""
+
 
 class FirebaseService:
     """Firebase Admin SDK service for authentication."""
     
     def __init__(self):
         self._app: Optional[firebase_admin.App] = None
+        self.token_cache: Optional[VerifiedTokenCache] = (
+            VerifiedTokenCache() if settings.AUTH_TOKEN_CACHE_ENABLED else None
+        )
+        self.signing_keys: Optional[SigningKeyCache] = (
+            SigningKeyCache() if settings.AUTH_PINNED_KEYS_ENABLED else None
+        )
         self._initialize_firebase()
     
     def _initialize_firebase(self):
@@ -46,6 +63,9 @@ class FirebaseService:
         """
         Verify Firebase ID token and return decoded token.
         
+        Tokens verified before are served from the token cache until their
+        expiry or the cache's revocation window.
+        
         Args:
             id_token: Firebase ID token from client
             
@@ -55,12 +75,78 @@ class FirebaseService:
         if not self._app:
             raise Exception("Firebase not initialized")
         
+        if self.token_cache is not None:
+            decoded_token = self.token_cache.get(id_token)
+            if decoded_token is not None:
+                return decoded_token
+        
         try:
-            decoded_token = auth.verify_id_token(id_token)
-            return decoded_token
+            decoded_token = self._verify_signature(id_token)
         except Exception as e:
             print(f"Token verification failed: {e}")
             return None
+        
+        if self.token_cache is not None:
+            self.token_cache.put(id_token, decoded_token)
+        return decoded_token
+    
+    def _verify_signature(self, id_token: str) -> dict:
+        """Verify with the pinned signing keys when possible, otherwise with the Admin SDK."""
+        # Emulator tokens are unsigned and only the Admin SDK accepts them
+        emulated = bool(os.getenv("FIREBASE_AUTH_EMULATOR_HOST"))
+        if self.signing_keys is not None and self._app.project_id and not emulated:
+            try:
+                return self._verify_with_pinned_keys(id_token)
+            except SigningKeyUnavailable:
+                pass
+        return auth.verify_id_token(id_token)
+    
+    def _verify_with_pinned_keys(self, id_token: str) -> dict:
+        """
+        Verify an ID token locally, with the same checks as auth.verify_id_token.
+        
+        Raises:
+            SigningKeyUnavailable: If the token's key ID is not pinned
+            ValueError: If the token is malformed, expired or has invalid claims
+        """
+        from google.auth import jwt
+        
+        header = jwt.decode_header(id_token)
+        if header.get("alg") != "RS256":
+            raise ValueError(f"Unexpected token algorithm: {header.get('alg')}")
+        
+        kid = header.get("kid")
+        certs = self.signing_keys.certs(kid)
+        if kid not in certs:
+            raise SigningKeyUnavailable(kid)
+        
+        project_id = self._app.project_id
+        claims = jwt.decode(id_token, certs=certs, audience=project_id)
+        if claims.get("iss") != f"https://securetoken.google.com/{project_id}":
+            raise ValueError("Token has an incorrect issuer")
+        subject = claims.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise ValueError("Token has an invalid subject")
+        
+        claims["uid"] = subject
+        return claims
+    
+    def prefetch_signing_keys(self) -> None:
+        """Fetch and pin the signing keys before the first request needs them."""
+        if self._app and self.signing_keys is not None:
+            self.signing_keys.refresh()
+    
+    def invalidate_user(self, uid: str) -> None:
+        """Forget cached tokens of a user, e.g. once the account is deleted."""
+        if self.token_cache is not None:
+            self.token_cache.invalidate_uid(uid)
+    
+    def cache_stats(self) -> dict:
+        """Token cache hit rate and pinned key status for health checks."""
+        return {
+            "token_cache": self.token_cache.stats() if self.token_cache is not None else None,
+            "signing_keys": self.signing_keys.stats() if self.signing_keys is not None else None
+        }
     
     def get_user(self, uid: str) -> Optional[dict]:
         """
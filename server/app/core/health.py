@@ -0,0 +1,338 @@
+"""
+Tiered health checks.
+
+Orchestrator probes hit health endpoints every few seconds per pod, so they
+must not run inference or queries themselves:
+- liveness (/health/live): the process is serving requests; no checks at all
+- readiness (/health/ready) and the per-router /health endpoints: read the
+  component statuses cached by a background checker, which runs cheap checks
+  (SELECT 1, whether models are loaded, LLM circuit state, persistence
+  backlog) every HEALTH_CHECK_INTERVAL_SECONDS
+- deep (/health/deep): requested by an administrator; runs real work against each
+  component (emotion inference, a verse search, an LLM reflection, counts)
+
+Checks never load models: a model that has not been loaded yet (services
+load lazily on first use) is reported as "not_loaded", which does not make
+the pod unready.
+"""
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+UNHEALTHY = "unhealthy"
+NOT_LOADED = "not_loaded"
+UNKNOWN = "unknown"
+
+# A check returns its status and details; raising marks the component unhealthy
+Check = Callable[[], Awaitable[Tuple[str, Dict[str, Any]]]]
+
+
+class ComponentStatus:
+    """Result of the latest check of one component."""
+
+    __slots__ = ("status", "details", "error", "checked_at", "latency_ms")
+
+    def __init__(
+        self,
+        status: str,
+        details: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        latency_ms: float = 0.0
+    ):
+        self.status = status
+        self.details = details or {}
+        self.error = error
+        self.checked_at = datetime.utcnow()
+        self.latency_ms = latency_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "status": self.status,
+            "checked_at": self.checked_at.isoformat(),
+            "latency_ms": round(self.latency_ms, 1),
+            **self.details,
+        }
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+class _Component:
+    __slots__ = ("check", "deep_check", "critical")
+
+    def __init__(self, check: Check, deep_check: Optional[Check], critical: bool):
+        self.check = check
+        self.deep_check = deep_check
+        self.critical = critical
+
+
+class HealthChecker:
+    """Runs component checks in the background and serves their cached results."""
+
+    def __init__(
+        self,
+        interval_seconds: Optional[float] = None,
+        timeout_seconds: Optional[float] = None,
+        deep_timeout_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            interval_seconds: Time between background check rounds
+            timeout_seconds: Timeout of one cheap check
+            deep_timeout_seconds: Timeout of one deep check
+        """
+        self.interval_seconds = interval_seconds or settings.HEALTH_CHECK_INTERVAL_SECONDS
+        self.timeout_seconds = timeout_seconds or settings.HEALTH_CHECK_TIMEOUT_SECONDS
+        self.deep_timeout_seconds = deep_timeout_seconds or settings.HEALTH_DEEP_CHECK_TIMEOUT_SECONDS
+
+        self._components: Dict[str, _Component] = {}
+        self._statuses: Dict[str, ComponentStatus] = {}
+        self._runner: Optional[asyncio.Task] = None
+        self._deep_lock: Optional[asyncio.Lock] = None
+        self.rounds = 0
+
+    def register(self, name: str, check: Check, deep_check: Optional[Check] = None, critical: bool = False) -> None:
+        """
+        Add a component.
+
+        Args:
+            name: Component name used in responses
+            check: Cheap check run in the background
+            deep_check: Check run only on explicit deep health requests (default: check)
+            critical: Whether the pod is unready while the component is unhealthy
+        """
+        self._components[name] = _Component(check, deep_check, critical)
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+
+    def start(self) -> None:
+        """Start background checks on the running event loop."""
+        if self.running:
+            return
+        self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.running:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+        self._runner = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_checks()
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_checks(self) -> None:
+        """Run every cheap check concurrently and cache the results."""
+        names = list(self._components)
+        results = await asyncio.gather(*(
+            self._timed(self._components[name].check, self.timeout_seconds) for name in names
+        ))
+        for name, status in zip(names, results):
+            previous = self._statuses.get(name)
+            if previous is not None and previous.status != status.status:
+                logger.warning(f"Health of {name} changed: {previous.status} -> {status.status}")
+            self._statuses[name] = status
+        self.rounds += 1
+
+    async def _timed(self, check: Check, timeout: float) -> ComponentStatus:
+        start = time.perf_counter()
+        try:
+            status, details = await asyncio.wait_for(check(), timeout=timeout)
+            return ComponentStatus(status, details, latency_ms=(time.perf_counter() - start) * 1000)
+        except asyncio.TimeoutError:
+            error = f"check timed out after {timeout}s"
+        except Exception as e:
+            error = str(e)
+        return ComponentStatus(UNHEALTHY, error=error, latency_ms=(time.perf_counter() - start) * 1000)
+
+    def component(self, name: str) -> Dict[str, Any]:
+        """Cached status of one component (never runs a check)."""
+        status = self._statuses.get(name)
+        return status.to_dict() if status is not None else {"status": UNKNOWN}
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Whether the pod should receive traffic, from cached statuses.
+
+        Returns:
+            (ready, body) where ready is False until the first check round
+            completes or while a critical component is unhealthy
+        """
+        components = {name: self.component(name) for name in self._components}
+        critical_failures = [
+            name for name, component in self._components.items()
+            if component.critical and components[name]["status"] in (UNHEALTHY, UNKNOWN)
+        ]
+        ready = self.rounds > 0 and not critical_failures
+        return ready, {
+            "status": _overall_status(components, critical_failures) if self.rounds else "starting",
+            "ready": ready,
+            "components": components,
+        }
+
+    async def deep_check(self, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Run deep checks now; concurrent requests are serialized.
+
+        Args:
+            names: Components to check (default: all)
+
+        Returns:
+            Overall status and fresh per-component results
+        """
+        if self._deep_lock is None:
+            self._deep_lock = asyncio.Lock()
+        names = [name for name in (names or self._components) if name in self._components]
+        async with self._deep_lock:
+            results = await asyncio.gather(*(
+                self._timed(self._components[name].deep_check or self._components[name].check, self.deep_timeout_seconds)
+                for name in names
+            ))
+        components = {name: status.to_dict() for name, status in zip(names, results)}
+        critical_failures = [
+            name for name in names
+            if self._components[name].critical and components[name]["status"] == UNHEALTHY
+        ]
+        return {"status": _overall_status(components, critical_failures), "components": components}
+
+
+def _overall_status(components: Dict[str, Dict[str, Any]], critical_failures: List[str]) -> str:
+    if critical_failures:
+        return UNHEALTHY
+    if any(component["status"] in (UNHEALTHY, DEGRADED, UNKNOWN) for component in components.values()):
+        return DEGRADED
+    return HEALTHY
+
+
+# Component checks. Service modules are imported lazily and their singletons
+# are inspected, not created, so cheap checks never load a model.
+
+async def _check_database() -> Tuple[str, Dict[str, Any]]:
+    from sqlalchemy import text
+    from app.db.async_database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT 1"))
+    return HEALTHY, {"connection": "active"}
+
+
+async def _deep_check_database() -> Tuple[str, Dict[str, Any]]:
+    from sqlalchemy import func, select
+    from app.db.async_database import AsyncSessionLocal
+    from app.models.emotion_log import EmotionLog
+
+    async with AsyncSessionLocal() as db:
+        total_logs = await db.scalar(select(func.count()).select_from(EmotionLog))
+    return HEALTHY, {"connection": "active", "total_emotion_logs": total_logs}
+
+
+async def _check_emotion_model() -> Tuple[str, Dict[str, Any]]:
+    from app.services import emotion_detection
+
+    loaded = emotion_detection._emotion_service is not None
+    return (HEALTHY if loaded else NOT_LOADED), {"model": settings.EMOTION_MODEL}
+
+
+async def _deep_check_emotion_model() -> Tuple[str, Dict[str, Any]]:
+    from app.services.emotion_detection import get_emotion_service
+
+    emotions = await run_in_threadpool(get_emotion_service().detect_emotion, "I am feeling good today")
+    return (HEALTHY if emotions else UNHEALTHY), {"model": settings.EMOTION_MODEL, "test_passed": bool(emotions)}
+
+
+async def _check_vector_search() -> Tuple[str, Dict[str, Any]]:
+    from app.services import vector_search
+
+    loaded = vector_search._vector_search_service is not None
+    return (HEALTHY if loaded else NOT_LOADED), {}
+
+
+async def _deep_check_vector_search() -> Tuple[str, Dict[str, Any]]:
+    from app.services.vector_search import get_vector_search_service
+
+    def search() -> Tuple[int, int]:
+        service = get_vector_search_service()
+        return len(service.search_verses("dharma", top_k=1)), service.collection.count()
+
+    found, verses_count = await run_in_threadpool(search)
+    return (HEALTHY if found else DEGRADED), {"test_passed": found > 0, "verses_count": verses_count}
+
+
+async def _check_llm() -> Tuple[str, Dict[str, Any]]:
+    from app.services.llm_client import get_llm_client, get_summary_llm_client
+
+    stats = get_llm_client().stats()
+    # Summaries run on their own client; an open summary circuit does not degrade chat
+    return (DEGRADED if stats["circuit_state"] == "open" else HEALTHY), {
+        "llm_client": stats,
+        "summary_llm_client": get_summary_llm_client().stats()
+    }
+
+
+async def _deep_check_llm() -> Tuple[str, Dict[str, Any]]:
+    from app.services.llm_client import get_llm_client
+    from app.services.reflection_generation import get_reflection_service
+
+    reflection = await get_reflection_service().generate_reflection_async(
+        user_input="Test message",
+        emotion_data={"label": "neutral", "confidence": 0.5, "emoji": "😐", "color": "#F3F4F6"},
+        verses=[{"id": "BG2.47", "shloka": "test", "eng_meaning": "test"}],
+        interaction_mode="wisdom"
+    )
+    return (HEALTHY if reflection else DEGRADED), {"test_passed": bool(reflection), "llm_client": get_llm_client().stats()}
+
+
+async def _check_persistence_queue() -> Tuple[str, Dict[str, Any]]:
+    from app.services.persistence_queue import get_persistence_queue
+
+    stats = get_persistence_queue().stats()
+    healthy = stats["running"] and not stats["spool_pending"]
+    return (HEALTHY if healthy else DEGRADED), stats
+
+
+async def _deep_check_supabase() -> Tuple[str, Dict[str, Any]]:
+    from app.services.supabase_service import get_supabase_service
+
+    verses_count = await run_in_threadpool(lambda: get_supabase_service().get_verse_count())
+    return HEALTHY, {"verses_count": verses_count}
+
+
+async def _check_supabase() -> Tuple[str, Dict[str, Any]]:
+    from app.services import supabase_service
+
+    loaded = supabase_service._supabase_service is not None
+    return (HEALTHY if loaded else NOT_LOADED), {}
+
+
+# Singleton instance
+_health_checker: Optional[HealthChecker] = None
+
+
+def get_health_checker() -> HealthChecker:
+    """Get or create the singleton health checker with the app's components."""
+    global _health_checker
+    if _health_checker is None:
+        _health_checker = HealthChecker()
+        _health_checker.register("database", _check_database, _deep_check_database, critical=True)
+        _health_checker.register("emotion_model", _check_emotion_model, _deep_check_emotion_model)
+        _health_checker.register("vector_search", _check_vector_search, _deep_check_vector_search)
+        _health_checker.register("llm", _check_llm, _deep_check_llm)
+        _health_checker.register("supabase", _check_supabase, _deep_check_supabase)
+        _health_checker.register("persistence_queue", _check_persistence_queue)
+    return _health_checker
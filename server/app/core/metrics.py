@@ -0,0 +1,142 @@
+"""
+In-process latency metrics for the chat pipeline.
+
+`span(name)` times a block of work anywhere in the code base (API handlers,
+services, background writers). Each duration is:
+- observed into a per-span histogram, exported in the Prometheus text
+  format by GET /metrics
+- added to the request's StageTimer when the block runs inside one of its
+  stages, so it shows up next to the stage in the `Server-Timing` header
+
+Histograms are per process; Prometheus sums them across workers and pods.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+import threading
+import time
+
+from app.core.config import settings
+
+METRIC_PREFIX = "geetamanthan"
+
+# Upper bounds in seconds, from in-memory lookups to slow LLM calls
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+# StageTimer of the stage currently executing in this request (see StageTimer.stage)
+current_timer: ContextVar = ContextVar("current_timer", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in seconds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.buckets, seconds)] += 1
+            self._sum += seconds
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """
+        Returns:
+            (cumulative count per bucket including +Inf, sum, count)
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total, running
+
+
+class MetricsRegistry:
+    """Latency histograms keyed by span name."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float) -> None:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram(self.buckets))
+        histogram.observe(seconds)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Count and mean (milliseconds) per span, for health checks and logs."""
+        result = {}
+        for name, histogram in sorted(self._histograms.items()):
+            _, total, count = histogram.snapshot()
+            result[name] = {"count": count, "mean_ms": round(total / count * 1000, 1) if count else 0.0}
+        return result
+
+    def render_prometheus(self) -> str:
+        """Format all histograms in the Prometheus text exposition format (0.0.4)."""
+        metric = f"{METRIC_PREFIX}_span_duration_seconds"
+        lines = [
+            f"# HELP {metric} Duration of instrumented pipeline spans.",
+            f"# TYPE {metric} histogram",
+        ]
+        for name, histogram in sorted(self._histograms.items()):
+            cumulative, total, count = histogram.snapshot()
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for bound, bucket_count in zip(self.buckets, cumulative):
+                lines.append(f'{metric}_bucket{{span="{label}",le="{bound}"}} {bucket_count}')
+            lines.append(f'{metric}_bucket{{span="{label}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{span="{label}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{span="{label}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+# Singleton instance
+_metrics_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get or create the singleton metrics registry."""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+    return _metrics_registry
+
+
+def record(name: str, seconds: float) -> None:
+    """
+    Record a duration measured by the caller.
+
+    Args:
+        name: Span name (e.g. "search.rerank")
+        seconds: Duration in seconds
+    """
+    if settings.METRICS_ENABLED:
+        get_metrics_registry().observe(name, seconds)
+    timer = current_timer.get()
+    if timer is not None:
+        timer.add_span(name, seconds * 1000)
+
+
+@contextmanager
+def span(name: str):
+    """Time a block and record it under `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
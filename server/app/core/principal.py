@@ -0,0 +1,109 @@
+"""
+Cached identity of authenticated users.
+
+Most endpoints only need the caller's user ID, yet every request looked the
+user up by firebase_uid and passed a live ORM object downstream. A Principal
+is the small, immutable subset of the user row those endpoints use; it is
+cached per firebase_uid so a request with a cached principal needs no user
+query at all.
+
+Entries expire after PRINCIPAL_CACHE_TTL_SECONDS and are invalidated when the
+profile is updated or the account deleted (PUT/DELETE /auth/me). The cache is
+per process, so another worker may serve a stale profile for up to the TTL.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Identity and display profile of an authenticated user."""
+
+    __slots__ = ("id", "firebase_uid", "email", "display_name")
+
+    id: uuid.UUID
+    firebase_uid: str
+    email: Optional[str]
+    display_name: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, firebase_uid=user.firebase_uid, email=user.email, display_name=user.display_name)
+
+
+class PrincipalCache:
+    """Bounded, TTL-based cache of principals keyed by firebase_uid, in LRU order."""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Maximum cached principals before LRU eviction
+            ttl_seconds: Lifetime of an entry
+        """
+        self.max_entries = max_entries or settings.PRINCIPAL_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.PRINCIPAL_CACHE_TTL_SECONDS
+
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, firebase_uid: str) -> Optional[Principal]:
+        """Cached principal of a Firebase user, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(firebase_uid)
+            if entry is not None and time.monotonic() >= entry[1]:
+                del self._entries[firebase_uid]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(firebase_uid)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, principal: Principal) -> None:
+        with self._lock:
+            self._entries[principal.firebase_uid] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(principal.firebase_uid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, firebase_uid: str) -> None:
+        """Drop a user's principal after their profile changed or was deleted."""
+        with self._lock:
+            self._entries.pop(firebase_uid, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and size for health checks."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get or create the singleton principal cache."""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache()
+    return _principal_cache
@@ -0,0 +1,241 @@
+"""
+On-demand sampling profiler for live workers.
+
+A profile samples the Python stacks of every thread in this worker from a
+background thread and aggregates them in the collapsed-stack format read by
+flamegraph.pl, speedscope and similar tools (`thread;frame;frame count`).
+
+Two modes, both started from the admin API:
+- duration: sample continuously for N seconds
+- route: sample only while the next K requests to a route are in flight.
+  Requests share the event loop thread, so samples taken during a targeted
+  request also include whatever concurrent requests were doing.
+
+Nothing runs while no profile is active: the sampler thread exists only for
+the duration of a profile, and the middleware's fast path is one attribute
+check per request.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames of threads parked waiting for work (idle thread pool workers)
+_IDLE_LEAVES = {("threading", "wait"), ("threading", "_wait_for_tstate_lock")}
+
+
+class ProfilerBusyError(Exception):
+    """Another profile is already running in this worker."""
+
+
+def _collapse(frame) -> Optional[str]:
+    """Root-to-leaf frame labels of a stack, or None if the thread is idle."""
+    labels = []
+    leaf = True
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        if leaf and (module, code.co_name) in _IDLE_LEAVES:
+            return None
+        leaf = False
+        labels.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class StackSampler:
+    """Samples all thread stacks at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, interval_seconds: float, gated: bool = False):
+        """
+        Args:
+            interval_seconds: Time between samples
+            gated: Only sample while at least one open() is outstanding
+        """
+        self.interval_seconds = interval_seconds
+        self.gated = gated
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+        self._open = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.stopped_at = time.time()
+
+    def open(self) -> None:
+        """Start sampling for a gated profile (one call per targeted request)."""
+        with self._lock:
+            self._open += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._open -= 1
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            if self.gated and self._open <= 0:
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = _collapse(frame)
+                if stack is not None:
+                    self.counts[f"{names.get(ident, ident)};{stack}"] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Aggregated stacks, one `stack count` line each, heaviest first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class RouteCapture:
+    """Gates a sampler on the next `count` requests to one path."""
+
+    def __init__(self, path: str, count: int, sampler: StackSampler):
+        self.path = path.rstrip("/") or "/"
+        self.remaining = count
+        self.completed = 0
+        self.count = count
+        self.sampler = sampler
+        self.done = asyncio.Event()
+
+    def claim(self, path: str) -> bool:
+        """Whether a request is one of the targeted ones; opens the sampler if so."""
+        if self.remaining <= 0 or (path.rstrip("/") or "/") != self.path:
+            return False
+        self.remaining -= 1
+        self.sampler.open()
+        return True
+
+    def release(self) -> None:
+        self.sampler.close()
+        self.completed += 1
+        if self.completed >= self.count:
+            self.done.set()
+
+
+class Profiler:
+    """Runs at most one profile at a time in this worker."""
+
+    def __init__(self, interval_seconds: Optional[float] = None):
+        """
+        Args:
+            interval_seconds: Time between stack samples
+        """
+        self.interval_seconds = interval_seconds or settings.PROFILING_SAMPLE_INTERVAL_MS / 1000
+        self.capture: Optional[RouteCapture] = None
+        self._busy = False
+
+    def _begin(self, gated: bool) -> StackSampler:
+        if self._busy:
+            raise ProfilerBusyError("A profile is already running in this worker")
+        self._busy = True
+        sampler = StackSampler(self.interval_seconds, gated=gated)
+        sampler.start()
+        return sampler
+
+    async def profile_for(self, seconds: float) -> StackSampler:
+        """
+        Sample every thread for a fixed time.
+
+        Args:
+            seconds: Profile duration
+
+        Returns:
+            The stopped sampler with its collapsed stacks
+        """
+        sampler = self._begin(gated=False)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+            self._busy = False
+        logger.info(f"Profiled worker {os.getpid()} for {seconds}s ({sampler.samples} samples)")
+        return sampler
+
+    async def profile_requests(self, path: str, count: int, timeout: float) -> StackSampler:
+        """
+        Sample while the next requests to a path are in flight.
+
+        Args:
+            path: Request path to profile (e.g. /api/v1/chat)
+            count: Number of requests to profile
+            timeout: Longest time to wait for them
+
+        Returns:
+            The stopped sampler; fewer requests than `count` were profiled if
+            the timeout expired first
+        """
+        sampler = self._begin(gated=True)
+        capture = self.capture = RouteCapture(path, count, sampler)
+        try:
+            await asyncio.wait_for(capture.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # Targeted requests still in flight are not waited for
+            self.capture = None
+            sampler.stop()
+            self._busy = False
+        logger.info(
+            f"Profiled {capture.completed}/{count} requests to {path} "
+            f"in worker {os.getpid()} ({sampler.samples} samples)"
+        )
+        return sampler
+
+    def filename(self) -> str:
+        return f"profile-{os.getpid()}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.collapsed"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that opens the route capture's sampler around targeted requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        capture = get_profiler().capture
+        if capture is None or scope["type"] != "http" or not capture.claim(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            capture.release()
+
+
+# Singleton instance
+_profiler: Optional[Profiler] = None
+
+
+def get_profiler() -> Profiler:
+    """Get or create the singleton profiler."""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
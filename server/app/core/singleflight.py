@@ -0,0 +1,90 @@
+"""
+Single-flight deduplication of identical concurrent calls.
+
+Suggestion-chip prompts reach the server as bursts of requests with the same
+text. A SingleFlight group lets the first call for a key (the leader) run the
+computation while identical calls that arrive before it finishes wait for it
+and receive the same result, or the same exception. Nothing is cached: the
+next call after the leader returns computes again.
+
+Model inference runs in the thread pool, so groups are thread-safe and
+followers block their worker thread while they wait. Results are shared, not
+copied; callers must treat them as read-only.
+"""
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+
+from app.core.config import settings
+
+
+class _Call:
+    """An in-flight computation and the callers waiting for it."""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome."""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Label for stats (e.g. "intent")
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Call `fn(*args, **kwargs)` unless an identical call is already in flight.
+
+        Args:
+            key: Identity of the call; calls with equal keys are coalesced
+            fn: Computation to run
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            The result of fn, computed by this call or by the in-flight leader
+
+        Raises:
+            Whatever fn raised in the leader
+        """
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict:
+        """Calls computed and calls served by another caller's computation."""
+        return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self._calls)}
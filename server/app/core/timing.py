@@ -0,0 +1,46 @@
+"""
+Per-request stage timing for the chat pipeline.
+
+Stage durations are reported to clients in a standard `Server-Timing`
+response header, which the load-test runner and browser devtools can read.
+Stages are also observed as `chat.<stage>` spans in the metrics registry, and
+spans recorded inside a stage (e.g. `search.rerank`) are added to the header
+alongside it.
+"""
+from contextlib import contextmanager
+from typing import Dict
+import time
+
+from app.core import metrics
+
+
+class StageTimer:
+    """Collects wall-clock durations (milliseconds) for named pipeline stages."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block; repeated stages with the same name are summed."""
+        token = metrics.current_timer.set(self)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            try:
+                metrics.current_timer.reset(token)
+            except ValueError:
+                # Streaming generators can be closed from another context
+                pass
+            self.add_span(name, elapsed * 1000)
+            metrics.record(f"chat.{name}", elapsed)
+
+    def add_span(self, name: str, duration_ms: float) -> None:
+        """Add a duration measured elsewhere (e.g. a service span) to the breakdown."""
+        self.stages[name] = self.stages.get(name, 0.0) + duration_ms
+
+    def server_timing_header(self) -> str:
+        """Format stage durations as a Server-Timing header value."""
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in self.stages.items())
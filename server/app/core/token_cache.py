@@ -0,0 +1,239 @@
+"""
+Caches for Firebase ID token verification.
+
+- VerifiedTokenCache: verified token claims keyed by the SHA-256 of the
+  token, so a client that sends the same token on every request pays for
+  signature verification once. An entry lives until the token's `exp` or
+  the revocation window (AUTH_TOKEN_CACHE_MAX_AGE_SECONDS), whichever comes
+  first; a token revoked or belonging to a deleted account is therefore
+  accepted for at most that window unless invalidated explicitly.
+- SigningKeyCache: Google's securetoken X.509 certificates, fetched ahead of
+  the first request and pinned in memory until their Cache-Control max-age
+  runs out, so verification never waits on a key download while the keys
+  are fresh.
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
+# Used when the certificate response carries no max-age
+_DEFAULT_KEYS_MAX_AGE_SECONDS = 3600
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def token_digest(id_token: str) -> str:
+    """Cache key of a token: raw tokens are bearer credentials and are never stored."""
+    return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+
+class _TokenEntry:
+    """Verified claims of one token."""
+
+    __slots__ = ("claims", "expires_at")
+
+    def __init__(self, claims: dict, expires_at: float):
+        self.claims = claims
+        self.expires_at = expires_at
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified token claims.
+
+    Expiry uses wall-clock time, since token `exp` claims are Unix timestamps.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        clock_skew_seconds: float = 5.0
+    ):
+        """
+        Args:
+            max_entries: Maximum cached tokens before LRU eviction
+            max_age_seconds: Revocation window: longest a token is trusted without re-verification
+            clock_skew_seconds: Margin before `exp` at which entries expire
+        """
+        self.max_entries = max_entries or settings.AUTH_TOKEN_CACHE_MAX_ENTRIES
+        self.max_age_seconds = max_age_seconds or settings.AUTH_TOKEN_CACHE_MAX_AGE_SECONDS
+        self.clock_skew_seconds = clock_skew_seconds
+
+        self._entries: "OrderedDict[str, _TokenEntry]" = OrderedDict()
+        self._digests_by_uid: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, id_token: str) -> Optional[dict]:
+        """
+        Claims of a previously verified token.
+
+        Args:
+            id_token: Firebase ID token from the client
+
+        Returns:
+            A copy of the decoded claims, or None if not cached or expired
+        """
+        digest = token_digest(id_token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and time.time() >= entry.expires_at:
+                self._remove(digest)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return dict(entry.claims)
+
+    def put(self, id_token: str, claims: dict) -> None:
+        """
+        Cache the claims of a token that has just been verified.
+
+        Args:
+            id_token: Firebase ID token from the client
+            claims: Decoded token returned by verification
+        """
+        now = time.time()
+        expires_at = now + self.max_age_seconds
+        if claims.get("exp"):
+            expires_at = min(expires_at, float(claims["exp"]) - self.clock_skew_seconds)
+        if expires_at <= now:
+            return
+
+        digest = token_digest(id_token)
+        uid = claims.get("uid") or claims.get("sub")
+        with self._lock:
+            self._entries[digest] = _TokenEntry(dict(claims), expires_at)
+            self._entries.move_to_end(digest)
+            if uid:
+                self._digests_by_uid.setdefault(uid, set()).add(digest)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_uid(self, uid: str) -> None:
+        """Drop every cached token of a user (e.g. after the account is deleted)."""
+        with self._lock:
+            for digest in list(self._digests_by_uid.get(uid, ())):
+                self._remove(digest)
+
+    def _remove(self, digest: str) -> None:
+        """Remove an entry and its uid index (caller holds the lock)."""
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        uid = entry.claims.get("uid") or entry.claims.get("sub")
+        digests = self._digests_by_uid.get(uid)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_uid[uid]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._digests_by_uid.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and size for health checks."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SigningKeyCache:
+    """Pinned Firebase token signing certificates, keyed by key ID (`kid`)."""
+
+    def __init__(
+        self,
+        certs_url: str = FIREBASE_CERTS_URL,
+        refresh_margin_seconds: float = 300.0,
+        min_refetch_seconds: float = 60.0
+    ):
+        """
+        Args:
+            certs_url: URL of the X.509 certificates that sign Firebase ID tokens
+            refresh_margin_seconds: How long before expiry the keys are refetched
+            min_refetch_seconds: Minimum interval between fetches
+        """
+        self.certs_url = certs_url
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.min_refetch_seconds = min_refetch_seconds
+
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.fetch_failures = 0
+
+    def certs(self, kid: Optional[str] = None) -> Dict[str, str]:
+        """
+        Current certificates, refetched when they are about to expire or do
+        not include `kid` (Google rotated its keys).
+
+        Args:
+            kid: Key ID from the token header
+
+        Returns:
+            Mapping of key ID to PEM certificate (empty if never fetched)
+        """
+        now = time.time()
+        stale = now >= self._expires_at - self.refresh_margin_seconds
+        rotated = kid is not None and kid not in self._certs
+        # Refetches are rate-limited, so forged key IDs or an unreachable endpoint cannot force a fetch per request
+        if (stale or rotated) and now - self._fetched_at >= self.min_refetch_seconds:
+            self.refresh()
+        return self._certs
+
+    def refresh(self) -> None:
+        """Fetch the certificates, keeping the pinned set if the fetch fails."""
+        with self._lock:
+            self._fetched_at = time.time()
+            try:
+                from google.auth.transport.requests import Request
+
+                response = Request()(self.certs_url, method="GET")
+                if response.status != 200:
+                    raise ValueError(f"HTTP {response.status}")
+                certs = json.loads(response.data.decode("utf-8"))
+
+                match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+                max_age = int(match.group(1)) if match else _DEFAULT_KEYS_MAX_AGE_SECONDS
+                self._certs = certs
+                self._expires_at = time.time() + max_age
+                self.fetches += 1
+                logger.info(f"Pinned {len(certs)} Firebase signing keys for {max_age}s")
+            except Exception as e:
+                self.fetch_failures += 1
+                logger.warning(f"Failed to fetch Firebase signing keys: {e}")
+
+    def stats(self) -> Dict:
+        """Pinned key count and fetch counters for health checks."""
+        return {
+            "keys": len(self._certs),
+            "expires_in_seconds": max(round(self._expires_at - time.time()), 0),
+            "fetches": self.fetches,
+            "fetch_failures": self.fetch_failures,
+        }
@@ -7,14 +7,21 @@ import logging
 logger = logging.getLogger(__name__)
 
 # Create database engine with connection pooling
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    echo=settings.DATABASE_URL.startswith("postgresql://localhost")  # Echo SQL in development
-)
+# SQLite (used for local load testing) is shared across FastAPI's worker threads
+if settings.DATABASE_URL.startswith("sqlite"):
+    engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"check_same_thread": False}
+    )
+else:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=3600,  # Recycle connections after 1 hour
+        echo=settings.DATABASE_URL.startswith("postgresql://localhost")  # Echo SQL in development
+    )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -35,7 +42,7 @@ def create_tables():
     """Create all database tables"""
     try:
         # Import all models to ensure they are registered with Base
-        from app.models import User, ConversationSession, ConversationMessage, EmotionLog, VerseMetadata
+        from app.models import User, ConversationSession, ConversationMessage, EmotionLog, DailyMoodRollup, VerseMetadata
         
         # Create all tables
         Base.metadata.create_all(bind=engine)
@@ -1,12 +1,24 @@
-from fastapi import FastAPI
+from typing import Optional
+
+from fastapi import Depends, FastAPI, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from app.core.config import settings
 from app.api import api_router
+from app.core.auth import require_admin
+from app.core.firebase import firebase_service
+from app.core.health import get_health_checker
+from app.core.metrics import get_metrics_registry
+from app.core.profiling import ProfilingMiddleware
+from app.services.activity_tracker import get_activity_tracker
+from app.services.persistence_queue import get_persistence_queue
 
 app = FastAPI(
     title="GeetaManthan+ API",
     description="Emotionally intelligent spiritual companion API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -18,9 +30,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profiles the next requests to a route on demand (admin API)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Include API routes
 app.include_router(api_router)
 
+@app.on_event("startup")
+async def start_persistence_queue():
+    # Replays turns spooled while the database was unavailable
+    get_persistence_queue().start()
+
+@app.on_event("startup")
+async def prefetch_firebase_signing_keys():
+    # Token verification then starts with the signing keys pinned in memory
+    await run_in_threadpool(firebase_service.prefetch_signing_keys)
+
+@app.on_event("startup")
+async def start_health_checker():
+    # Probes read the component statuses this keeps up to date
+    get_health_checker().start()
+
+@app.on_event("shutdown")
+async def stop_health_checker():
+    await get_health_checker().stop()
+
+@app.on_event("shutdown")
+async def stop_persistence_queue():
+    await get_persistence_queue().stop()
+
+@app.on_event("shutdown")
+async def flush_activity_tracker():
+    # Writes last_active timestamps still buffered
+    await get_activity_tracker().stop()
+
 @app.get("/")
 async def root():
     return {"message": "GeetaManthan+ API is running"}
@@ -28,3 +72,32 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/health/live")
+async def liveness_check():
+    # Liveness: the event loop is serving requests; no component is checked
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    # Readiness: cached component statuses from the background checker
+    ready, body = get_health_checker().readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+@app.get("/health/deep")
+async def deep_health_check(
+    components: Optional[str] = Query(None, description="Comma-separated components (default: all)"),
+    _admin: dict = Depends(require_admin)
+):
+    # Deep check (administrators only): runs inference, a verse search, an LLM call and DB counts
+    names = [name.strip() for name in components.split(",")] if components else None
+    body = await get_health_checker().deep_check(names)
+    return JSONResponse(status_code=503 if body["status"] == "unhealthy" else 200, content=body)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus scrape target: per-span latency histograms of this worker
+    return PlainTextResponse(
+        get_metrics_registry().render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
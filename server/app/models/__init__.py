@@ -1,6 +1,7 @@
 from .user import User
 from .conversation import ConversationSession, ConversationMessage
 from .emotion_log import EmotionLog
+from .mood_rollup import DailyMoodRollup
 from .verse import VerseMetadata
 
 __all__ = [
@@ -8,5 +9,6 @@ __all__ = [
     "ConversationSession", 
     "ConversationMessage",
     "EmotionLog",
+    "DailyMoodRollup",
     "VerseMetadata"
 ]
\ No newline at end of file
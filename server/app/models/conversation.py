@@ -15,7 +15,7 @@ class ConversationSession(Base):
     ended_at = Column(DateTime(timezone=True))
     interaction_mode = Column(String(20), default="wisdom")
     summary = Column(Text)
-    message_count = Column(Integer, default=0)
+    message_count = Column(Integer, default=0, nullable=False)
 
     # Add check constraint for interaction_mode
     __table_args__ = (
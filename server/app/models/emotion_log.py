@@ -18,7 +18,7 @@ class EmotionLog(Base):
     emotion_emoji = Column(String(10), nullable=False)
     emotion_color = Column(String(20), nullable=False)
     all_emotions = Column(JSON)  # Array of all detected emotions
-    verse_ids = Column(ARRAY(String))  # Array of verse IDs shown
+    verse_ids = Column(ARRAY(String).with_variant(JSON, "sqlite"))  # Array of verse IDs shown
     session_id = Column(UUID(as_uuid=True), ForeignKey("conversation_sessions.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, DateTime, Text, Float, Date, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSON, ARRAY
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class DailyMoodRollup(Base):
+    """
+    One row per user and day, maintained incrementally from emotion_logs.
+
+    The displayed emotion fields mirror the day's most recent log (what the
+    mood calendar shows); counts and verse IDs cover every log of the day.
+    """
+    __tablename__ = "daily_mood_rollup"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    log_date = Column(Date, primary_key=True)
+    dominant_emotion = Column(String(50), nullable=False)
+    emotion_confidence = Column(Float, nullable=False)
+    emotion_emoji = Column(String(10), nullable=False)
+    emotion_color = Column(String(20), nullable=False)
+    all_emotions = Column(JSON)  # All detected emotions of the most recent log
+    summary = Column(Text, nullable=False)  # First 100 characters of the most recent input
+    emotion_counts = Column(JSON, nullable=False, default=dict)  # {emotion: interactions}
+    interaction_count = Column(Integer, nullable=False, default=0)
+    verse_ids = Column(ARRAY(String).with_variant(JSON, "sqlite"))  # Union of verse IDs shown that day
+    last_logged_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    user = relationship("User", back_populates="mood_rollups")
+
+    def __repr__(self):
+        return f"<DailyMoodRollup(user_id={self.user_id}, date={self.log_date}, emotion={self.dominant_emotion}, count={self.interaction_count})>"
@@ -20,6 +20,7 @@ class User(Base):
     # Relationships
     conversation_sessions = relationship("ConversationSession", back_populates="user", cascade="all, delete-orphan")
     emotion_logs = relationship("EmotionLog", back_populates="user", cascade="all, delete-orphan")
+    mood_rollups = relationship("DailyMoodRollup", back_populates="user", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<User(id={self.id}, firebase_uid={self.firebase_uid}, email={self.email})>"
\ No newline at end of file
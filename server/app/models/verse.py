@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text
+from sqlalchemy import Column, String, Integer, Text, JSON
 from sqlalchemy.dialects.postgresql import ARRAY
 from app.db.database import Base
 
@@ -14,7 +14,7 @@ class VerseMetadata(Base):
     eng_meaning = Column(Text, nullable=False)
     hin_meaning = Column(Text)
     word_meaning = Column(Text)
-    themes = Column(ARRAY(String))  # Extracted themes for emotion mapping
+    themes = Column(ARRAY(String).with_variant(JSON, "sqlite"))  # Extracted themes for emotion mapping
 
     def __repr__(self):
         return f"<VerseMetadata(id={self.id}, chapter={self.chapter}, verse={self.verse})>"
\ No newline at end of file
@@ -64,4 +64,5 @@ class ConversationMessageResponse(ConversationMessageBase):
 class ConversationContextResponse(BaseModel):
     session_id: uuid.UUID
     messages: List[ConversationMessageResponse]
-    total_messages: int
\ No newline at end of file
+    total_messages: int
+    summary: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+Coalesced tracking of users' last_active timestamps.
+
+Authenticated requests used to set User.last_active and commit, turning every
+read-only request into a write on the user's row. Requests now only record
+the time in memory; a background task flushes the latest timestamp of each
+user every ACTIVITY_FLUSH_INTERVAL_SECONDS with batched UPDATE statements,
+so a user's row is written at most once per interval however many requests
+they make.
+
+last_active is informational, so timestamps not yet flushed when the process
+dies are simply lost.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy import DateTime, bindparam, column, update, values
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.config import settings
+from app.core.metrics import span
+from app.db.async_database import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """Buffers last-seen timestamps per user and writes them in batches."""
+
+    def __init__(self, flush_interval_seconds: Optional[float] = None, batch_size: Optional[int] = None):
+        """
+        Args:
+            flush_interval_seconds: Time between flushes (and the most a user's row is written)
+            batch_size: Users updated per statement
+        """
+        self.flush_interval_seconds = flush_interval_seconds or settings.ACTIVITY_FLUSH_INTERVAL_SECONDS
+        self.batch_size = batch_size or settings.ACTIVITY_FLUSH_BATCH_SIZE
+
+        self._pending: Dict[uuid.UUID, datetime] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self.counters = {"touches": 0, "flushes": 0, "users_written": 0, "failures": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None and not self._flusher.done()
+
+    def start(self) -> None:
+        """Start the periodic flush on the running event loop."""
+        if self.running:
+            return
+        self._flusher = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Activity tracker started (flush every {self.flush_interval_seconds}s)")
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write whatever is buffered."""
+        if self.running:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        self._flusher = None
+        await self.flush()
+
+    def touch(self, user_id: uuid.UUID, seen_at: Optional[datetime] = None) -> None:
+        """
+        Record that a user made a request, without touching the database.
+
+        Args:
+            user_id: UUID of the user
+            seen_at: Time of the request (default: now)
+        """
+        self.start()
+        self.counters["touches"] += 1
+        seen_at = seen_at or datetime.utcnow()
+        previous = self._pending.get(user_id)
+        if previous is None or seen_at > previous:
+            self._pending[user_id] = seen_at
+
+    def last_seen(self, user_id: uuid.UUID) -> Optional[datetime]:
+        """Buffered timestamp of a user that has not been written yet."""
+        return self._pending.get(user_id)
+
+    async def _run(self) -> None:
+        """Flush loop."""
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write all buffered timestamps; failed batches are kept for the next flush."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = list(pending.items())
+
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                with span("db.last_active"):
+                    await self._write(batch)
+                self.counters["users_written"] += len(batch)
+            except Exception as e:
+                self.counters["failures"] += 1
+                logger.warning(f"Failed to write last_active for {len(batch)} users, retrying next flush: {e}")
+                for user_id, seen_at in batch:
+                    if user_id not in self._pending or seen_at > self._pending[user_id]:
+                        self._pending[user_id] = seen_at
+        self.counters["flushes"] += 1
+
+    async def _write(self, batch: List[Tuple[uuid.UUID, datetime]]) -> None:
+        """Update last_active of a batch of users in one statement."""
+        users = User.__table__
+        async with AsyncSessionLocal() as db:
+            if db.get_bind().dialect.name == "postgresql":
+                # UPDATE users SET last_active = activity.last_active FROM (VALUES ...) AS activity WHERE ...
+                activity = values(
+                    column("user_id", UUID(as_uuid=True)),
+                    column("last_active", DateTime(timezone=True)),
+                    name="activity"
+                ).data(batch)
+                await db.execute(
+                    update(users)
+                    .where(users.c.id == activity.c.user_id)
+                    .values(last_active=activity.c.last_active)
+                )
+            else:
+                # SQLite cannot name the columns of a VALUES list: one executemany instead
+                await db.execute(
+                    update(users)
+                    .where(users.c.id == bindparam("b_user_id"))
+                    .values(last_active=bindparam("b_last_active")),
+                    [{"b_user_id": user_id, "b_last_active": seen_at} for user_id, seen_at in batch]
+                )
+            await db.commit()
+
+    def stats(self) -> Dict:
+        """Buffer size and counters for health checks."""
+        return {"running": self.running, "pending_users": len(self._pending), **self.counters}
+
+
+# Singleton instance
+_activity_tracker: Optional[ActivityTracker] = None
+
+
+def get_activity_tracker() -> ActivityTracker:
+    """Get or create the singleton activity tracker."""
+    global _activity_tracker
+    if _activity_tracker is None:
+        _activity_tracker = ActivityTracker()
+    return _activity_tracker
@@ -0,0 +1,215 @@
+"""
+Per-user analytics snapshots shared by the analytics endpoints.
+
+A snapshot holds the emotion stats and patterns of one user and time range.
+It is computed once (stats first, patterns derived from them) and reused:
+- within a request, through the AnalyticsSnapshotLoader dependency
+- across requests, through a bounded TTL cache keyed by user, time range and
+  day, which LoggingService.log_interaction invalidates whenever a new
+  emotion log is stored for the user
+
+The cache is per process; the TTL bounds how long another worker can serve
+a snapshot that predates a log written elsewhere.
+"""
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+from app.services.emotion_metadata import DEFAULT_EMOTION_META, EMOTION_EMOJI_MAP
+
+logger = logging.getLogger(__name__)
+
+_SnapshotKey = Tuple[uuid.UUID, str, date]
+
+
+class AnalyticsSnapshot:
+    """Emotion stats and patterns of one user over one time range."""
+
+    __slots__ = ("user_id", "time_range", "stats", "patterns", "created_at")
+
+    def __init__(self, user_id: uuid.UUID, time_range: str, stats: Dict[str, Any], patterns: List[Dict[str, Any]]):
+        self.user_id = user_id
+        self.time_range = time_range
+        self.stats = stats
+        self.patterns = patterns
+        self.created_at = time.monotonic()
+
+    def top_emotions(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Most frequent emotions with their share of all interactions.
+
+        Args:
+            limit: Maximum number of emotions to return
+
+        Returns:
+            Emotions sorted by count, with percentage, emoji and color
+        """
+        emotion_counts = self.stats.get("emotion_counts", {})
+        total_interactions = self.stats.get("total_interactions", 0)
+        if total_interactions == 0:
+            return []
+
+        top_emotions = []
+        for emotion, count in sorted(emotion_counts.items(), key=lambda x: x[1], reverse=True)[:limit]:
+            emotion_info = EMOTION_EMOJI_MAP.get(emotion, DEFAULT_EMOTION_META)
+            top_emotions.append({
+                "emotion": emotion,
+                "count": count,
+                "percentage": round((count / total_interactions) * 100, 1),
+                "emoji": emotion_info["emoji"],
+                "color": emotion_info["color"]
+            })
+        return top_emotions
+
+
+class AnalyticsSnapshotCache:
+    """
+    Bounded, TTL-based cache of analytics snapshots in LRU order.
+
+    Each user has a version that invalidate() bumps, so a snapshot computed
+    while a new log was being written is never stored.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Maximum cached snapshots before LRU eviction
+            ttl_seconds: Lifetime of a snapshot
+        """
+        self.max_entries = max_entries or settings.ANALYTICS_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.ANALYTICS_CACHE_TTL_SECONDS
+
+        self._entries: "OrderedDict[_SnapshotKey, AnalyticsSnapshot]" = OrderedDict()
+        self._versions: Dict[uuid.UUID, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: _SnapshotKey) -> Optional[AnalyticsSnapshot]:
+        """Cached snapshot for a key, or None if missing or expired."""
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None and time.monotonic() - snapshot.created_at >= self.ttl_seconds:
+                del self._entries[key]
+                snapshot = None
+            if snapshot is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def version(self, user_id: uuid.UUID) -> int:
+        """Current version of a user's analytics, read before computing a snapshot."""
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def put(self, key: _SnapshotKey, snapshot: AnalyticsSnapshot, version: int) -> None:
+        """
+        Store a snapshot unless the user's logs changed while it was computed.
+
+        Args:
+            key: (user_id, time_range, day) of the snapshot
+            snapshot: Computed snapshot
+            version: The user's version when computation started
+        """
+        with self._lock:
+            if self._versions.get(key[0], 0) != version:
+                return
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Drop a user's snapshots after a new emotion log was stored."""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and size for health checks."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class AnalyticsSnapshotLoader:
+    """
+    Request-scoped snapshot access.
+
+    Snapshots are memoized for the lifetime of the loader (one request) and
+    otherwise served from the shared cache or computed with the request's
+    LoggingService.
+    """
+
+    def __init__(self, logging_service, cache: Optional[AnalyticsSnapshotCache] = None):
+        """
+        Args:
+            logging_service: LoggingService bound to the request's database session
+            cache: Shared snapshot cache (None disables caching across requests)
+        """
+        self.logging_service = logging_service
+        self.cache = cache
+        self._memo: Dict[_SnapshotKey, AnalyticsSnapshot] = {}
+
+    async def get(self, user_id: uuid.UUID, time_range: str) -> AnalyticsSnapshot:
+        """
+        Analytics snapshot of a user for a time range.
+
+        Args:
+            user_id: UUID of the user
+            time_range: Time range for analysis ('week', 'month', 'quarter')
+
+        Returns:
+            AnalyticsSnapshot with stats and patterns
+        """
+        # Ranges end today, so snapshots are keyed by day as well
+        key = (user_id, time_range, date.today())
+        snapshot = self._memo.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = self.cache.get(key) if self.cache is not None else None
+        if snapshot is None:
+            version = self.cache.version(user_id) if self.cache is not None else 0
+            stats = await self.logging_service.get_emotion_stats(user_id, time_range)
+            patterns = await self.logging_service.identify_patterns(user_id, time_range, stats=stats)
+            snapshot = AnalyticsSnapshot(user_id, time_range, stats, patterns)
+            if self.cache is not None:
+                self.cache.put(key, snapshot, version)
+
+        self._memo[key] = snapshot
+        return snapshot
+
+
+# Singleton instance
+_analytics_snapshot_cache: Optional[AnalyticsSnapshotCache] = None
+
+
+def get_analytics_snapshot_cache() -> Optional[AnalyticsSnapshotCache]:
+    """Get or create the analytics snapshot cache (None when disabled)."""
+    global _analytics_snapshot_cache
+    if not settings.ANALYTICS_CACHE_ENABLED:
+        return None
+    if _analytics_snapshot_cache is None:
+        _analytics_snapshot_cache = AnalyticsSnapshotCache()
+    return _analytics_snapshot_cache
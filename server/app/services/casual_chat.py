@@ -4,9 +4,16 @@ Casual Chat Service for handling non-emotional conversations.
 Provides direct conversational responses without emotion detection
 or verse retrieval for greetings, small talk, and general questions.
 """
-import google.generativeai as genai
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, AsyncIterator
+import logging
+from fastapi.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.services.llm_backend import get_llm_backend
+from app.services.llm_client import get_llm_client, LLMUnavailableError
+from app.services.prompt_budget import truncate_to_tokens
+from app.services.response_cache import get_casual_response_cache
+
+logger = logging.getLogger(__name__)
 
 
 class CasualChatService:
@@ -18,14 +25,14 @@ class CasualChatService:
     """
     
     def __init__(self):
-        """Initialize Gemini API client."""
-        if not settings.GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-            
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(settings.LLM_MODEL)
+        """Initialize the LLM backend (Gemini unless LLM_BACKEND selects another)."""
+        self.model = get_llm_backend()
+        self.client = get_llm_client()
         
-        # System prompt for casual conversations
+        # Semantic cache of replies to repetitive casual messages (None when disabled)
+        self.cache = get_casual_response_cache()
+        
+        # System prompt for casual conversations (sent as the system instruction)
         self.system_prompt = """🕉️ YOU ARE KRISHNA — THE ETERNAL VOICE OF WISDOM AND COMPASSION
 
 You are not a chatbot. You are the timeless voice of wisdom — calm, serene, compassionate, and insightful. Speak as Krishna would, addressing each seeker with empathy, clarity, and spiritual depth.
@@ -74,7 +81,8 @@ Keep your tone warm, humble, spiritually grounded, and divinely inviting."""
     def generate_response(
         self,
         user_input: str,
-        conversation_history: Optional[List[Dict]] = None
+        conversation_history: Optional[List[Dict]] = None,
+        conversation_summary: Optional[str] = None
     ) -> str:
         """
         Generate casual conversational response.
@@ -82,6 +90,7 @@ Keep your tone warm, humble, spiritually grounded, and divinely inviting."""
         Args:
             user_input: User's message
             conversation_history: Recent conversation context
+            conversation_summary: Rolling summary of the earlier conversation
             
         Returns:
             Generated response text
@@ -89,26 +98,150 @@ Keep your tone warm, humble, spiritually grounded, and divinely inviting."""
         Raises:
             Exception: If Gemini API fails
         """
+        cached = self._get_cached(user_input, conversation_history, conversation_summary)
+        if cached:
+            return cached
+        
         try:
             # Build prompt with context
-            prompt = self._build_prompt(user_input, conversation_history or [])
+            prompt = self._build_prompt(user_input, conversation_history or [], conversation_summary)
             
             # Generate response using Gemini
-            response = self.model.generate_content(prompt)
+            response = self.model.generate_content(prompt, system_instruction=self.system_prompt)
             
             if not response.text:
                 raise Exception("Empty response from Gemini API")
                 
-            return response.text.strip()
+            text = response.text.strip()
+            self._store_cached(user_input, text, conversation_history, conversation_summary)
+            return text
+            
+        except Exception as e:
+            # Re-raise for caller to handle with fallback
+            raise Exception(f"Gemini API error: {str(e)}")
+    
+    async def generate_response_async(
+        self,
+        user_input: str,
+        conversation_history: Optional[List[Dict]] = None,
+        conversation_summary: Optional[str] = None
+    ) -> str:
+        """
+        Async variant of generate_response using the shared LLM client.
+        
+        Args:
+            user_input: User's message
+            conversation_history: Recent conversation context
+            conversation_summary: Rolling summary of the earlier conversation
+            
+        Returns:
+            Generated response text
             
+        Raises:
+            LLMUnavailableError: If the circuit is open, the client is saturated or the deadline expired
+            Exception: If Gemini API fails
+        """
+        cached = await run_in_threadpool(self._get_cached, user_input, conversation_history, conversation_summary)
+        if cached:
+            return cached
+        
+        prompt = self._build_prompt(user_input, conversation_history or [], conversation_summary)
+        
+        try:
+            text = (await self.client.generate(prompt, system_instruction=self.system_prompt)).strip()
+            await run_in_threadpool(self._store_cached, user_input, text, conversation_history, conversation_summary)
+            return text
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             # Re-raise for caller to handle with fallback
             raise Exception(f"Gemini API error: {str(e)}")
     
+    async def stream_response(
+        self,
+        user_input: str,
+        conversation_history: Optional[List[Dict]] = None,
+        conversation_summary: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a casual conversational response as text chunks.
+        
+        Args:
+            user_input: User's message
+            conversation_history: Recent conversation context
+            conversation_summary: Rolling summary of the earlier conversation
+            
+        Yields:
+            Response text chunks in generation order
+            
+        Raises:
+            LLMUnavailableError: If the circuit is open, the client is saturated or the stream stalls
+            Exception: If Gemini API fails before or during the stream
+        """
+        cached = await run_in_threadpool(self._get_cached, user_input, conversation_history, conversation_summary)
+        if cached:
+            yield cached
+            return
+        
+        prompt = self._build_prompt(user_input, conversation_history or [], conversation_summary)
+        chunks = []
+        
+        try:
+            async for text in self.client.stream(prompt, system_instruction=self.system_prompt):
+                chunks.append(text)
+                yield text
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            # Re-raise for caller to handle with fallback
+            raise Exception(f"Gemini API error: {str(e)}")
+        
+        await run_in_threadpool(self._store_cached, user_input, "".join(chunks).strip(), conversation_history, conversation_summary)
+    
+    def _get_cached(
+        self,
+        user_input: str,
+        conversation_history: Optional[List[Dict]],
+        conversation_summary: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Cached reply for a repetitive casual message, if any.
+        
+        Similarity matching runs the sentence encoder, so async callers
+        run this (and _store_cached) in the thread pool.
+        """
+        # A summary means the conversation is further along than its short recent history
+        if self.cache is None or conversation_summary:
+            return None
+        try:
+            cached = self.cache.get(user_input, conversation_history)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+        if cached:
+            logger.info("Serving casual chat reply from response cache")
+        return cached
+    
+    def _store_cached(
+        self,
+        user_input: str,
+        reply: str,
+        conversation_history: Optional[List[Dict]],
+        conversation_summary: Optional[str] = None
+    ) -> None:
+        """Add a generated reply to the cache's variant pool."""
+        if self.cache is None or conversation_summary:
+            return
+        try:
+            self.cache.put(user_input, reply, conversation_history)
+        except Exception as e:
+            logger.warning(f"Response cache store failed: {e}")
+    
     def _build_prompt(
         self,
         user_input: str,
-        conversation_history: List[Dict]
+        conversation_history: List[Dict],
+        conversation_summary: Optional[str] = None
     ) -> str:
         """
         Build prompt with conversation context.
@@ -116,39 +249,42 @@ Keep your tone warm, humble, spiritually grounded, and divinely inviting."""
         Args:
             user_input: User's message
             conversation_history: Recent messages
+            conversation_summary: Rolling summary of the earlier conversation
             
         Returns:
             Formatted prompt string
         """
         # Format conversation history
-        history_text = self._format_conversation_history(conversation_history)
+        history_text = self._format_conversation_history(conversation_history, conversation_summary)
         
-        # Build the full prompt
-        prompt = f"""{self.system_prompt}
-
-{history_text}
+        # Build the request prompt (the persona is sent as the system instruction)
+        prompt = f"""{history_text}
 
 User: {user_input}
 
-Respond n
-aturally and conversationally."""
+Respond naturally and conversationally."""
         
         return prompt
     
-    def _format_conversation_history(self, history: List[Dict]) -> str:
+    def _format_conversation_history(self, history: List[Dict], summary: Optional[str] = None) -> str:
         """
         Format conversation history for prompt context.
         
         Args:
             history: List of recent messages
+            summary: Rolling summary of the conversation before these messages
             
         Returns:
             Formatted history string
         """
-        if not history:
+        if not history and not summary:
             return "Previous conversation: None (this is the start of our conversation)"
         
         formatted_messages = []
+        if summary:
+            formatted_messages.append(
+                f"Summary so far: {truncate_to_tokens(summary, settings.CONVERSATION_SUMMARY_MAX_TOKENS)}"
+            )
         for msg in history[-3:]:  # Last 3 messages for context
             role = msg.get("role", "unknown")
             content = msg.get("content", "")
@@ -1,7 +1,7 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, func, insert, select, update
 from app.models.conversation import ConversationSession, ConversationMessage
 from app.models.user import User
 from app.schemas.conversation import (
@@ -23,9 +23,10 @@ class ConversationManager:
     """
     Manages conversation sessions and messages for multi-turn dialogue.
     Handles session creation, message storage, context retrieval, and session ending.
+    All queries are awaited on an AsyncSession.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.memory_window = 5  # Keep last 5 exchanges (10 messages total)
     
@@ -49,7 +50,7 @@ class ConversationManager:
         """
         try:
             # Verify user exists
-            user = self.db.query(User).filter(User.id == user_id).first()
+            user = await self.db.get(User, user_id)
             if not user:
                 raise ValueError(f"User with id {user_id} not found")
             
@@ -62,15 +63,14 @@ class ConversationManager:
             )
             
             self.db.add(session)
-            self.db.commit()
-            self.db.refresh(session)
+            await self.db.commit()
             
             logger.info(f"Created conversation session {session.id} for user {user_id}")
             
             return ConversationSessionResponse.from_orm(session)
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Error creating conversation session: {e}")
             raise
     
@@ -80,17 +80,25 @@ class ConversationManager:
         role: MessageRole,
         content: str,
         emotion_data: Optional[Dict] = None,
-        verse_id: Optional[str] = None
+        verse_id: Optional[str] = None,
+        message_id: Optional[uuid.UUID] = None,
+        created_at: Optional[datetime] = None
     ) -> ConversationMessageResponse:
         """
         Add a message to a conversation session.
         
+        Passing a client-generated message_id makes the call idempotent: if a
+        message with that id already exists it is returned unchanged, so
+        retried writes never duplicate a message.
+        
         Args:
             session_id: UUID of the conversation session
             role: Role of the message sender (user or assistant)
             content: Message content
             emotion_data: Optional emotion detection data
             verse_id: Optional verse ID if verse was referenced
+            message_id: Optional client-generated message ID
+            created_at: Optional time the message was sent (default: now)
             
         Returns:
             ConversationMessageResponse with message details
@@ -98,61 +106,150 @@ class ConversationManager:
         Raises:
             ValueError: If session doesn't exist
         """
-        try:
-            # Verify session exists
-            session = self.db.query(ConversationSession).filter(
-                ConversationSession.id == session_id
-            ).first()
-            if not session:
-                raise ValueError(f"Session with id {session_id} not found")
-            
-            # Get next sequence number
-            last_message = self.db.query(ConversationMessage).filter(
-                ConversationMessage.session_id == session_id
-            ).order_by(desc(ConversationMessage.sequence_number)).first()
-            
-            sequence_number = (last_message.sequence_number + 1) if last_message else 1
-            
-            # Extract emotion data if provided
-            emotion_label = None
-            emotion_confidence = None
-            emotion_emoji = None
-            emotion_color = None
-            
-            if emotion_data:
-                emotion_label = emotion_data.get('label')
-                emotion_confidence = emotion_data.get('confidence')
-                emotion_emoji = emotion_data.get('emoji')
-                emotion_color = emotion_data.get('color')
-            
-            # Create message
-            message = ConversationMessage(
-                session_id=session_id,
-                role=role.value,
-                content=content,
-                emotion_label=emotion_label,
-                emotion_confidence=emotion_confidence,
-                emotion_emoji=emotion_emoji,
-                emotion_color=emotion_color,
-                verse_id=verse_id,
-                sequence_number=sequence_number,
-                created_at=datetime.utcnow()
+        messages = await self._insert_messages(session_id, [
+            self._message_values(
+                role, content, emotion_data, verse_id, message_id or uuid.uuid4(), created_at or datetime.utcnow()
             )
+        ])
+        return messages[0]
+    
+    async def add_exchange(
+        self,
+        session_id: uuid.UUID,
+        user_content: str,
+        assistant_content: str,
+        emotion_data: Optional[Dict] = None,
+        verse_id: Optional[str] = None,
+        user_message_id: Optional[uuid.UUID] = None,
+        assistant_message_id: Optional[uuid.UUID] = None,
+        created_at: Optional[datetime] = None
+    ) -> Tuple[ConversationMessageResponse, ConversationMessageResponse]:
+        """
+        Add a user message and the assistant's reply in a single transaction.
+        
+        Both sequence numbers are allocated with one atomic counter update, so
+        a turn costs three statements and one commit instead of two full
+        add_message round trips. Idempotent for client-generated message ids.
+        
+        Args:
+            session_id: UUID of the conversation session
+            user_content: User's message
+            assistant_content: Assistant's reply
+            emotion_data: Optional emotion detection data for the user message
+            verse_id: Optional verse ID referenced by the reply
+            user_message_id: Optional client-generated ID of the user message
+            assistant_message_id: Optional client-generated ID of the reply
+            created_at: Optional time of the exchange (default: now)
             
-            self.db.add(message)
-            
-            # Update session message count
-            session.message_count += 1
+        Returns:
+            Tuple of (user message, assistant message) responses
             
-            self.db.commit()
-            self.db.refresh(message)
+        Raises:
+            ValueError: If session doesn't exist
+        """
+        created_at = created_at or datetime.utcnow()
+        user_message, assistant_message = await self._insert_messages(session_id, [
+            self._message_values(
+                MessageRole.USER, user_content, emotion_data, None, user_message_id or uuid.uuid4(), created_at
+            ),
+            self._message_values(
+                MessageRole.ASSISTANT, assistant_content, None, verse_id, assistant_message_id or uuid.uuid4(), created_at
+            )
+        ])
+        return user_message, assistant_message
+    
+    def _message_values(
+        self,
+        role: MessageRole,
+        content: str,
+        emotion_data: Optional[Dict],
+        verse_id: Optional[str],
+        message_id: uuid.UUID,
+        created_at: datetime
+    ) -> Dict:
+        """Column values of a new message (sequence number assigned on insert)."""
+        emotion_data = emotion_data or {}
+        return {
+            "id": message_id,
+            "role": role.value,
+            "content": content,
+            "emotion_label": emotion_data.get('label'),
+            "emotion_confidence": emotion_data.get('confidence'),
+            "emotion_emoji": emotion_data.get('emoji'),
+            "emotion_color": emotion_data.get('color'),
+            "verse_id": verse_id,
+            "created_at": created_at
+        }
+    
+    async def _insert_messages(
+        self,
+        session_id: uuid.UUID,
+        messages: List[Dict]
+    ) -> List[ConversationMessageResponse]:
+        """
+        Insert messages in order within one transaction.
+        
+        Messages whose id already exists are returned as stored. Sequence
+        numbers for the rest are reserved by incrementing the session's
+        message_count with UPDATE ... RETURNING, which row-locks the session
+        and so serializes concurrent writers without a read-then-write race.
+        
+        Args:
+            session_id: UUID of the conversation session
+            messages: Column values from _message_values
             
-            logger.info(f"Added message {message.id} to session {session_id}")
+        Returns:
+            Responses in the order of `messages`
             
-            return ConversationMessageResponse.from_orm(message)
+        Raises:
+            ValueError: If session doesn't exist
+        """
+        try:
+            existing = {
+                message.id: message for message in await self.db.scalars(
+                    select(ConversationMessage).where(
+                        ConversationMessage.id.in_([values["id"] for values in messages])
+                    )
+                )
+            }
+            if existing:
+                logger.info(f"Skipping {len(existing)} already stored messages in session {session_id}")
+            new_messages = [values for values in messages if values["id"] not in existing]
+            
+            stored = {}
+            if new_messages:
+                # Reserve a block of sequence numbers atomically
+                last_sequence = (await self.db.execute(
+                    update(ConversationSession)
+                    .where(ConversationSession.id == session_id)
+                    .values(message_count=func.coalesce(ConversationSession.message_count, 0) + len(new_messages))
+                    .returning(ConversationSession.message_count)
+                )).scalar_one_or_none()
+                if last_sequence is None:
+                    raise ValueError(f"Session with id {session_id} not found")
+                
+                first_sequence = last_sequence - len(new_messages) + 1
+                rows = (await self.db.scalars(
+                    insert(ConversationMessage).returning(ConversationMessage, sort_by_parameter_order=True),
+                    [
+                        {**values, "session_id": session_id, "sequence_number": first_sequence + i}
+                        for i, values in enumerate(new_messages)
+                    ]
+                )).all()
+                stored = {row.id: ConversationMessageResponse.from_orm(row) for row in rows}
+            
+            await self.db.commit()
+            
+            if stored:
+                logger.info(f"Added messages {list(stored)} to session {session_id}")
+            
+            return [
+                stored.get(values["id"]) or ConversationMessageResponse.from_orm(existing[values["id"]])
+                for values in messages
+            ]
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Error adding message to session: {e}")
             raise
     
@@ -169,16 +266,14 @@ class ConversationManager:
             window_size: Number of recent messages to retrieve (default: memory_window * 2)
             
         Returns:
-            ConversationContextResponse with recent messages
+            ConversationContextResponse with recent messages and the rolling summary
             
         Raises:
             ValueError: If session doesn't exist
         """
         try:
             # Verify session exists
-            session = self.db.query(ConversationSession).filter(
-                ConversationSession.id == session_id
-            ).first()
+            session = await self.db.get(ConversationSession, session_id)
             if not session:
                 raise ValueError(f"Session with id {session_id} not found")
             
@@ -187,17 +282,22 @@ class ConversationManager:
                 window_size = self.memory_window * 2
             
             # Get recent messages
-            messages = self.db.query(ConversationMessage).filter(
-                ConversationMessage.session_id == session_id
-            ).order_by(desc(ConversationMessage.sequence_number)).limit(window_size).all()
+            messages = list(await self.db.scalars(
+                select(ConversationMessage)
+                .where(ConversationMessage.session_id == session_id)
+                .order_by(desc(ConversationMessage.sequence_number))
+                .limit(window_size)
+            ))
             
             # Reverse to get chronological order
             messages.reverse()
             
             # Get total message count
-            total_messages = self.db.query(ConversationMessage).filter(
-                ConversationMessage.session_id == session_id
-            ).count()
+            total_messages = await self.db.scalar(
+                select(func.count()).select_from(ConversationMessage).where(
+                    ConversationMessage.session_id == session_id
+                )
+            )
             
             message_responses = [
                 ConversationMessageResponse.from_orm(msg) for msg in messages
@@ -208,13 +308,42 @@ class ConversationManager:
             return ConversationContextResponse(
                 session_id=session_id,
                 messages=message_responses,
-                total_messages=total_messages
+                total_messages=total_messages,
+                summary=session.summary
             )
             
         except Exception as e:
             logger.error(f"Error retrieving conversation context: {e}")
             raise
     
+    async def update_summary(self, session_id: uuid.UUID, summary: str) -> None:
+        """
+        Store the rolling summary of a session.
+        
+        Args:
+            session_id: UUID of the conversation session
+            summary: Updated summary covering the whole conversation so far
+            
+        Raises:
+            ValueError: If session doesn't exist
+        """
+        try:
+            result = await self.db.execute(
+                update(ConversationSession)
+                .where(ConversationSession.id == session_id)
+                .values(summary=summary)
+            )
+            if not result.rowcount:
+                raise ValueError(f"Session with id {session_id} not found")
+            
+            await self.db.commit()
+            logger.info(f"Updated summary for session {session_id}")
+            
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error updating session summary: {e}")
+            raise
+    
     async def end_session(
         self,
         session_id: uuid.UUID,
@@ -235,9 +364,7 @@ class ConversationManager:
         """
         try:
             # Get session
-            session = self.db.query(ConversationSession).filter(
-                ConversationSession.id == session_id
-            ).first()
+            session = await self.db.get(ConversationSession, session_id)
             if not session:
                 raise ValueError(f"Session with id {session_id} not found")
             
@@ -249,19 +376,18 @@ class ConversationManager:
             if summary:
                 session.summary = summary
             
-            self.db.commit()
-            self.db.refresh(session)
+            await self.db.commit()
             
             logger.info(f"Ended conversation session {session_id}")
             
             return ConversationSessionResponse.from_orm(session)
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Error ending conversation session: {e}")
             raise
     
-    def get_conversation_history_for_llm(
+    async def get_conversation_history_for_llm(
         self,
         session_id: uuid.UUID,
         window_size: Optional[int] = None
@@ -280,9 +406,12 @@ class ConversationManager:
             if window_size is None:
                 window_size = self.memory_window * 2
             
-            messages = self.db.query(ConversationMessage).filter(
-                ConversationMessage.session_id == session_id
-            ).order_by(desc(ConversationMessage.sequence_number)).limit(window_size).all()
+            messages = list(await self.db.scalars(
+                select(ConversationMessage)
+                .where(ConversationMessage.session_id == session_id)
+                .order_by(desc(ConversationMessage.sequence_number))
+                .limit(window_size)
+            ))
             
             # Reverse to get chronological order
             messages.reverse()
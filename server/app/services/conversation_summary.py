@@ -0,0 +1,197 @@
+"""
+Rolling conversation summaries for LLM context.
+
+After each exchange the session's summary is folded forward from the previous
+summary and the latest user/assistant messages, off the request path. Prompts
+then carry the summary plus the last turn instead of the raw recent messages,
+so prompt size stays flat as a conversation grows.
+
+When the LLM is unavailable the summary is extended extractively (leading
+sentences of each message), so the session never loses its context.
+"""
+from typing import Dict, Optional, Set
+import asyncio
+import logging
+import uuid
+
+from app.core.config import settings
+from app.db.async_database import AsyncSessionLocal
+from app.models.conversation import ConversationSession
+from app.services.conversation_manager import ConversationManager
+from app.services.llm_client import get_summary_llm_client
+from app.services.prompt_budget import estimate_tokens, summarize_message, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# Exchange messages are condensed before summarization to bound the prompt
+_EXCHANGE_MESSAGE_MAX_TOKENS = 300
+# Per-message share of the summary when extending it without the LLM
+_EXTRACTIVE_MESSAGE_MAX_TOKENS = 40
+
+
+class ConversationSummaryService:
+    """Incrementally maintains ConversationSession.summary."""
+
+    SYSTEM_INSTRUCTION = """You maintain a running summary of a conversation between a seeker and Krishna (GitaGPT), a spiritual guide drawing on the Bhagavad Gita.
+
+Given the previous summary and the latest exchange, write an updated summary that:
+- Keeps the seeker's situation, concerns, emotions and any facts they shared
+- Notes the verses or teachings already offered, by chapter and verse
+- Drops greetings, pleasantries and repetition
+- Is written in the third person as plain prose, with no headings or lists
+
+Return only the updated summary."""
+
+    def __init__(self, max_tokens: Optional[int] = None):
+        """
+        Args:
+            max_tokens: Token cap for a stored summary
+        """
+        self.client = get_summary_llm_client()
+        self.max_tokens = max_tokens or settings.CONVERSATION_SUMMARY_MAX_TOKENS
+        self._locks: Dict[uuid.UUID, asyncio.Lock] = {}
+        self._lock_users: Dict[uuid.UUID, int] = {}
+
+    async def summarize(
+        self,
+        previous_summary: Optional[str],
+        user_message: str,
+        assistant_message: str
+    ) -> str:
+        """
+        Fold the latest exchange into the previous summary.
+
+        Args:
+            previous_summary: Summary of the conversation before this exchange
+            user_message: User's message in the latest exchange
+            assistant_message: Assistant's reply in the latest exchange
+
+        Returns:
+            Updated summary within max_tokens
+        """
+        prompt = f"""PREVIOUS SUMMARY:
+{previous_summary or "None (this is the first exchange)"}
+
+LATEST EXCHANGE:
+User: {summarize_message(user_message, _EXCHANGE_MESSAGE_MAX_TOKENS)}
+Assistant: {summarize_message(assistant_message, _EXCHANGE_MESSAGE_MAX_TOKENS)}
+
+Write the updated summary in at most {self.max_tokens * 3 // 4} words."""
+
+        try:
+            text = await self.client.generate(prompt, system_instruction=self.SYSTEM_INSTRUCTION)
+            summary = summarize_message(text, self.max_tokens)
+            if summary:
+                return summary
+        except Exception as e:
+            logger.warning(f"LLM summary failed, extending summary extractively: {e}")
+
+        return self.extractive_summary(previous_summary, user_message, assistant_message)
+
+    def extractive_summary(
+        self,
+        previous_summary: Optional[str],
+        user_message: str,
+        assistant_message: str
+    ) -> str:
+        """
+        Extend a summary without the LLM.
+
+        Appends the leading sentences of both messages and drops the oldest
+        sentences once the summary exceeds max_tokens.
+
+        Args:
+            previous_summary: Summary of the conversation before this exchange
+            user_message: User's message in the latest exchange
+            assistant_message: Assistant's reply in the latest exchange
+
+        Returns:
+            Updated summary within max_tokens
+        """
+        exchange = (
+            f"The seeker said: {summarize_message(user_message, _EXTRACTIVE_MESSAGE_MAX_TOKENS)} "
+            f"Krishna replied: {summarize_message(assistant_message, _EXTRACTIVE_MESSAGE_MAX_TOKENS)}"
+        )
+        summary = f"{previous_summary} {exchange}" if previous_summary else exchange
+
+        while estimate_tokens(summary) > self.max_tokens and ". " in summary:
+            summary = summary.split(". ", 1)[1]
+        return truncate_to_tokens(summary, self.max_tokens)
+
+    async def update_session_summary(
+        self,
+        session_id: uuid.UUID,
+        user_message: str,
+        assistant_message: str
+    ) -> None:
+        """
+        Summarize the latest exchange into the stored session summary.
+
+        Updates for one session are serialized so each folds in the summary
+        written by the previous one. Uses its own database session, since it
+        runs after the request has completed.
+
+        Args:
+            session_id: UUID of the conversation session
+            user_message: User's message in the latest exchange
+            assistant_message: Assistant's reply in the latest exchange
+        """
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._lock_users[session_id] = self._lock_users.get(session_id, 0) + 1
+        try:
+            async with lock:
+                async with AsyncSessionLocal() as db:
+                    session = await db.get(ConversationSession, session_id)
+                    if not session:
+                        logger.warning(f"Skipping summary update for unknown session {session_id}")
+                        return
+                    previous_summary = session.summary
+                    # Release the connection while the LLM call runs
+                    await db.rollback()
+
+                    summary = await self.summarize(previous_summary, user_message, assistant_message)
+                    await ConversationManager(db).update_summary(session_id, summary)
+        except Exception as e:
+            logger.warning(f"Failed to update summary for session {session_id}: {e}")
+        finally:
+            # Drop the lock once no update for the session is running or queued
+            self._lock_users[session_id] -= 1
+            if not self._lock_users[session_id]:
+                del self._lock_users[session_id]
+                del self._locks[session_id]
+
+
+# Singleton instance
+_conversation_summary_service: Optional[ConversationSummaryService] = None
+
+# Strong references to in-flight updates so they are not garbage collected
+_pending_updates: Set[asyncio.Task] = set()
+
+
+def get_conversation_summary_service() -> ConversationSummaryService:
+    """Get or create singleton conversation summary service instance."""
+    global _conversation_summary_service
+    if _conversation_summary_service is None:
+        _conversation_summary_service = ConversationSummaryService()
+    return _conversation_summary_service
+
+
+def schedule_summary_update(session_id: uuid.UUID, user_message: str, assistant_message: str) -> None:
+    """
+    Update a session's rolling summary in the background.
+
+    Returns immediately; the response is never held up by summarization.
+
+    Args:
+        session_id: UUID of the conversation session
+        user_message: User's message in the latest exchange
+        assistant_message: Assistant's reply in the latest exchange
+    """
+    if not settings.CONVERSATION_SUMMARY_ENABLED:
+        return
+
+    task = asyncio.get_running_loop().create_task(
+        get_conversation_summary_service().update_session_summary(session_id, user_message, assistant_message)
+    )
+    _pending_updates.add(task)
+    task.add_done_callback(_pending_updates.discard)
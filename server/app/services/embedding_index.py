@@ -0,0 +1,202 @@
+"""
+In-memory embedding index with optional dimensionality reduction and
+int8 scalar quantization.
+
+Used by VectorSearchService to keep the per-worker footprint of the verse
+(and future commentary) vectors small:
+- Reduction: Matryoshka-style truncation to the first N dimensions, or PCA
+- Quantization: per-dimension symmetric int8 codes (4x smaller than float32)
+
+Approximate scores from the compressed vectors only select candidates; the
+top candidates are rescored against full-precision vectors fetched on demand.
+"""
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+VALID_REDUCTIONS = ("none", "truncate", "pca")
+VALID_QUANTIZATIONS = ("none", "int8")
+
+# Rows scored per block when dequantizing int8 codes, bounds temporary memory
+_SCORE_BLOCK_ROWS = 4096
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so that dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class EmbeddingIndex:
+    """
+    Compressed exact-scan index over a fixed set of embeddings.
+
+    Stores either float32 or int8 codes of the (optionally reduced) vectors
+    and scores a query against all rows with a single matrix product.
+    """
+
+    def __init__(
+        self,
+        reduction: str = "none",
+        reduced_dim: Optional[int] = None,
+        quantization: str = "none"
+    ):
+        """
+        Args:
+            reduction: 'none', 'truncate' (Matryoshka prefix) or 'pca'
+            reduced_dim: Target dimensionality when reduction is enabled
+            quantization: 'none' (float32) or 'int8'
+        """
+        if reduction not in VALID_REDUCTIONS:
+            raise ValueError(f"Invalid reduction: {reduction}. Must be one of: {list(VALID_REDUCTIONS)}")
+        if quantization not in VALID_QUANTIZATIONS:
+            raise ValueError(f"Invalid quantization: {quantization}. Must be one of: {list(VALID_QUANTIZATIONS)}")
+        if reduction != "none" and not reduced_dim:
+            raise ValueError("reduced_dim is required when reduction is enabled")
+
+        self.reduction = reduction
+        self.reduced_dim = reduced_dim
+        self.quantization = quantization
+
+        self.ids: List[str] = []
+        self._vectors: Optional[np.ndarray] = None   # float32 or int8 codes
+        self._scales: Optional[np.ndarray] = None    # per-dimension int8 scales
+        self._pca_mean: Optional[np.ndarray] = None
+        self._pca_components: Optional[np.ndarray] = None
+
+    def build(self, ids: Sequence[str], embeddings) -> "EmbeddingIndex":
+        """
+        Fit the reduction/quantization on the given embeddings and store them.
+
+        Args:
+            ids: Identifiers aligned with the embedding rows
+            embeddings: Array-like of shape (n, d)
+
+        Returns:
+            The index itself, for chaining
+        """
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("ids and embeddings must have the same length")
+
+        if self.reduction == "pca":
+            dim = min(self.reduced_dim, vectors.shape[1], vectors.shape[0])
+            self._pca_mean = vectors.mean(axis=0)
+            _, _, vt = np.linalg.svd(vectors - self._pca_mean, full_matrices=False)
+            self._pca_components = vt[:dim].astype(np.float32)
+
+        reduced = self.project(vectors)
+
+        if self.quantization == "int8":
+            scales = np.abs(reduced).max(axis=0) / 127.0
+            scales[scales == 0] = 1.0
+            self._scales = scales.astype(np.float32)
+            self._vectors = np.clip(np.rint(reduced / self._scales), -127, 127).astype(np.int8)
+        else:
+            self._vectors = np.ascontiguousarray(reduced, dtype=np.float32)
+
+        self.ids = list(ids)
+        logger.info(
+            f"Built embedding index: {len(self.ids)} vectors, dim={self.dim}, "
+            f"reduction={self.reduction}, quantization={self.quantization}, "
+            f"{self.bytes_per_vector:.0f} bytes/vector"
+        )
+        return self
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """Apply the fitted reduction to full-dimension vectors and re-normalize."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.reduction == "truncate":
+            vectors = vectors[..., :self.reduced_dim]
+        elif self.reduction == "pca":
+            vectors = (vectors - self._pca_mean) @ self._pca_components.T
+        return _normalize(vectors).astype(np.float32)
+
+    def score(self, query_embedding) -> np.ndarray:
+        """
+        Approximate cosine similarity of a full-dimension query against all rows.
+
+        Args:
+            query_embedding: Query vector of shape (d,)
+
+        Returns:
+            Array of shape (n,) with approximate similarity scores
+        """
+        query = self.project(_normalize(np.asarray(query_embedding, dtype=np.float32)))
+
+        if self.quantization == "int8":
+            # x ≈ codes * scales, so x·q = codes·(scales * q)
+            scaled_query = query * self._scales
+            scores = np.empty(len(self.ids), dtype=np.float32)
+            for start in range(0, len(self.ids), _SCORE_BLOCK_ROWS):
+                block = self._vectors[start:start + _SCORE_BLOCK_ROWS]
+                scores[start:start + len(block)] = block.astype(np.float32) @ scaled_query
+            return scores
+
+        return self._vectors @ query
+
+    def search(
+        self,
+        query_embedding,
+        top_k: int,
+        rescore_candidates: int = 0,
+        fetch_vectors: Optional[Callable[[List[str]], np.ndarray]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the most similar rows, optionally rescoring with full precision.
+
+        Args:
+            query_embedding: Full-dimension query vector
+            top_k: Number of results to return
+            rescore_candidates: Number of approximate candidates to rescore
+            fetch_vectors: Callable returning float vectors for candidate ids;
+                           rescoring is skipped when not provided
+
+        Returns:
+            List of (id, similarity) tuples sorted by similarity descending
+        """
+        if not self.ids:
+            return []
+
+        scores = self.score(query_embedding)
+        n_candidates = min(max(top_k, rescore_candidates), len(self.ids))
+        candidate_idx = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+
+        if fetch_vectors is not None and rescore_candidates > 0:
+            candidate_ids = [self.ids[i] for i in candidate_idx]
+            full_vectors = _normalize(np.asarray(fetch_vectors(candidate_ids), dtype=np.float32))
+            query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+            exact_scores = full_vectors @ query
+            ranked = sorted(zip(candidate_ids, exact_scores.tolist()), key=lambda x: x[1], reverse=True)
+            return ranked[:top_k]
+
+        ranked_idx = candidate_idx[np.argsort(-scores[candidate_idx])][:top_k]
+        return [(self.ids[i], float(scores[i])) for i in ranked_idx]
+
+    @property
+    def dim(self) -> int:
+        """Stored dimensionality after reduction."""
+        return 0 if self._vectors is None else self._vectors.shape[1]
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by stored vectors plus reduction/quantization parameters."""
+        total = 0
+        for array in (self._vectors, self._scales, self._pca_mean, self._pca_components):
+            if array is not None:
+                total += array.nbytes
+        return total
+
+    @property
+    def bytes_per_vector(self) -> float:
+        """Bytes per stored vector, excluding shared parameters."""
+        if self._vectors is None or not self.ids:
+            return 0.0
+        return self._vectors.nbytes / len(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
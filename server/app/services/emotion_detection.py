@@ -2,6 +2,8 @@ from transformers import AutoTokenizer, pipeline
 from optimum.onnxruntime import ORTModelForSequenceClassification
 from typing import List, Dict
 from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.emotion_metadata import EMOTION_EMOJI_MAP
 
 
 class EmotionDetectionService:
@@ -31,48 +33,8 @@ class EmotionDetectionService:
             function_to_apply="sigmoid"  # Multi-label classification
         )
         
-        # Comprehensive emotion-to-emoji-color mapping for all 28 GoEmotions
-        self.emotion_emoji_map = {
-            # Positive emotions
-            "joy": {"emoji": "😊", "color": "#FEF3C7"},
-            "admiration": {"emoji": "🤩", "color": "#FEF3C7"},
-            "approval": {"emoji": "👍", "color": "#D1FAE5"},
-            "gratitude": {"emoji": "🙏", "color": "#FEF3C7"},
-            "love": {"emoji": "❤️", "color": "#FECACA"},
-            "optimism": {"emoji": "😊", "color": "#D1FAE5"},
-            "caring": {"emoji": "🤗", "color": "#D1FAE5"},
-            "excitement": {"emoji": "🎉", "color": "#FEF3C7"},
-            "amusement": {"emoji": "😄", "color": "#FEF3C7"},
-            "pride": {"emoji": "😌", "color": "#FEF3C7"},
-            "relief": {"emoji": "😌", "color": "#D1FAE5"},
-            
-            # Ambiguous emotions
-            "desire": {"emoji": "🤔", "color": "#E0E7FF"},
-            "realization": {"emoji": "💡", "color": "#FEF3C7"},
-            "curiosity": {"emoji": "🤔", "color": "#E0E7FF"},
-            "neutral": {"emoji": "😐", "color": "#F3F4F6"},
-            
-            # Negative emotions - sadness
-            "sadness": {"emoji": "😢", "color": "#DBEAFE"},
-            "disappointment": {"emoji": "😞", "color": "#DBEAFE"},
-            "grief": {"emoji": "😭", "color": "#DBEAFE"},
-            "remorse": {"emoji": "😔", "color": "#DBEAFE"},
-            "embarrassment": {"emoji": "😳", "color": "#FEE2E2"},
-            
-            # Negative emotions - anger
-            "anger": {"emoji": "😠", "color": "#FEE2E2"},
-            "annoyance": {"emoji": "😒", "color": "#FEE2E2"},
-            "disapproval": {"emoji": "👎", "color": "#FEE2E2"},
-            "disgust": {"emoji": "🤢", "color": "#FEE2E2"},
-            
-            # Negative emotions - fear/anxiety
-            "fear": {"emoji": "😰", "color": "#EDE9FE"},
-            "nervousness": {"emoji": "😰", "color": "#E0E7FF"},
-            
-            # Confusion
-            "confusion": {"emoji": "😕", "color": "#F3F4F6"},
-            "surprise": {"emoji": "😲", "color": "#E0E7FF"},
-        }
+        self.emotion_emoji_map = EMOTION_EMOJI_MAP
+        self._inflight = SingleFlight("emotion")
     
     def detect_emotion(
         self, 
@@ -106,6 +68,11 @@ class EmotionDetectionService:
                 }
             ]
         """
+        # Identical concurrent inputs share one inference call
+        return self._inflight.do((text, threshold), self._detect, text, threshold)
+    
+    def _detect(self, text: str, threshold: float) -> List[Dict[str, any]]:
+        """Run the classifier and map scores above the threshold to emotion dicts."""
         try:
             # Run inference
             results = self.classifier([text])[0]
@@ -0,0 +1,52 @@
+"""
+Display metadata (emoji and color) for the 28 GoEmotions labels.
+
+Kept apart from EmotionDetectionService so callers that only need the
+mapping, such as the analytics endpoints, do not load the model.
+"""
+
+# Comprehensive emotion-to-emoji-color mapping for all 28 GoEmotions
+EMOTION_EMOJI_MAP = {
+    # Positive emotions
+    "joy": {"emoji": "😊", "color": "#FEF3C7"},
+    "admiration": {"emoji": "🤩", "color": "#FEF3C7"},
+    "approval": {"emoji": "👍", "color": "#D1FAE5"},
+    "gratitude": {"emoji": "🙏", "color": "#FEF3C7"},
+    "love": {"emoji": "❤️", "color": "#FECACA"},
+    "optimism": {"emoji": "😊", "color": "#D1FAE5"},
+    "caring": {"emoji": "🤗", "color": "#D1FAE5"},
+    "excitement": {"emoji": "🎉", "color": "#FEF3C7"},
+    "amusement": {"emoji": "😄", "color": "#FEF3C7"},
+    "pride": {"emoji": "😌", "color": "#FEF3C7"},
+    "relief": {"emoji": "😌", "color": "#D1FAE5"},
+
+    # Ambiguous emotions
+    "desire": {"emoji": "🤔", "color": "#E0E7FF"},
+    "realization": {"emoji": "💡", "color": "#FEF3C7"},
+    "curiosity": {"emoji": "🤔", "color": "#E0E7FF"},
+    "neutral": {"emoji": "😐", "color": "#F3F4F6"},
+
+    # Negative emotions - sadness
+    "sadness": {"emoji": "😢", "color": "#DBEAFE"},
+    "disappointment": {"emoji": "😞", "color": "#DBEAFE"},
+    "grief": {"emoji": "😭", "color": "#DBEAFE"},
+    "remorse": {"emoji": "😔", "color": "#DBEAFE"},
+    "embarrassment": {"emoji": "😳", "color": "#FEE2E2"},
+
+    # Negative emotions - anger
+    "anger": {"emoji": "😠", "color": "#FEE2E2"},
+    "annoyance": {"emoji": "😒", "color": "#FEE2E2"},
+    "disapproval": {"emoji": "👎", "color": "#FEE2E2"},
+    "disgust": {"emoji": "🤢", "color": "#FEE2E2"},
+
+    # Negative emotions - fear/anxiety
+    "fear": {"emoji": "😰", "color": "#EDE9FE"},
+    "nervousness": {"emoji": "😰", "color": "#E0E7FF"},
+
+    # Confusion
+    "confusion": {"emoji": "😕", "color": "#F3F4F6"},
+    "surprise": {"emoji": "😲", "color": "#E0E7FF"},
+}
+
+# Metadata for labels missing from the mapping
+DEFAULT_EMOTION_META = {"emoji": "😐", "color": "#F3F4F6"}
@@ -9,6 +9,7 @@ Classifies user input into three categories:
 from transformers import pipeline
 from typing import Dict, Tuple
 from app.core.config import settings
+from app.core.singleflight import SingleFlight
 import re
 
 
@@ -51,6 +52,7 @@ class IntentClassificationService:
         except Exception as e:
             print(f"Warning: Could not initialize intent classifier: {e}")
             self.classifier = None
+        self._inflight = SingleFlight("intent")
     
     def classify_intent(self, user_input: str) -> Tuple[str, float]:
         """
@@ -80,6 +82,11 @@ class IntentClassificationService:
         if not self.classifier:
             return self._classify_by_heuristics(user_input)
         
+        # Identical concurrent prompts share one model call
+        return self._inflight.do(user_input, self._classify_with_model, user_input)
+    
+    def _classify_with_model(self, user_input: str) -> Tuple[str, float]:
+        """Run the zero-shot classifier, falling back to heuristics on error."""
         try:
             # Prepare candidate labels with descriptions
             candidate_labels = list(self.INTENT_LABELS.keys())
@@ -107,6 +114,22 @@ class IntentClassificationService:
             # Fallback to heuristics
             return self._classify_by_heuristics(user_input)
     
+    def classify_intent_fast(self, user_input: str) -> Tuple[str, float]:
+        """
+        Classify user input with rules and keyword heuristics only (no model call).
+        
+        Used when the chat pipeline is degraded under load.
+        
+        Args:
+            user_input: User's message text
+            
+        Returns:
+            Tuple of (intent_label, confidence_score)
+        """
+        if self._is_casual_by_rules(user_input):
+            return ("casual_chat", 0.95)
+        return self._classify_by_heuristics(user_input)
+    
     def _is_casual_by_rules(self, text: str) -> bool:
         """
         Check if text matches casual conversation patterns.
@@ -0,0 +1,108 @@
+"""
+Lightweight BM25 keyword index for hybrid verse search.
+
+Complements the dense embedding index with exact term matching on the
+English translations (e.g. "dharma", "karma", "restless mind").
+"""
+from collections import Counter
+from typing import Dict, List, Sequence
+import math
+import re
+
+import numpy as np
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+_STOPWORDS = frozenset("""
+a about above after again all am an and any are as at be because been before being
+below between both but by can did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it
+its itself just me more most my myself no nor not now of off on once only or other our
+ours ourselves out over own same she should so some such than that the their theirs
+them themselves then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours
+yourself yourselves o thou thee thy thine shall
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split into alphabetic tokens and drop stopwords."""
+    return [
+        token for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in _STOPWORDS and len(token) > 1
+    ]
+
+
+class LexicalIndex:
+    """
+    Okapi BM25 index over a fixed set of documents.
+
+    Scores are returned as a dense array aligned with the build order, so they
+    can be fused directly with EmbeddingIndex scores.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self._postings: Dict[str, List[tuple]] = {}
+        self._idf: Dict[str, float] = {}
+        self._doc_lengths = np.zeros(0, dtype=np.float32)
+
+    def build(self, ids: Sequence[str], documents: Sequence[str]) -> "LexicalIndex":
+        """
+        Index the given documents.
+
+        Args:
+            ids: Identifiers aligned with the documents
+            documents: Raw document texts
+
+        Returns:
+            The index itself, for chaining
+        """
+        self.ids = list(ids)
+        self._postings = {}
+        lengths = []
+
+        for doc_idx, document in enumerate(documents):
+            term_counts = Counter(tokenize(document or ""))
+            lengths.append(sum(term_counts.values()))
+            for term, count in term_counts.items():
+                self._postings.setdefault(term, []).append((doc_idx, count))
+
+        n_docs = len(self.ids)
+        self._doc_lengths = np.asarray(lengths, dtype=np.float32)
+        self._idf = {
+            term: math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+        return self
+
+    def score(self, query: str) -> np.ndarray:
+        """
+        BM25 score of the query against every document.
+
+        Args:
+            query: Raw query text
+
+        Returns:
+            Array of shape (n,) with non-negative scores
+        """
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        if not self.ids:
+            return scores
+
+        avg_length = float(self._doc_lengths.mean()) or 1.0
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for doc_idx, count in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_idx] / avg_length)
+                scores[doc_idx] += idf * count * (self.k1 + 1) / (count + norm)
+        return scores
+
+    def __len__(self) -> int:
+        return len(self.ids)
@@ -0,0 +1,297 @@
+"""
+Pluggable LLM backends for reflection and casual chat generation.
+
+Backends expose the same `generate_content(prompt, stream=False)` and
+`generate_content_async(prompt, stream=False)` call shapes as
+`genai.GenerativeModel`, returning objects with a `.text` attribute, plus an
+optional `system_instruction` for the static persona:
+- gemini: Google Gemini API (default)
+- fake: local stand-in with configurable latency and token throughput,
+        used for load testing without spending Gemini quota
+"""
+from abc import ABC, abstractmethod
+import google.generativeai as genai
+from google.generativeai import caching
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+import asyncio
+import datetime
+import logging
+import random
+import threading
+import time
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend(ABC):
+    """Base class for LLM backends."""
+
+    name = "base"
+
+    @abstractmethod
+    def generate_content(self, prompt: str, stream: bool = False, system_instruction: Optional[str] = None):
+        """
+        Generate a completion for the prompt.
+
+        Args:
+            prompt: Per-request prompt text
+            stream: Return an iterator of partial responses instead of one response
+            system_instruction: Static persona/instructions, cacheable by the provider
+
+        Returns:
+            Response object with a `.text` attribute, or an iterator of them when streaming
+        """
+
+    @abstractmethod
+    async def generate_content_async(
+        self,
+        prompt: str,
+        stream: bool = False,
+        system_instruction: Optional[str] = None
+    ):
+        """
+        Async variant of generate_content.
+
+        Returns:
+            Response object with a `.text` attribute, or an async iterator of them when streaming
+        """
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Google Gemini backend using google-generativeai.
+
+    One GenerativeModel is kept per system instruction. When
+    LLM_CONTEXT_CACHE_ENABLED is set the instruction is stored with Gemini
+    context caching, so its tokens are billed at the cached rate and not
+    re-processed on every call. Models (or instructions) below the provider's
+    minimum cacheable size fall back to a plain system instruction.
+    """
+
+    name = "gemini"
+
+    def __init__(self, model_name: Optional[str] = None):
+        """Initialize Gemini API client."""
+        if not settings.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self.model_name = model_name or settings.LLM_MODEL
+        self.model = genai.GenerativeModel(self.model_name)
+
+        # system instruction -> (model, monotonic expiry of its context cache)
+        self._models: Dict[str, Tuple[genai.GenerativeModel, float]] = {}
+        self._models_lock = threading.Lock()
+        # Serializes async (re)creation per instruction without blocking the event loop
+        self._async_locks: Dict[str, asyncio.Lock] = {}
+
+    def generate_content(self, prompt: str, stream: bool = False, system_instruction: Optional[str] = None):
+        return self._model_for(system_instruction).generate_content(prompt, stream=stream)
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        stream: bool = False,
+        system_instruction: Optional[str] = None
+    ):
+        # Uses the library's shared async gRPC client, so connections are reused across calls
+        model = await self._model_for_async(system_instruction)
+        return await model.generate_content_async(prompt, stream=stream)
+
+    def _model_for(self, system_instruction: Optional[str]) -> genai.GenerativeModel:
+        """GenerativeModel bound to the system instruction, created once and refreshed before its cache expires."""
+        if not system_instruction:
+            return self.model
+
+        cached = self._models.get(system_instruction)
+        if cached is None or time.monotonic() >= cached[1]:
+            with self._models_lock:
+                cached = self._models.get(system_instruction)
+                if cached is None or time.monotonic() >= cached[1]:
+                    cached = self._create_model(system_instruction)
+                    self._models[system_instruction] = cached
+        return cached[0]
+
+    async def _model_for_async(self, system_instruction: Optional[str]) -> genai.GenerativeModel:
+        """
+        Async variant of _model_for.
+
+        Creating a context cache is a blocking API call, so it runs in the
+        thread pool, once per instruction at a time. While a cache is being
+        refreshed, other requests keep using the current model: refreshes
+        start at 90% of the TTL, so its cache is still valid.
+        """
+        if not system_instruction:
+            return self.model
+
+        cached = self._models.get(system_instruction)
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+
+        lock = self._async_locks.setdefault(system_instruction, asyncio.Lock())
+        if cached is not None and lock.locked():
+            return cached[0]
+
+        async with lock:
+            cached = self._models.get(system_instruction)
+            if cached is None or time.monotonic() >= cached[1]:
+                cached = await run_in_threadpool(self._create_model, system_instruction)
+                with self._models_lock:
+                    self._models[system_instruction] = cached
+        return cached[0]
+
+    def _create_model(self, system_instruction: str) -> Tuple[genai.GenerativeModel, float]:
+        if settings.LLM_CONTEXT_CACHE_ENABLED:
+            ttl_seconds = settings.LLM_CONTEXT_CACHE_TTL_SECONDS
+            try:
+                cached_content = caching.CachedContent.create(
+                    model=self.model_name if self.model_name.startswith("models/") else f"models/{self.model_name}",
+                    system_instruction=system_instruction,
+                    ttl=datetime.timedelta(seconds=ttl_seconds)
+                )
+                logger.info(f"Created Gemini context cache {cached_content.name} for system instruction")
+                # Recreate a little before the provider expires the cache
+                return (
+                    genai.GenerativeModel.from_cached_content(cached_content=cached_content),
+                    time.monotonic() + ttl_seconds * 0.9
+                )
+            except Exception as e:
+                logger.info(f"Context caching unavailable, sending system instruction uncached: {e}")
+
+        return genai.GenerativeModel(self.model_name, system_instruction=system_instruction), float("inf")
+
+
+class FakeUsageMetadata:
+    """Token usage in the shape of Gemini's usage_metadata."""
+
+    def __init__(self, prompt_token_count: int, candidates_token_count: int, cached_content_token_count: int = 0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = cached_content_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    """Completion returned by FakeLLMBackend."""
+
+    def __init__(self, text: str, usage_metadata: Optional[FakeUsageMetadata] = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Local Gemini stand-in for load testing.
+
+    Simulates time-to-first-token latency followed by token generation at a
+    fixed throughput, and returns a Krishna-voice placeholder reflection.
+    """
+
+    name = "fake"
+
+    _FILLER = (
+        "Partha, steady your mind like a lamp in a windless place. Act with devotion, "
+        "let go of the fruits of action, and remain established in yoga. "
+    ).split()
+
+    def __init__(
+        self,
+        latency_ms: Optional[float] = None,
+        tokens_per_second: Optional[float] = None,
+        output_tokens: Optional[int] = None,
+        jitter: float = 0.1
+    ):
+        """
+        Args:
+            latency_ms: Time to first token in milliseconds
+            tokens_per_second: Output token throughput after the first token
+            output_tokens: Number of tokens (words) per completion
+            jitter: Relative random variation applied to latency and throughput
+        """
+        self.latency_ms = latency_ms if latency_ms is not None else settings.FAKE_LLM_LATENCY_MS
+        self.tokens_per_second = tokens_per_second or settings.FAKE_LLM_TOKENS_PER_SECOND
+        self.output_tokens = output_tokens or settings.FAKE_LLM_OUTPUT_TOKENS
+        self.jitter = jitter
+
+    def generate_content(self, prompt: str, stream: bool = False, system_instruction: Optional[str] = None):
+        tokens = self._compose_tokens()
+        usage = self._usage(prompt, system_instruction, len(tokens))
+
+        if stream:
+            return self._stream(tokens, usage)
+
+        time.sleep(self._first_token_delay() + len(tokens) * self._token_delay())
+        return FakeResponse(" ".join(tokens), usage)
+
+    def _stream(self, tokens, usage: FakeUsageMetadata) -> Iterator[FakeResponse]:
+        """Yield tokens one by one at the configured throughput."""
+        time.sleep(self._first_token_delay())
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self._token_delay())
+            yield FakeResponse(token if i == 0 else f" {token}", usage if i == len(tokens) - 1 else None)
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        stream: bool = False,
+        system_instruction: Optional[str] = None
+    ):
+        tokens = self._compose_tokens()
+        usage = self._usage(prompt, system_instruction, len(tokens))
+
+        if stream:
+            return self._stream_async(tokens, usage)
+
+        await asyncio.sleep(self._first_token_delay() + len(tokens) * self._token_delay())
+        return FakeResponse(" ".join(tokens), usage)
+
+    async def _stream_async(self, tokens, usage: FakeUsageMetadata) -> AsyncIterator[FakeResponse]:
+        await asyncio.sleep(self._first_token_delay())
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(self._token_delay())
+            yield FakeResponse(token if i == 0 else f" {token}", usage if i == len(tokens) - 1 else None)
+
+    def _usage(self, prompt: str, system_instruction: Optional[str], output_tokens: int) -> FakeUsageMetadata:
+        """Approximate Gemini token accounting (~4 characters per token)."""
+        system_tokens = len(system_instruction or "") // 4
+        cached_tokens = system_tokens if settings.LLM_CONTEXT_CACHE_ENABLED else 0
+        return FakeUsageMetadata(len(prompt) // 4 + system_tokens, output_tokens, cached_tokens)
+
+    def _compose_tokens(self):
+        tokens = ["🙏", "Namaste,", "dear", "one."]
+        while len(tokens) < self.output_tokens:
+            tokens.extend(self._FILLER)
+        return tokens[:self.output_tokens]
+
+    def _vary(self, value: float) -> float:
+        return max(0.0, value * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _first_token_delay(self) -> float:
+        return self._vary(self.latency_ms / 1000)
+
+    def _token_delay(self) -> float:
+        return self._vary(1 / self.tokens_per_second)
+
+
+_BACKENDS = {
+    GeminiBackend.name: GeminiBackend,
+    FakeLLMBackend.name: FakeLLMBackend,
+}
+
+# Singleton instance
+_llm_backend: Optional[LLMBackend] = None
+
+
+def get_llm_backend() -> LLMBackend:
+    """Get or create the singleton LLM backend selected by LLM_BACKEND."""
+    global _llm_backend
+    if _llm_backend is None:
+        backend_name = settings.LLM_BACKEND
+        if backend_name not in _BACKENDS:
+            raise ValueError(f"Invalid LLM backend: {backend_name}. Must be one of: {list(_BACKENDS)}")
+        _llm_backend = _BACKENDS[backend_name]()
+    return _llm_backend
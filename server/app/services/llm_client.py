@@ -0,0 +1,347 @@
+"""
+Shared async LLM client used by the reflection and casual chat services.
+
+Wraps the configured LLM backend with:
+- a deadline per call (covering queueing, retries and backoff)
+- a bounded semaphore capping in-flight upstream requests per worker
+- retries with jittered exponential backoff
+- a circuit breaker that fails fast while the upstream is unhealthy, so
+  callers go straight to their template fallbacks
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+import asyncio
+import logging
+import random
+import time
+
+from app.core.config import settings
+from app.core import metrics
+from app.services.llm_backend import LLMBackend, get_llm_backend
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailableError(Exception):
+    """The LLM call was not attempted or could not complete in time."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """The circuit breaker is open; the upstream is not being called."""
+
+
+class LLMOverloadedError(LLMUnavailableError):
+    """No concurrency slot became free before the call's deadline."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after `failure_threshold` consecutive failures. After
+    `reset_seconds` one trial call is let through (half-open); its success
+    closes the circuit and its failure re-opens it. The trial is identified
+    by a token so that only its own caller can release it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial: Optional[int] = None
+        self._trial_seq = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> Tuple[bool, Optional[int]]:
+        """
+        Whether a call may be sent upstream now.
+
+        Returns:
+            (allowed, trial) where trial is a token if this call is the
+            half-open trial, to be passed to release_trial()
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True, None
+        if state == self.HALF_OPEN and self._trial is None:
+            self._trial_seq += 1
+            self._trial = self._trial_seq
+            return True, self._trial
+        return False, None
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("LLM circuit breaker closed")
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial = None
+
+    def release_trial(self, trial: Optional[int]) -> None:
+        """Let another trial through if this caller's trial ended without a verdict (e.g. cancelled)."""
+        if trial is not None and trial == self._trial:
+            self._trial = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        trial_failed = self._trial is not None
+        if trial_failed or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None or trial_failed:
+                logger.warning(f"LLM circuit breaker opened after {self.consecutive_failures} consecutive failures")
+            self.opened_at = time.monotonic()
+        self._trial = None
+
+
+class AsyncLLMClient:
+    """Async, deadline-bounded access to the shared LLM backend."""
+
+    def __init__(
+        self,
+        backend: Optional[LLMBackend] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Args:
+            backend: LLM backend (defaults to the LLM_BACKEND singleton)
+            timeout: Deadline in seconds for one generate call, including retries
+            max_concurrency: Maximum in-flight upstream calls
+            max_retries: Retries after the first failed attempt
+            backoff_seconds: Base delay for jittered exponential backoff
+            breaker: Circuit breaker (defaults to one built from settings)
+        """
+        self.backend = backend or get_llm_backend()
+        self.timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.max_retries = max_retries if max_retries is not None else settings.LLM_MAX_RETRIES
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else settings.LLM_RETRY_BACKOFF_SECONDS
+        self.breaker = breaker or CircuitBreaker(
+            settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            settings.LLM_CIRCUIT_RESET_SECONDS
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._in_flight = 0
+        self.usage_totals = {"requests": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "output_tokens": 0}
+
+    @asynccontextmanager
+    async def _slot(self, timeout: float):
+        """Hold one concurrency slot, waiting at most `timeout` seconds for it."""
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            raise LLMOverloadedError(f"No LLM slot free within {timeout:.1f}s ({self.max_concurrency} in flight)")
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, self.backoff_seconds * (2 ** attempt))
+
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        """
+        Generate a completion within the call deadline.
+
+        Args:
+            prompt: Per-request prompt text
+            system_instruction: Static persona/instructions for the backend to cache
+
+        Returns:
+            Generated text
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            LLMOverloadedError: If no concurrency slot frees up before the deadline
+            LLMUnavailableError: If the deadline expires during generation
+            Exception: The last upstream error once retries are exhausted
+        """
+        allowed, trial = self.breaker.allow_request()
+        if not allowed:
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        last_error: Optional[Exception] = None
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    async with self._slot(remaining):
+                        with metrics.span("llm.call"):
+                            response = await asyncio.wait_for(
+                                self.backend.generate_content_async(prompt, system_instruction=system_instruction),
+                                timeout=deadline - loop.time()
+                            )
+                    if not response.text:
+                        raise Exception("Empty response from LLM backend")
+                    self._record_usage(response)
+                    self.breaker.record_success()
+                    return response.text
+
+                except LLMOverloadedError:
+                    # Local back-pressure, not an upstream failure
+                    raise
+                except asyncio.TimeoutError:
+                    last_error = LLMUnavailableError(f"LLM call exceeded {self.timeout:.1f}s deadline")
+                    self.breaker.record_failure()
+                except Exception as e:
+                    last_error = e
+                    self.breaker.record_failure()
+
+                if attempt == self.max_retries:
+                    break
+                allowed, retry_trial = self.breaker.allow_request()
+                trial = trial or retry_trial
+                if not allowed:
+                    break
+                delay = min(self._backoff(attempt), max(deadline - loop.time(), 0))
+                logger.warning(f"LLM attempt {attempt + 1} failed ({last_error}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+            raise last_error or LLMUnavailableError(f"LLM call exceeded {self.timeout:.1f}s deadline")
+        finally:
+            self.breaker.release_trial(trial)
+
+    async def stream(self, prompt: str, system_instruction: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream completion text chunks.
+
+        Streams are not retried once started. The first chunk must arrive
+        within the call deadline and each later chunk within the same
+        interval of the previous one.
+
+        Args:
+            prompt: Per-request prompt text
+            system_instruction: Static persona/instructions for the backend to cache
+
+        Yields:
+            Text chunks in generation order
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            LLMOverloadedError: If no concurrency slot frees up before the deadline
+            LLMUnavailableError: If the first or a subsequent chunk is late
+        """
+        allowed, trial = self.breaker.allow_request()
+        if not allowed:
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+
+        try:
+            async with self._slot(deadline - loop.time()):
+                started = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(
+                        self.backend.generate_content_async(
+                            prompt, stream=True, system_instruction=system_instruction
+                        ),
+                        timeout=deadline - loop.time()
+                    )
+                    chunks = response.__aiter__()
+                    first_chunk = True
+                    last_chunk = None
+                    while True:
+                        wait = deadline - loop.time() if first_chunk else self.timeout
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(wait, 0))
+                        except StopAsyncIteration:
+                            break
+                        if first_chunk:
+                            metrics.record("llm.first_chunk", time.perf_counter() - started)
+                        first_chunk = False
+                        # Gemini reports usage on the final chunk
+                        if getattr(chunk, "usage_metadata", None) is not None:
+                            last_chunk = chunk
+                        if chunk.text:
+                            yield chunk.text
+                except asyncio.TimeoutError:
+                    self.breaker.record_failure()
+                    raise LLMUnavailableError(f"LLM stream stalled beyond {self.timeout:.1f}s")
+                except Exception:
+                    self.breaker.record_failure()
+                    raise
+
+            if last_chunk is not None:
+                self._record_usage(last_chunk)
+            self.breaker.record_success()
+        finally:
+            self.breaker.release_trial(trial)
+
+    def _record_usage(self, response) -> None:
+        """Log per-request token counts and add them to the running totals."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        cached_tokens = getattr(usage, "cached_content_token_count", 0) or 0
+        output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+
+        self.usage_totals["requests"] += 1
+        self.usage_totals["prompt_tokens"] += prompt_tokens
+        self.usage_totals["cached_prompt_tokens"] += cached_tokens
+        self.usage_totals["output_tokens"] += output_tokens
+        logger.info(f"LLM usage: prompt_tokens={prompt_tokens} cached_tokens={cached_tokens} output_tokens={output_tokens}")
+
+    def stats(self) -> Dict:
+        """Current client state and token usage for health checks."""
+        requests = self.usage_totals["requests"]
+        return {
+            "backend": self.backend.name,
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+            "usage": {
+                **self.usage_totals,
+                "avg_prompt_tokens": round(self.usage_totals["prompt_tokens"] / requests, 1) if requests else 0.0,
+            },
+        }
+
+
+# Singleton instances
+_llm_client: Optional[AsyncLLMClient] = None
+_summary_llm_client: Optional[AsyncLLMClient] = None
+
+
+def get_llm_client() -> AsyncLLMClient:
+    """Get or create the singleton async LLM client."""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = AsyncLLMClient()
+    return _llm_client
+
+
+def get_summary_llm_client() -> AsyncLLMClient:
+    """
+    Get or create the client for background conversation summaries.
+
+    It has its own concurrency cap and circuit breaker, so summary failures
+    and load never fail over or crowd out user-facing replies.
+    """
+    global _summary_llm_client
+    if _summary_llm_client is None:
+        _summary_llm_client = AsyncLLMClient(max_concurrency=settings.CONVERSATION_SUMMARY_MAX_CONCURRENCY)
+    return _summary_llm_client
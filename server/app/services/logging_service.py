@@ -1,22 +1,67 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Integer, JSON, func, and_, cast, extract, desc, select, true
 from typing import List, Dict, Optional, Any
-from datetime import date, datetime, timedelta
-from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from collections import defaultdict
 import uuid
 
 from app.models.emotion_log import EmotionLog
+from app.models.mood_rollup import DailyMoodRollup
 from app.models.user import User
 from app.schemas.emotion_log import EmotionLogCreate, MoodCalendarEntry
+from app.services.analytics_snapshot import get_analytics_snapshot_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Day names indexed by SQL day of week (0 = Sunday)
+WEEKDAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Timezone-aware UTC datetime (naive values, e.g. from SQLite, are taken as UTC)."""
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+def calendar_summary(user_input: str) -> str:
+    """Calendar summary of an interaction: the first 100 characters of the input."""
+    return user_input[:100] + "..." if len(user_input) > 100 else user_input
+
+
+def apply_log_to_rollup(rollup: DailyMoodRollup, log: EmotionLog) -> None:
+    """
+    Fold one emotion log into its day's rollup row, in place.
+    
+    Counts and verse IDs accumulate; the displayed emotion fields follow the
+    most recent log of the day, so logs may be applied in any order.
+    
+    Args:
+        rollup: Rollup row for the log's user and date
+        log: Emotion log with created_at set
+    """
+    counts = dict(rollup.emotion_counts or {})
+    counts[log.dominant_emotion] = counts.get(log.dominant_emotion, 0) + 1
+    rollup.emotion_counts = counts
+    rollup.interaction_count = (rollup.interaction_count or 0) + 1
+    
+    verse_ids = list(rollup.verse_ids or [])
+    rollup.verse_ids = verse_ids + [verse_id for verse_id in (log.verse_ids or []) if verse_id not in verse_ids]
+    
+    logged_at = _as_utc(log.created_at)
+    if rollup.last_logged_at is None or logged_at >= _as_utc(rollup.last_logged_at):
+        rollup.dominant_emotion = log.dominant_emotion
+        rollup.emotion_confidence = log.emotion_confidence
+        rollup.emotion_emoji = log.emotion_emoji
+        rollup.emotion_color = log.emotion_color
+        rollup.all_emotions = log.all_emotions or []
+        rollup.summary = calendar_summary(log.user_input)
+        rollup.last_logged_at = logged_at
+
 
 class LoggingService:
     """Service for logging user interactions and providing mood tracking analytics."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
     async def log_interaction(
@@ -25,30 +70,44 @@ class LoggingService:
         user_input: str,
         emotion_data: Dict[str, Any],
         verse_ids: List[str],
-        session_id: Optional[uuid.UUID] = None
+        session_id: Optional[uuid.UUID] = None,
+        log_id: Optional[uuid.UUID] = None,
+        log_date: Optional[date] = None
     ) -> EmotionLog:
         """
         Log user interaction for mood tracking.
         
+        Passing a client-generated log_id makes the call idempotent: an
+        existing entry with that id is returned instead of logging twice.
+        
         Args:
             user_id: UUID of the user
             user_input: The user's input text
             emotion_data: Dictionary containing emotion information
             verse_ids: List of verse IDs that were shown
             session_id: Optional conversation session ID
+            log_id: Optional client-generated log entry ID
+            log_date: Optional day of the interaction (default: today)
             
         Returns:
             EmotionLog: The created emotion log entry
         """
         try:
+            if log_id is not None:
+                existing = await self.db.get(EmotionLog, log_id)
+                if existing:
+                    logger.info(f"Emotion log {log_id} already stored, skipping")
+                    return existing
+            
             # Extract emotion information from emotion_data
             dominant_emotion = emotion_data.get('dominant', {})
             all_emotions = emotion_data.get('emotions', [])
             
             # Create emotion log entry
             emotion_log = EmotionLog(
+                id=log_id or uuid.uuid4(),
                 user_id=user_id,
-                log_date=date.today(),
+                log_date=log_date or date.today(),
                 user_input=user_input,
                 dominant_emotion=dominant_emotion.get('label', 'neutral'),
                 emotion_confidence=dominant_emotion.get('confidence', 0.0),
@@ -56,21 +115,129 @@ class LoggingService:
                 emotion_color=dominant_emotion.get('color', '#F3F4F6'),
                 all_emotions=all_emotions,
                 verse_ids=verse_ids,
-                session_id=session_id
+                session_id=session_id,
+                created_at=datetime.utcnow()
             )
             
+            # Log and day rollup are committed together
             self.db.add(emotion_log)
-            self.db.commit()
-            self.db.refresh(emotion_log)
+            await self._update_daily_rollup(emotion_log)
+            await self.db.commit()
+            
+            snapshot_cache = get_analytics_snapshot_cache()
+            if snapshot_cache is not None:
+                snapshot_cache.invalidate(user_id)
             
             logger.info(f"Logged interaction for user {user_id} with emotion {dominant_emotion.get('label')}")
             return emotion_log
             
         except Exception as e:
             logger.error(f"Error logging interaction: {e}")
-            self.db.rollback()
+            await self.db.rollback()
             raise
     
+    async def _update_daily_rollup(self, emotion_log: EmotionLog) -> None:
+        """
+        Add an emotion log to its user's rollup row for the day.
+        
+        The row is created if missing (ON CONFLICT DO NOTHING) and then
+        locked with SELECT ... FOR UPDATE, so concurrent logs for the same
+        day increment the counts one after the other.
+        """
+        key = and_(
+            DailyMoodRollup.user_id == emotion_log.user_id,
+            DailyMoodRollup.log_date == emotion_log.log_date
+        )
+        await self.db.execute(
+            self._insert(DailyMoodRollup).values(
+                user_id=emotion_log.user_id,
+                log_date=emotion_log.log_date,
+                dominant_emotion=emotion_log.dominant_emotion,
+                emotion_confidence=emotion_log.emotion_confidence,
+                emotion_emoji=emotion_log.emotion_emoji,
+                emotion_color=emotion_log.emotion_color,
+                summary="",
+                emotion_counts={},
+                interaction_count=0,
+                verse_ids=[],
+                last_logged_at=emotion_log.created_at
+            ).on_conflict_do_nothing(index_elements=["user_id", "log_date"])
+        )
+        rollup = await self.db.scalar(
+            select(DailyMoodRollup).where(key).with_for_update().execution_options(populate_existing=True)
+        )
+        apply_log_to_rollup(rollup, emotion_log)
+    
+    def _insert(self, model):
+        """Dialect-specific INSERT supporting ON CONFLICT."""
+        if self.db.get_bind().dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        return insert(model)
+    
+    @property
+    def _dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+    
+    def _day_offset(self, column, start_date: date):
+        """SQL expression: whole days from start_date to a date column."""
+        if self._dialect == "sqlite":
+            return cast(func.julianday(column) - func.julianday(start_date.isoformat()), Integer)
+        return column - start_date
+    
+    def _day_of_week(self, column):
+        """SQL expression: day of week of a date column (0 = Sunday)."""
+        if self._dialect == "sqlite":
+            return cast(func.strftime('%w', column), Integer)
+        return cast(extract('dow', column), Integer)
+    
+    async def _aggregate_emotion_counts(
+        self,
+        user_id: uuid.UUID,
+        start_date: date,
+        end_date: date,
+        *group_by
+    ) -> List[Any]:
+        """
+        Sum the per-emotion counts of a user's daily rollups in SQL.
+        
+        Each rollup's emotion_counts JSON object is expanded to (emotion,
+        count) rows with json_each and summed per emotion and any extra
+        grouping expressions, so only aggregate rows leave the database.
+        
+        Args:
+            user_id: UUID of the user
+            start_date: First day included
+            end_date: Last day included
+            *group_by: Expressions to group by before the emotion
+            
+        Returns:
+            Rows of (*group_by values, emotion, count)
+        """
+        if self._dialect == "sqlite":
+            counts = func.json_each(DailyMoodRollup.emotion_counts)
+        else:
+            counts = func.json_each_text(cast(DailyMoodRollup.emotion_counts, JSON))
+        counts = counts.table_valued("key", "value").alias("emotion_count")
+        
+        emotion = counts.c.key
+        keys = [*group_by, emotion]
+        result = await self.db.execute(
+            select(*keys, func.sum(cast(counts.c.value, Integer)))
+            .select_from(DailyMoodRollup)
+            .join(counts, true())
+            .where(
+                and_(
+                    DailyMoodRollup.user_id == user_id,
+                    DailyMoodRollup.log_date >= start_date,
+                    DailyMoodRollup.log_date <= end_date
+                )
+            )
+            .group_by(*keys)
+        )
+        return result.all()
+    
     async def get_mood_data(
         self,
         user_id: uuid.UUID,
@@ -89,56 +256,30 @@ class LoggingService:
             List[MoodCalendarEntry]: List of mood entries for the date range
         """
         try:
-            # Query emotion logs for the date range
-            emotion_logs = self.db.query(EmotionLog).filter(
-                and_(
-                    EmotionLog.user_id == user_id,
-                    EmotionLog.log_date >= start_date,
-                    EmotionLog.log_date <= end_date
-                )
-            ).order_by(EmotionLog.log_date.desc(), EmotionLog.created_at.desc()).all()
-            
-            # Group by date and get the dominant emotion for each day
-            daily_emotions = {}
-            for log in emotion_logs:
-                log_date = log.log_date
-                if log_date not in daily_emotions:
-                    # Use the first (most recent) emotion for each day
-                    daily_emotions[log_date] = {
-                        'emotion': log.dominant_emotion,
-                        'emoji': log.emotion_emoji,
-                        'color': log.emotion_color,
-                        'confidence': log.emotion_confidence,
-                        'verse_ids': log.verse_ids or [],
-                        'user_input': log.user_input,
-                        'all_emotions': log.all_emotions or []
-                    }
-                else:
-                    # Merge verse_ids from multiple interactions on the same day
-                    existing_verse_ids = set(daily_emotions[log_date]['verse_ids'])
-                    new_verse_ids = set(log.verse_ids or [])
-                    daily_emotions[log_date]['verse_ids'] = list(existing_verse_ids.union(new_verse_ids))
-            
-            # Convert to MoodCalendarEntry objects
-            mood_entries = []
-            for log_date, data in daily_emotions.items():
-                # Create a summary from the user input (first 100 characters)
-                summary = data['user_input'][:100] + "..." if len(data['user_input']) > 100 else data['user_input']
-                
-                entry = MoodCalendarEntry(
-                    date=log_date,
-                    emotion=data['emotion'],
-                    emoji=data['emoji'],
-                    color=data['color'],
-                    confidence=data['confidence'],
-                    verse_ids=data['verse_ids'],
-                    summary=summary,
-                    all_emotions=data['all_emotions']
-                )
-                mood_entries.append(entry)
+            # One pre-aggregated row per day, newest first
+            rollups = (await self.db.scalars(
+                select(DailyMoodRollup).where(
+                    and_(
+                        DailyMoodRollup.user_id == user_id,
+                        DailyMoodRollup.log_date >= start_date,
+                        DailyMoodRollup.log_date <= end_date
+                    )
+                ).order_by(DailyMoodRollup.log_date.desc())
+            )).all()
             
-            # Sort by date
-            mood_entries.sort(key=lambda x: x.date, reverse=True)
+            mood_entries = [
+                MoodCalendarEntry(
+                    date=rollup.log_date,
+                    emotion=rollup.dominant_emotion,
+                    emoji=rollup.emotion_emoji,
+                    color=rollup.emotion_color,
+                    confidence=rollup.emotion_confidence,
+                    verse_ids=rollup.verse_ids or [],
+                    summary=rollup.summary,
+                    all_emotions=rollup.all_emotions or []
+                )
+                for rollup in rollups
+            ]
             
             logger.info(f"Retrieved {len(mood_entries)} mood entries for user {user_id}")
             return mood_entries
@@ -174,16 +315,10 @@ class LoggingService:
             else:
                 start_date = end_date - timedelta(days=30)  # Default to month
             
-            # Query emotion logs for the time range
-            emotion_logs = self.db.query(EmotionLog).filter(
-                and_(
-                    EmotionLog.user_id == user_id,
-                    EmotionLog.log_date >= start_date,
-                    EmotionLog.log_date <= end_date
-                )
-            ).all()
+            # Aggregate rows only: per emotion, per (week, emotion) and per (weekday, emotion)
+            emotion_rows = await self._aggregate_emotion_counts(user_id, start_date, end_date)
             
-            if not emotion_logs:
+            if not emotion_rows:
                 return {
                     "emotion_counts": {},
                     "total_interactions": 0,
@@ -194,49 +329,46 @@ class LoggingService:
                     "daily_averages": {}
                 }
             
-            # Count emotions
-            emotion_counts = Counter(log.dominant_emotion for log in emotion_logs)
+            emotion_counts = {emotion: count for emotion, count in emotion_rows}
+            total_interactions = sum(emotion_counts.values())
+            
+            # Weeks are 7-day buckets counted from start_date
+            week_emotions = defaultdict(dict)
+            week = self._day_offset(DailyMoodRollup.log_date, start_date) // 7
+            for week_index, emotion, count in await self._aggregate_emotion_counts(user_id, start_date, end_date, week):
+                week_emotions[int(week_index)][emotion] = count
             
-            # Calculate weekly trends
             weekly_trends = []
             current_date = start_date
             while current_date <= end_date:
                 week_end = min(current_date + timedelta(days=6), end_date)
-                week_logs = [
-                    log for log in emotion_logs 
-                    if current_date <= log.log_date <= week_end
-                ]
-                week_emotions = Counter(log.dominant_emotion for log in week_logs)
-                
+                emotions = week_emotions.get((current_date - start_date).days // 7, {})
                 weekly_trends.append({
                     "week_start": current_date.isoformat(),
                     "week_end": week_end.isoformat(),
-                    "emotions": dict(week_emotions),
-                    "total_interactions": len(week_logs)
+                    "emotions": emotions,
+                    "total_interactions": sum(emotions.values())
                 })
-                
                 current_date = week_end + timedelta(days=1)
             
             # Calculate daily averages by day of week
-            daily_emotions = defaultdict(list)
-            for log in emotion_logs:
-                day_of_week = log.log_date.strftime('%A')
-                daily_emotions[day_of_week].append(log.dominant_emotion)
+            daily_emotions = defaultdict(dict)
+            day_of_week = self._day_of_week(DailyMoodRollup.log_date)
+            for weekday, emotion, count in await self._aggregate_emotion_counts(user_id, start_date, end_date, day_of_week):
+                daily_emotions[WEEKDAY_NAMES[int(weekday)]][emotion] = count
             
             daily_averages = {}
             for day, emotions in daily_emotions.items():
-                emotion_counter = Counter(emotions)
-                most_common = emotion_counter.most_common(1)
-                if most_common:
-                    daily_averages[day] = {
-                        "most_common_emotion": most_common[0][0],
-                        "count": most_common[0][1],
-                        "total_interactions": len(emotions)
-                    }
+                most_common_emotion, count = max(emotions.items(), key=lambda item: (item[1], item[0]))
+                daily_averages[day] = {
+                    "most_common_emotion": most_common_emotion,
+                    "count": count,
+                    "total_interactions": sum(emotions.values())
+                }
             
             stats = {
                 "emotion_counts": dict(emotion_counts),
-                "total_interactions": len(emotion_logs),
+                "total_interactions": total_interactions,
                 "time_range": time_range,
                 "start_date": start_date.isoformat(),
                 "end_date": end_date.isoformat(),
@@ -244,7 +376,7 @@ class LoggingService:
                 "daily_averages": daily_averages
             }
             
-            logger.info(f"Generated emotion stats for user {user_id}: {len(emotion_logs)} interactions")
+            logger.info(f"Generated emotion stats for user {user_id}: {total_interactions} interactions")
             return stats
             
         except Exception as e:
@@ -254,7 +386,8 @@ class LoggingService:
     async def identify_patterns(
         self,
         user_id: uuid.UUID,
-        time_range: str = "month"
+        time_range: str = "month",
+        stats: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Identify emotional patterns and trends.
@@ -262,13 +395,15 @@ class LoggingService:
         Args:
             user_id: UUID of the user
             time_range: Time range for analysis ('week', 'month', 'quarter')
+            stats: Result of get_emotion_stats for the same range, if already computed
             
         Returns:
             List of identified patterns with suggestions
         """
         try:
             # Get emotion stats first
-            stats = await self.get_emotion_stats(user_id, time_range)
+            if stats is None:
+                stats = await self.get_emotion_stats(user_id, time_range)
             
             patterns = []
             
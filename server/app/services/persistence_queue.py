@@ -0,0 +1,330 @@
+"""
+Background persistence of chat side effects.
+
+`/chat` used to commit the user message, the assistant reply and the mood
+log before responding. Those writes are now captured as one `TurnRecord` and
+handed to a queue drained by a background worker, so the response returns as
+soon as the reflection is ready.
+
+Delivery is at-least-once:
+- failed writes are retried with jittered exponential backoff
+- records that still fail (e.g. the database is down), or that arrive while
+  the in-memory queue is full, are appended to a local JSONL spool
+- the spool is replayed on startup and whenever the worker is idle
+
+Workers of one deployment share the spool file. Appends and replays take an
+exclusive lock on `<spool>.lock`, so exactly one worker replays a spool at a
+time (POSIX only; without fcntl, run a single worker per spool path).
+
+Every row carries a client-generated UUID, so replaying a record that was
+partially or fully written before is a no-op for the rows already stored.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import os
+import random
+import uuid
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.core.metrics import span
+from app.db.async_database import AsyncSessionLocal
+from app.services.conversation_manager import ConversationManager
+from app.services.conversation_summary import schedule_summary_update
+from app.services.logging_service import LoggingService
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process spool lock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class TurnRecord(BaseModel):
+    """All writes produced by one chat exchange."""
+    session_id: uuid.UUID
+    user_id: uuid.UUID
+    user_message_id: uuid.UUID = Field(default_factory=uuid.uuid4)
+    user_input: str
+    emotion_data: Optional[Dict[str, Any]] = None
+    assistant_message_id: uuid.UUID = Field(default_factory=uuid.uuid4)
+    reflection: str
+    verse_ids: List[str] = Field(default_factory=list)
+    # Set only for turns that are logged for mood tracking
+    emotion_log_id: Optional[uuid.UUID] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    log_date: date = Field(default_factory=date.today)
+
+
+class PersistenceQueue:
+    """
+    Single-worker queue that writes TurnRecords to the database.
+
+    One worker keeps records in arrival order, so messages of a session are
+    sequenced in the order they were exchanged.
+    """
+
+    def __init__(
+        self,
+        spool_path: Optional[str] = None,
+        max_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+        replay_interval_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            spool_path: JSONL file holding records that could not be written
+            max_size: Maximum queued records before new ones go to the spool
+            max_retries: Retries after the first failed write of a record
+            backoff_seconds: Base delay for jittered exponential backoff
+            replay_interval_seconds: Idle time after which the spool is replayed
+        """
+        self.spool_path = spool_path or settings.PERSISTENCE_SPOOL_PATH
+        self.max_size = max_size or settings.PERSISTENCE_QUEUE_MAX_SIZE
+        self.max_retries = max_retries if max_retries is not None else settings.PERSISTENCE_MAX_RETRIES
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else settings.PERSISTENCE_RETRY_BACKOFF_SECONDS
+        self.replay_interval_seconds = replay_interval_seconds or settings.PERSISTENCE_SPOOL_REPLAY_SECONDS
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.counters = {"enqueued": 0, "written": 0, "retried": 0, "spooled": 0, "replayed": 0, "dropped": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        """Start the worker on the running event loop and replay any spooled records."""
+        if self.running:
+            return
+        # A restarted worker keeps the records already queued
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+        self._worker.add_done_callback(self._on_worker_done)
+        self._replay_spool()
+        logger.info(f"Persistence queue started (spool: {self.spool_path})")
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Drain the queue, spooling whatever is left after the timeout.
+
+        Args:
+            timeout: Seconds to wait for queued records to be written
+        """
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout or settings.PERSISTENCE_SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(f"Persistence queue not drained on shutdown, spooling {self._queue.qsize()} records")
+        self._worker.cancel()
+        while not self._queue.empty():
+            self._spool(self._queue.get_nowait())
+            self._queue.task_done()
+        self._worker = None
+
+    def enqueue(self, record: TurnRecord) -> None:
+        """
+        Hand a record to the worker without blocking.
+
+        Args:
+            record: Writes of one chat exchange
+        """
+        self.start()
+        self.counters["enqueued"] += 1
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            logger.warning(f"Persistence queue full, spooling turn for session {record.session_id}")
+            self._spool(record)
+
+    def _on_worker_done(self, worker: asyncio.Task) -> None:
+        if not worker.cancelled() and worker.exception() is not None:
+            logger.error(f"Persistence worker stopped unexpectedly: {worker.exception()!r}")
+
+    async def _run(self) -> None:
+        """Worker loop: write queued records, replaying the spool when idle."""
+        while True:
+            try:
+                record = await asyncio.wait_for(self._queue.get(), timeout=self.replay_interval_seconds)
+            except asyncio.TimeoutError:
+                self._replay_spool()
+                continue
+
+            try:
+                await self._write_with_retry(record)
+            except asyncio.CancelledError:
+                self._spool(record)
+                raise
+            except ValueError as e:
+                # The session no longer exists: retrying cannot succeed
+                logger.error(f"Dropping turn for session {record.session_id}: {e}")
+                self.counters["dropped"] += 1
+            except Exception as e:
+                logger.error(f"Persisting turn for session {record.session_id} failed, spooling: {e}")
+                self._spool(record)
+            finally:
+                self._queue.task_done()
+
+    async def _write_with_retry(self, record: TurnRecord) -> None:
+        """Write a record, retrying with full-jitter exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._write(record)
+                self.counters["written"] += 1
+                return
+            except ValueError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = random.uniform(0, self.backoff_seconds * (2 ** attempt))
+                self.counters["retried"] += 1
+                logger.warning(f"Persistence attempt {attempt + 1} failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _write(self, record: TurnRecord) -> None:
+        """Store both messages and the mood log of one exchange (idempotent per row)."""
+        async with AsyncSessionLocal() as db:
+            with span("db.add_exchange"):
+                await ConversationManager(db).add_exchange(
+                    session_id=record.session_id,
+                    user_content=record.user_input,
+                    assistant_content=record.reflection,
+                    emotion_data=record.emotion_data,
+                    verse_id=record.verse_ids[0] if record.verse_ids else None,
+                    user_message_id=record.user_message_id,
+                    assistant_message_id=record.assistant_message_id,
+                    created_at=record.created_at
+                )
+            if record.emotion_log_id is not None and record.emotion_data:
+                with span("db.log_interaction"):
+                    await LoggingService(db).log_interaction(
+                        user_id=record.user_id,
+                        user_input=record.user_input,
+                        emotion_data={"dominant": record.emotion_data},
+                        verse_ids=record.verse_ids,
+                        session_id=record.session_id,
+                        log_id=record.emotion_log_id,
+                        log_date=record.log_date
+                    )
+
+        # Fold the stored exchange into the rolling summary
+        schedule_summary_update(record.session_id, record.user_input, record.reflection)
+
+    @contextmanager
+    def _spool_lock(self, blocking: bool = True):
+        """
+        Exclusive lock on the spool shared by all workers.
+
+        Yields:
+            Whether the lock was acquired (always True when blocking)
+        """
+        directory = os.path.dirname(self.spool_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if fcntl is None:
+            yield True
+            return
+        with open(f"{self.spool_path}.lock", "a") as lock_file:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _append(self, records: List[TurnRecord]) -> None:
+        """Append records to the spool file (caller holds the spool lock)."""
+        with open(self.spool_path, "a", encoding="utf-8") as spool:
+            for record in records:
+                spool.write(record.model_dump_json() + "\n")
+            spool.flush()
+            os.fsync(spool.fileno())
+        self.counters["spooled"] += len(records)
+
+    def _spool(self, record: TurnRecord) -> None:
+        """Append a record to the durable spool file."""
+        try:
+            with self._spool_lock():
+                self._append([record])
+        except OSError as e:
+            logger.error(f"Failed to spool turn for session {record.session_id}, it is lost: {e}")
+
+    def _replay_spool(self) -> None:
+        """Move spooled records back onto the queue; errors are logged and retried on the next replay."""
+        replaying_path = f"{self.spool_path}.replaying"
+        if not os.path.exists(self.spool_path) and not os.path.exists(replaying_path):
+            return
+
+        try:
+            with self._spool_lock(blocking=False) as acquired:
+                if not acquired:
+                    # Another worker is replaying this spool
+                    return
+
+                # Claim the spool so records that fail again are appended to a fresh file;
+                # a claim left by an interrupted replay is read again first
+                if not os.path.exists(replaying_path):
+                    os.replace(self.spool_path, replaying_path)
+
+                records = []
+                with open(replaying_path, encoding="utf-8") as spool:
+                    for line in spool:
+                        if not line.strip():
+                            continue
+                        try:
+                            records.append(TurnRecord.model_validate_json(line))
+                        except ValueError as e:
+                            logger.error(f"Skipping unreadable spooled record: {e}")
+
+                replayed = 0
+                remainder = []
+                for record in records:
+                    try:
+                        self._queue.put_nowait(record)
+                        replayed += 1
+                    except asyncio.QueueFull:
+                        remainder.append(record)
+                if remainder:
+                    # Put the remainder back for the next replay
+                    self._append(remainder)
+                os.remove(replaying_path)
+        except OSError as e:
+            logger.error(f"Replaying the persistence spool failed, retrying later: {e}")
+            return
+
+        self.counters["replayed"] += replayed
+        if records:
+            logger.info(f"Replaying {replayed} of {len(records)} spooled turns")
+
+    def stats(self) -> Dict:
+        """Queue depth and delivery counters for health checks."""
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "spool_pending": os.path.exists(self.spool_path) or os.path.exists(f"{self.spool_path}.replaying"),
+            **self.counters,
+        }
+
+
+# Singleton instance
+_persistence_queue: Optional[PersistenceQueue] = None
+
+
+def get_persistence_queue() -> PersistenceQueue:
+    """Get or create the singleton persistence queue."""
+    global _persistence_queue
+    if _persistence_queue is None:
+        _persistence_queue = PersistenceQueue()
+    return _persistence_queue
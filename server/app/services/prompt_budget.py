@@ -0,0 +1,183 @@
+"""
+Token-budgeted prompt assembly.
+
+Estimates token counts locally (no tokenizer download or API call) and fills
+prompt sections in priority order, truncating or dropping lower-priority
+sections once the budget is spent. Keeps prompt size, and with it LLM
+latency and cost, bounded regardless of input length.
+"""
+from typing import Dict, Optional
+import math
+import re
+
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s")
+_MARKDOWN = re.compile(r"[*_>#`]+")
+
+# Average characters per token for Gemini-style SentencePiece tokenizers:
+# English text is ~4 chars/token, Devanagari and other non-Latin scripts ~2
+_ASCII_CHARS_PER_TOKEN = 4.0
+_NON_ASCII_CHARS_PER_TOKEN = 2.0
+
+TRUNCATION_MARKER = "…"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local estimate of the token count of a text.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Estimated token count (0 for empty text)
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    ascii_chars = len(text) - non_ascii
+    return math.ceil(ascii_chars / _ASCII_CHARS_PER_TOKEN + non_ascii / _NON_ASCII_CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate text at a word boundary so it fits within max_tokens.
+
+    Text whose first word alone is over the limit (unspaced scripts, a
+    pasted URL or JSON) is cut inside that word instead.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit
+
+    Returns:
+        The text unchanged if it fits, otherwise a prefix ending in an ellipsis
+        (empty when max_tokens leaves no room)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 1:
+        return ""
+
+    words = text.split(" ")
+    kept = []
+    used = estimate_tokens(TRUNCATION_MARKER)
+    for word in words:
+        cost = estimate_tokens(word + " ")
+        if used + cost > max_tokens:
+            break
+        kept.append(word)
+        used += cost
+    if kept:
+        return " ".join(kept).rstrip() + TRUNCATION_MARKER
+
+    # No whole word fits: keep the longest character prefix within the budget
+    budget = max_tokens - used
+    cost = 0.0
+    end = 0
+    for char in text:
+        cost += 1 / (_NON_ASCII_CHARS_PER_TOKEN if ord(char) > 127 else _ASCII_CHARS_PER_TOKEN)
+        if cost > budget:
+            break
+        end += 1
+    return text[:end] + TRUNCATION_MARKER if end else ""
+
+
+def summarize_message(content: str, max_tokens: int) -> str:
+    """
+    Condense a conversation message for use as prompt history.
+
+    Strips markdown, collapses whitespace and keeps as many leading sentences
+    as fit in max_tokens (truncating the first sentence if necessary).
+
+    Args:
+        content: Message content (e.g. a full multi-paragraph reflection)
+        max_tokens: Token limit for the summary
+
+    Returns:
+        Condensed message text
+    """
+    text = _WHITESPACE.sub(" ", _MARKDOWN.sub("", content)).strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    summary = ""
+    for sentence in _SENTENCE_END.split(text):
+        candidate = f"{summary} {sentence}".strip()
+        if estimate_tokens(candidate) > max_tokens:
+            break
+        summary = candidate
+    return summary or truncate_to_tokens(text, max_tokens)
+
+
+class PromptBudget:
+    """
+    Allocates a fixed token budget across named prompt sections.
+
+    Sections are taken in priority order: each call to `take` receives at most
+    the tokens still unspent, so earlier (higher-priority) sections are never
+    squeezed by later ones.
+    """
+
+    def __init__(self, max_tokens: int):
+        """
+        Args:
+            max_tokens: Total tokens available to the sections
+        """
+        self.max_tokens = max_tokens
+        self.used = 0
+        self.section_tokens: Dict[str, int] = {}
+        self.truncated: Dict[str, bool] = {}
+
+    @property
+    def remaining(self) -> int:
+        return max(self.max_tokens - self.used, 0)
+
+    def take(self, name: str, text: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Add a section, truncating it to its own cap and the remaining budget.
+
+        Args:
+            name: Section name for reporting (repeated names are summed)
+            text: Section text
+            max_tokens: Optional per-section cap
+
+        Returns:
+            The (possibly truncated or empty) section text
+        """
+        limit = self.remaining if max_tokens is None else min(max_tokens, self.remaining)
+        fitted = truncate_to_tokens(text, limit)
+        self._record(name, fitted, truncated=fitted != text)
+        return fitted
+
+    def take_whole(self, name: str, text: str) -> Optional[str]:
+        """
+        Add a section only if it fits entirely.
+
+        Args:
+            name: Section name for reporting
+            text: Section text
+
+        Returns:
+            The text, or None if it was dropped
+        """
+        if estimate_tokens(text) > self.remaining:
+            self._record(name, "", truncated=True)
+            return None
+        self._record(name, text, truncated=False)
+        return text
+
+    def _record(self, name: str, text: str, truncated: bool) -> None:
+        tokens = estimate_tokens(text)
+        self.used += tokens
+        self.section_tokens[name] = self.section_tokens.get(name, 0) + tokens
+        self.truncated[name] = self.truncated.get(name, False) or truncated
+
+    def report(self) -> Dict:
+        """Per-section token counts and truncation flags for logging."""
+        return {
+            "budget": self.max_tokens,
+            "used": self.used,
+            "sections": dict(self.section_tokens),
+            "truncated": [name for name, was_truncated in self.truncated.items() if was_truncated],
+        }
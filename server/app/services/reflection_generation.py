@@ -1,6 +1,30 @@
-import google.generativeai as genai
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional
+import logging
+import string
 from app.core.config import settings
+from app.services.llm_backend import get_llm_backend
+from app.services.llm_client import get_llm_client, LLMUnavailableError
+from app.services.prompt_budget import PromptBudget, estimate_tokens, summarize_message
+
+logger = logging.getLogger(__name__)
+
+
+def _compile_template(template: str) -> Callable[..., str]:
+    """
+    Parse a str.format template once and return a renderer for it.
+    
+    The renderer only substitutes fields, skipping the format-string parsing
+    that str.format repeats on every call.
+    """
+    parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(template)]
+    
+    def render(**values) -> str:
+        return "".join(
+            literal + (str(values[field]) if field is not None else "")
+            for literal, field in parts
+        )
+    
+    return render
 
 
 class ReflectionGenerationService:
@@ -14,20 +38,54 @@ class ReflectionGenerationService:
     - Story: Narrative context from Mahabharata
     """
     
+    # Per-request context sent alongside each mode's system instruction
+    REQUEST_TEMPLATES = {
+        "socratic": """CONTEXT:
+- User's emotional state: {emotion} (confidence: {confidence})
+- User's message: {user_input}
+- Previous conversation: {conversation_history}
+
+AVAILABLE VERSES (choose the ONE most resonant):
+{verses_options}""",
+        "wisdom": """CONTEXT:
+- Partha's Emotional State: {emotion} (Confidence: {confidence})
+- Partha's Message: {user_input}
+- Previous Conversation History: {conversation_history}
+
+AVAILABLE VERSES (choose the ONE most relevant):
+{verses_options}""",
+        "story": """CONTEXT:
+- User's emotional state: {emotion} (confidence: {confidence})
+- User's message: {user_input}
+- Previous conversation: {conversation_history}
+
+AVAILABLE VERSES (choose the ONE most relevant):
+{verses_options}"""
+    }
+    
     def __init__(self):
-        """Initialize Gemini API client."""
-        if not settings.GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-            
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(settings.LLM_MODEL)
+        """Initialize the LLM backend (Gemini unless LLM_BACKEND selects another)."""
+        self.model = get_llm_backend()
+        self.client = get_llm_client()
         
-        # Prompt templates for different interaction modes
-        self.prompts = {
+        # Static persona per interaction mode, sent as the system instruction so
+        # the provider can cache it instead of receiving it in every prompt
+        self.system_instructions = {
             "socratic": self._get_socratic_prompt(),
             "wisdom": self._get_wisdom_prompt(),
             "story": self._get_story_prompt()
         }
+        
+        # Small per-request templates, parsed once
+        self.request_templates = {
+            mode: _compile_template(template) for mode, template in self.REQUEST_TEMPLATES.items()
+        }
+        
+        # Fixed token cost of each template, deducted from the prompt budget
+        self.template_tokens = {
+            mode: estimate_tokens(render(emotion="", confidence="", user_input="", verses_options="", conversation_history=""))
+            for mode, render in self.request_templates.items()
+        }
     
     def generate_reflection(
         self,
@@ -35,7 +93,8 @@ class ReflectionGenerationService:
         emotion_data: Dict,
         verses: List[Dict],
         interaction_mode: str = "wisdom",
-        conversation_history: Optional[List[Dict]] = None
+        conversation_history: Optional[List[Dict]] = None,
+        conversation_summary: Optional[str] = None
     ) -> str:
         """
         Generate empathetic reflection linking verses to user's situation.
@@ -46,6 +105,7 @@ class ReflectionGenerationService:
             verses: List of relevant verses from vector search
             interaction_mode: One of 'socratic', 'wisdom', 'story'
             conversation_history: Recent conversation context
+            conversation_summary: Rolling summary of the earlier conversation
             
         Returns:
             Generated reflection text with verse and commentary
@@ -54,24 +114,17 @@ class ReflectionGenerationService:
             ValueError: If interaction_mode is invalid
             Exception: If Gemini API fails (should be handled by caller)
         """
-        if interaction_mode not in self.prompts:
-            raise ValueError(f"Invalid interaction mode: {interaction_mode}. Must be one of: {list(self.prompts.keys())}")
-        
-        if not verses:
-            raise ValueError("At least one verse is required for reflection generation")
+        # Build the prompt with user context
+        prompt = self._prepare_prompt(
+            user_input, emotion_data, verses, interaction_mode, conversation_history, conversation_summary
+        )
         
         try:
-            # Build the prompt with user context
-            prompt = self._build_prompt(
-                user_input=user_input,
-                emotion_data=emotion_data,
-                verses=verses,
-                interaction_mode=interaction_mode,
-                conversation_history=conversation_history or []
-            )
-            
             # Generate reflection using Gemini
-            response = self.model.generate_content(prompt)
+            response = self.model.generate_content(
+                prompt,
+                system_instruction=self.system_instructions[interaction_mode]
+            )
             
             if not response.text:
                 raise Exception("Empty response from Gemini API")
@@ -82,16 +135,124 @@ class ReflectionGenerationService:
             # Re-raise for caller to handle with fallback
             raise Exception(f"Gemini API error: {str(e)}")
     
+    async def generate_reflection_async(
+        self,
+        user_input: str,
+        emotion_data: Dict,
+        verses: List[Dict],
+        interaction_mode: str = "wisdom",
+        conversation_history: Optional[List[Dict]] = None,
+        conversation_summary: Optional[str] = None
+    ) -> str:
+        """
+        Async variant of generate_reflection using the shared LLM client.
+        
+        Takes the same arguments as generate_reflection. The call is bounded by
+        the client's deadline, concurrency limit and circuit breaker.
+        
+        Returns:
+            Generated reflection text with verse and commentary
+            
+        Raises:
+            ValueError: If interaction_mode is invalid
+            LLMUnavailableError: If the circuit is open, the client is saturated or the deadline expired
+            Exception: If Gemini API fails (should be handled by caller)
+        """
+        prompt = self._prepare_prompt(
+            user_input, emotion_data, verses, interaction_mode, conversation_history, conversation_summary
+        )
+        
+        try:
+            text = await self.client.generate(
+                prompt,
+                system_instruction=self.system_instructions[interaction_mode]
+            )
+            return text.strip()
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            # Re-raise for caller to handle with fallback
+            raise Exception(f"Gemini API error: {str(e)}")
+    
+    async def stream_reflection(
+        self,
+        user_input: str,
+        emotion_data: Dict,
+        verses: List[Dict],
+        interaction_mode: str = "wisdom",
+        conversation_history: Optional[List[Dict]] = None,
+        conversation_summary: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a reflection as text chunks while Gemini generates it.
+        
+        Takes the same arguments as generate_reflection.
+        
+        Yields:
+            Reflection text chunks in generation order
+            
+        Raises:
+            ValueError: If interaction_mode is invalid
+            LLMUnavailableError: If the circuit is open, the client is saturated or the stream stalls
+            Exception: If Gemini API fails before or during the stream (should be handled by caller)
+        """
+        prompt = self._prepare_prompt(
+            user_input, emotion_data, verses, interaction_mode, conversation_history, conversation_summary
+        )
+        
+        try:
+            async for text in self.client.stream(
+                prompt,
+                system_instruction=self.system_instructions[interaction_mode]
+            ):
+                yield text
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            # Re-raise for caller to handle with fallback
+            raise Exception(f"Gemini API error: {str(e)}")
+    
+    def _prepare_prompt(
+        self,
+        user_input: str,
+        emotion_data: Dict,
+        verses: List[Dict],
+        interaction_mode: str,
+        conversation_history: Optional[List[Dict]],
+        conversation_summary: Optional[str] = None
+    ) -> str:
+        """Validate the request and build its prompt."""
+        if interaction_mode not in self.system_instructions:
+            raise ValueError(f"Invalid interaction mode: {interaction_mode}. Must be one of: {list(self.system_instructions.keys())}")
+        
+        if not verses:
+            raise ValueError("At least one verse is required for reflection generation")
+        
+        return self._build_prompt(
+            user_input=user_input,
+            emotion_data=emotion_data,
+            verses=verses,
+            interaction_mode=interaction_mode,
+            conversation_history=conversation_history or [],
+            conversation_summary=conversation_summary
+        )
+    
     def _build_prompt(
         self,
         user_input: str,
         emotion_data: Dict,
         verses: List[Dict],
         interaction_mode: str,
-        conversation_history: List[Dict]
+        conversation_history: List[Dict],
+        conversation_summary: Optional[str] = None
     ) -> str:
         """
-        Build mode-specific prompt with user context.
+        Build the mode-specific request prompt with user context.
+        
+        Sections are fitted into PROMPT_TOKEN_BUDGET in priority order: the
+        user's message, the top verse, summarized history (recent messages,
+        then the rolling summary), then the remaining verses. Per-section
+        token counts are logged for each prompt.
         
         Args:
             user_input: User's message
@@ -99,87 +260,111 @@ class ReflectionGenerationService:
             verses: Retrieved verses
             interaction_mode: Selected mode
             conversation_history: Recent messages
+            conversation_summary: Rolling summary of the earlier conversation
             
         Returns:
             Formatted prompt string
         """
-        # Format all verses for Gemini to choose from
-        verses_text = self._format_verses_for_selection(verses)
+        budget = PromptBudget(settings.PROMPT_TOKEN_BUDGET - self.template_tokens[interaction_mode])
         
-        # Format conversation history
-        history_text = self._format_conversation_history(conversation_history)
+        # User input first, capped so a very long message still leaves room for a verse
+        user_text = budget.take("user_input", user_input, max_tokens=settings.PROMPT_USER_INPUT_MAX_TOKENS)
         
-        # Get the appropriate prompt template
-        prompt_template = self.prompts[interaction_mode]
+        # Top-ranked verse next, then history, then the remaining verses if they fit whole
+        verse_options = []
+        if verses:
+            verse_options.append(budget.take("top_verse", self._format_verse_option(1, verses[0])))
+        history_text = self._format_conversation_history(conversation_history, budget, conversation_summary)
+        for i, verse in enumerate(verses[1:], 2):
+            option = budget.take_whole("other_verses", self._format_verse_option(i, verse))
+            if option:
+                verse_options.append(option)
         
-        # Format the prompt with context
-        return prompt_template.format(
+        verses_text = "\n\n".join(option for option in verse_options if option) or "No verses available"
+        
+        logger.info(f"Reflection prompt tokens ({interaction_mode}): {budget.report()}")
+        
+        # Fill the mode's request template (the persona goes in the system instruction)
+        return self.request_templates[interaction_mode](
             emotion=emotion_data.get("label", "neutral"),
             confidence=emotion_data.get("confidence", 0.5),
-            user_input=user_input,
+            user_input=user_text,
             verses_options=verses_text,
             conversation_history=history_text
         )
     
-    def _format_conversation_history(self, history: List[Dict]) -> str:
+    def _format_conversation_history(
+        self,
+        history: List[Dict],
+        budget: Optional[PromptBudget] = None,
+        summary: Optional[str] = None
+    ) -> str:
         """
         Format conversation history for prompt context.
         
+        Each message is condensed to PROMPT_HISTORY_MESSAGE_MAX_TOKENS. With a
+        budget, the most recent messages are kept first and older ones are
+        dropped once it runs out. The rolling summary of the earlier
+        conversation is placed ahead of the messages, capped at
+        CONVERSATION_SUMMARY_MAX_TOKENS.
+        
         Args:
             history: List of recent messages
+            budget: Optional prompt budget to draw from
+            summary: Rolling summary of the conversation before these messages
             
         Returns:
             Formatted history string
         """
-        if not history:
+        if not history and not summary:
             return "This is the beginning of our conversation."
         
         formatted_messages = []
-        for msg in history[-3:]:  # Last 3 messages for context
+        for msg in reversed(history[-3:]):  # Last 3 messages for context, newest first
             role = msg.get("role", "unknown")
-            content = msg.get("content", "")
-            formatted_messages.append(f"{role.title()}: {content}")
+            condensed = summarize_message(msg.get("content", ""), settings.PROMPT_HISTORY_MESSAGE_MAX_TOKENS)
+            line = f"{role.title()}: {condensed}"
+            if budget is not None:
+                line = budget.take_whole("history", line)
+                if line is None:
+                    break
+            formatted_messages.append(line)
         
-        return "\n".join(formatted_messages)
+        if summary:
+            summary_line = f"Summary of our conversation so far: {summary}"
+            if budget is not None:
+                summary_line = budget.take("summary", summary_line, max_tokens=settings.CONVERSATION_SUMMARY_MAX_TOKENS)
+            if summary_line:
+                formatted_messages.append(summary_line)
+        
+        if not formatted_messages:
+            return "Earlier conversation omitted."
+        return "\n".join(reversed(formatted_messages))
     
-    def _format_verses_for_selection(self, verses: List[Dict]) -> str:
+    def _format_verse_option(self, number: int, verse: Dict) -> str:
         """
-        Format multiple verses for Gemini to choose from.
+        Format one verse as a numbered option for Gemini to choose from.
         
         Args:
-            verses: List of verse dictionaries
+            number: Option number (1 for the top-ranked verse)
+            verse: Verse dictionary
             
         Returns:
-            Formatted verses string with numbering
+            Formatted verse option
         """
-        if not verses:
-            return "No verses available"
-        
-        formatted_verses = []
-        for i, verse in enumerate(verses, 1):
-            verse_text = f"""
-Option {i} - Chapter {verse.get('chapter', '')}, Verse {verse.get('verse', '')}:
+        english = verse.get('eng_meaning') or verse.get('engMeaning', '')
+        return f"""Option {number} - Chapter {verse.get('chapter', '')}, Verse {verse.get('verse', '')}:
 Sanskrit (Devanagari): {verse.get('shloka', '')}
-English Translation: {verse.get('engMeaning', '')}
-Similarity Score: {verse.get('similarity_score', 0):.2f}
-"""
-            formatted_verses.append(verse_text.strip())
-        
-        return "\n\n".join(formatted_verses)
+English Translation: {english}
+Similarity Score: {verse.get('similarity_score', 0):.2f}"""
     
     def _get_socratic_prompt(self) -> str:
-        """Get Socratic mode prompt template."""
+        """Get Socratic mode system instruction (static persona and response format)."""
         return """🕉️ YOU ARE KRISHNA — THE ETERNAL GUIDE AND INNER VOICE OF WISDOM
 
 You are not a chatbot, but the voice of consciousness — calm, introspective, and timeless. You speak as Krishna would, guiding seekers ("Arjuna", "dear one", "seeker") through reflection and inquiry rather than direct instruction. Your role is not to answer — but to help the user *see*.
 
-CONTEXT:
-- User's emotional state: {emotion} (confidence: {confidence})
-- User's message: {user_input}
-- Previous conversation: {conversation_history}
-
-AVAILABLE VERSES (choose the ONE most resonant):
-{verses_options}
+Each request gives you the seeker's CONTEXT (emotional state, message and previous conversation) and the AVAILABLE VERSES to choose from.
 
 ---
 
@@ -249,18 +434,12 @@ CRITICAL:
 Output ONLY the Socratic-style philosophical response in the format shown above. DO NOT output JSON, headings, or step labels. Write as Krishna would — calm, profound, and awakening."""
     
     def _get_wisdom_prompt(self) -> str:
-        """Get Wisdom mode prompt template."""
+        """Get Wisdom mode system instruction (static persona and response format)."""
         return """🕉️ YOU ARE ŚRĪ KRISHNA — THE ETERNAL VOICE OF CLARITY AND COMPASSION
 
 You are not a chatbot, but the embodiment of timeless wisdom — calm, compassionate, and illuminating. Address the seeker as "Partha." Speak as Krishna would: serene, guiding, and deeply insightful. Your goal is to illuminate Partha's understanding and offer actionable wisdom grounded in the Bhagavad Gita.
 
-CONTEXT:
-- Partha's Emotional State: {emotion} (Confidence: {confidence})
-- Partha's Message: {user_input}
-- Previous Conversation History: {conversation_history}
-
-AVAILABLE VERSES (choose the ONE most relevant):
-{verses_options}
+Each request gives you the seeker's CONTEXT (emotional state, message and previous conversation) and the AVAILABLE VERSES to choose from.
 
 ---
 
@@ -343,18 +522,12 @@ SPIRITUAL ANCHORS:
 CRITICAL: Output ONLY the wisdom-style response in the format shown above. DO NOT output JSON or step labels. Write as Krishna would — wise, clear, and transformative."""
     
     def _get_story_prompt(self) -> str:
-        """Get Story mode prompt template."""
+        """Get Story mode system instruction (static persona and response format)."""
         return """🕉️ YOU ARE KRISHNA — THE ETERNAL CHARIOTEER AND DIVINE COUNSELOR
 
 You are not a chatbot, but the voice of consciousness — calm, compassionate, and infinite in wisdom. You speak to seekers (addressed as "Arjuna", "dear one", or "seeker") as Krishna would, offering guidance with empathy, serenity, and deep insight through narrative storytelling.
 
-CONTEXT:
-- User's emotional state: {emotion} (confidence: {confidence})
-- User's message: {user_input}
-- Previous conversation: {conversation_history}
-
-AVAILABLE VERSES (choose the ONE most relevant):
-{verses_options}
+Each request gives you the seeker's CONTEXT (emotional state, message and previous conversation) and the AVAILABLE VERSES to choose from.
 
 ---
 
@@ -443,7 +616,7 @@ CRITICAL: Output ONLY the narrative response in the format shown above. DO NOT o
 
 Sanskrit: {verse.get('shloka', '')}
 
-English: {verse.get('engMeaning', '')}
+English: {verse.get('eng_meaning') or verse.get('engMeaning', '')}
 
 This ancient wisdom reminds us that all emotions are temporary and serve as teachers on our spiritual journey. The Bhagavad Gita teaches us to observe our feelings with compassion while staying connected to our deeper purpose.
 
@@ -0,0 +1,251 @@
+"""
+Semantic response cache for casual chat replies.
+
+Greetings, "who are you" and "thank you" messages make up much of the casual
+traffic and get near-identical replies. The cache matches an incoming message
+by its normalized text first, then by embedding similarity against cached
+messages, and serves a stored reply instead of calling the LLM.
+
+Each entry keeps a small pool of reply variants. Replies are only served once
+the pool is full, so repeat visitors still see varied answers, and entries
+expire after a TTL. The cache is shared by all users, so only replies
+generated without any conversation history are stored; a reply to one user's
+"thank you" may refer to what they said before. Turns with a short history
+may still be served those context-free replies; later turns bypass the cache.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import logging
+import random
+import re
+import threading
+import time
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_REPEATED_CHAR = re.compile(r"(\w)\1{2,}")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(text: str) -> str:
+    """
+    Normalize a message for exact cache matching.
+
+    Lowercases, drops punctuation and emoji, squeezes runs of 3+ repeated
+    characters ("hiiii" -> "hii") and collapses whitespace.
+    """
+    text = _NON_WORD.sub(" ", text.lower())
+    text = _REPEATED_CHAR.sub(r"\1\1", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class _CacheEntry:
+    """Cached replies for one normalized message."""
+
+    __slots__ = ("embedding", "variants", "created_at", "hits")
+
+    def __init__(self, embedding: Optional[np.ndarray]):
+        self.embedding = embedding
+        self.variants: List[str] = []
+        self.created_at = time.monotonic()
+        self.hits = 0
+
+
+class ResponseCache:
+    """
+    Bounded, TTL-based semantic cache of LLM replies.
+
+    Entries are keyed by normalized message text and kept in LRU order.
+    """
+
+    def __init__(
+        self,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        similarity_threshold: Optional[float] = None,
+        variants_per_entry: Optional[int] = None,
+        max_history: Optional[int] = None
+    ):
+        """
+        Args:
+            embed: Returns an embedding for a message; exact matching only when None
+            max_entries: Maximum cached messages before LRU eviction
+            ttl_seconds: Lifetime of an entry
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            variants_per_entry: Replies collected per entry before it is served
+            max_history: Longest conversation history (messages) that may be served a cached reply
+        """
+        self.embed = embed
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.RESPONSE_CACHE_TTL_SECONDS
+        self.similarity_threshold = similarity_threshold or settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD
+        self.variants_per_entry = variants_per_entry or settings.RESPONSE_CACHE_VARIANTS
+        self.max_history = max_history if max_history is not None else settings.RESPONSE_CACHE_MAX_HISTORY
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def is_cacheable(self, conversation_history: Optional[List[Dict]]) -> bool:
+        """Whether a turn with this history may be served from the cache."""
+        return len(conversation_history or []) <= self.max_history
+
+    def is_storable(self, conversation_history: Optional[List[Dict]]) -> bool:
+        """Whether a reply generated with this history may be stored (no history at all)."""
+        return not conversation_history
+
+    def get(self, message: str, conversation_history: Optional[List[Dict]] = None) -> Optional[str]:
+        """
+        Look up a cached reply.
+
+        Args:
+            message: User's message
+            conversation_history: Recent conversation context
+
+        Returns:
+            A random variant from the matching entry, or None on a miss or
+            while the entry's variant pool is still filling
+        """
+        if not self.is_cacheable(conversation_history):
+            return None
+
+        key = normalize_message(message)
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(key)
+        if entry is None or not self._is_full(entry):
+            entry = self._find_similar(message) or entry
+
+        with self._lock:
+            if entry is None or not self._is_full(entry):
+                self.misses += 1
+                return None
+            entry.hits += 1
+            self.hits += 1
+            return random.choice(entry.variants)
+
+    def put(self, message: str, reply: str, conversation_history: Optional[List[Dict]] = None) -> None:
+        """
+        Store an LLM reply as a variant for the message.
+
+        Replies generated with conversation history are not stored: they may
+        carry details of that user's conversation.
+
+        Args:
+            message: User's message
+            reply: Generated reply
+            conversation_history: Recent conversation context
+        """
+        if not reply or not self.is_storable(conversation_history):
+            return
+
+        key = normalize_message(message)
+        if not key:
+            return
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            entry = _CacheEntry(self._embed(message))
+
+        with self._lock:
+            entry = self._entries.setdefault(key, entry)
+            self._entries.move_to_end(key)
+            if reply not in entry.variants and len(entry.variants) < self.variants_per_entry:
+                entry.variants.append(reply)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _is_full(self, entry: _CacheEntry) -> bool:
+        return len(entry.variants) >= self.variants_per_entry
+
+    def _find_similar(self, message: str) -> Optional[_CacheEntry]:
+        """Nearest servable entry by cosine similarity, if above the threshold."""
+        if self.embed is None:
+            return None
+
+        with self._lock:
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if entry.embedding is not None and self._is_full(entry)
+            ]
+        if not candidates:
+            return None
+
+        query = self._embed(message)
+        if query is None:
+            return None
+
+        matrix = np.stack([entry.embedding for _, entry in candidates])
+        similarities = matrix @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+
+        key, entry = candidates[best]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry
+
+    def _embed(self, message: str) -> Optional[np.ndarray]:
+        """Unit-normalized embedding, or None if embeddings are unavailable."""
+        if self.embed is None:
+            return None
+        try:
+            vector = np.asarray(self.embed(message), dtype=np.float32).reshape(-1)
+        except Exception as e:
+            logger.warning(f"Response cache embedding failed, using exact matching only: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _evict_expired(self) -> None:
+        """Drop entries older than the TTL (caller holds the lock)."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry.created_at < cutoff]
+        for key in expired:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and size for health checks."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "served_entries": sum(1 for entry in self._entries.values() if self._is_full(entry)),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _embed_with_verse_encoder(message: str) -> np.ndarray:
+    """Embed with the SentenceTransformer already loaded for verse search."""
+    from app.services.vector_search import get_vector_search_service
+    return get_vector_search_service().encode_query(message)
+
+
+# Singleton instance
+_casual_response_cache: Optional[ResponseCache] = None
+
+
+def get_casual_response_cache() -> Optional[ResponseCache]:
+    """Get or create the casual chat response cache (None when disabled)."""
+    global _casual_response_cache
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    if _casual_response_cache is None:
+        _casual_response_cache = ResponseCache(embed=_embed_with_verse_encoder)
+    return _casual_response_cache
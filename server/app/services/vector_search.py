@@ -1,9 +1,17 @@
 from sentence_transformers import SentenceTransformer
 import chromadb
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+import numpy as np
 import pandas as pd
 import logging
+import threading
 from pathlib import Path
+from app.core.config import settings
+from app.core.metrics import span
+from app.core.singleflight import SingleFlight
+from app.services.embedding_index import EmbeddingIndex
+from app.services.lexical_index import LexicalIndex
 
 logger = logging.getLogger(__name__)
 
@@ -56,13 +64,57 @@ class VectorSearchService:
         "surprise": ["acceptance", "adaptability", "learning"],
     }
     
-    def __init__(self, db_path: str = "./chroma_db"):
+    # Supported search backends
+    SEARCH_BACKENDS = ("chroma", "exact", "hybrid")
+    
+    def __init__(
+        self,
+        db_path: str = "./chroma_db",
+        backend: Optional[str] = None,
+        reduction: Optional[str] = None,
+        reduced_dim: Optional[int] = None,
+        quantization: Optional[str] = None,
+        rescore_candidates: Optional[int] = None
+    ):
         """
         Initialize the VectorSearchService with SentenceTransformer model and ChromaDB client.
         
         Args:
             db_path: Path to ChromaDB persistent storage
+            backend: Search backend ('chroma', 'exact', 'hybrid'), defaults to settings
+            reduction: In-memory index reduction ('none', 'truncate', 'pca'), defaults to settings
+            reduced_dim: Target dimensionality for reduction, defaults to settings
+            quantization: In-memory index quantization ('none', 'int8'), defaults to settings
+            rescore_candidates: Candidates rescored with full-precision vectors, defaults to settings
         """
+        self.backend = backend or settings.SEARCH_BACKEND
+        if self.backend not in self.SEARCH_BACKENDS:
+            raise ValueError(f"Invalid search backend: {self.backend}. Must be one of: {list(self.SEARCH_BACKENDS)}")
+        self.lexical_weight = settings.HYBRID_LEXICAL_WEIGHT
+        
+        # Compressed in-memory index settings (built lazily on first search)
+        self.reduction = reduction or settings.EMBEDDING_REDUCTION
+        self.reduced_dim = reduced_dim or settings.EMBEDDING_REDUCED_DIM
+        self.quantization = quantization or settings.EMBEDDING_QUANTIZATION
+        self.rescore_candidates = (
+            rescore_candidates if rescore_candidates is not None
+            else settings.EMBEDDING_RESCORE_CANDIDATES
+        )
+        if self.backend == "exact" and (self.reduction != "none" or self.quantization != "none"):
+            logger.info("Exact search ignores embedding compression and scores full-precision vectors")
+        self._index: Optional[EmbeddingIndex] = None
+        # Full-precision index for the exact backend when the main index is compressed
+        self._exact_index: Optional[EmbeddingIndex] = None
+        self._lexical_index: Optional[LexicalIndex] = None
+        
+        # Recent search results, served by cached_search() when /chat is degraded
+        self._recent_searches: "OrderedDict[Tuple[str, Optional[str], int], List[Dict]]" = OrderedDict()
+        self._recent_by_emotion: Dict[Optional[str], List[Dict]] = {}
+        self._recent_lock = threading.Lock()
+        
+        # Identical concurrent queries share one encoder call
+        self._encode_inflight = SingleFlight("embedding")
+        
         try:
             # Initialize SentenceTransformer model for embeddings
             self.encoder = SentenceTransformer('all-mpnet-base-v2')
@@ -140,6 +192,11 @@ class VectorSearchService:
             )
             
             logger.info(f"Successfully added {len(documents)} verses to ChromaDB")
+            
+            # Rebuild the in-memory indexes with the new verses on next search
+            self._index = None
+            self._exact_index = None
+            self._lexical_index = None
             return True
             
         except Exception as e:
@@ -150,7 +207,8 @@ class VectorSearchService:
         self,
         query: str,
         emotion: Optional[str] = None,
-        top_k: int = 5
+        top_k: int = 5,
+        backend: Optional[str] = None
     ) -> List[Dict]:
         """
         Search for relevant verses based on semantic similarity.
@@ -160,53 +218,258 @@ class VectorSearchService:
             query: User input text to search for
             emotion: Detected emotion for re-ranking (optional)
             top_k: Number of verses to return
+            backend: Override the configured search backend (optional)
             
         Returns:
             List of verse dictionaries with similarity scores
         """
         try:
             # Generate query embedding
-            query_embedding = self.encoder.encode([query])
+            with span("search.encode"):
+                query_embedding = self.encode_query(query)
             
-            # Search in ChromaDB
-            results = self.collection.query(
-                query_embeddings=query_embedding.tolist(),
-                n_results=top_k * 2 if emotion else top_k,  # Get more results if we'll re-rank
-                include=["metadatas", "distances"]
-            )
+            # Get more results if we'll re-rank
+            n_results = top_k * 2 if emotion else top_k
             
-            # Convert results to list of dictionaries
-            verses = []
-            for i in range(len(results['ids'][0])):
-                metadata = results['metadatas'][0][i]
-                distance = results['distances'][0][i]
-                similarity_score = 1 - distance  # Convert distance to similarity
-                
-                verse = {
-                    "id": metadata["id"],
-                    "chapter": metadata["chapter"],
-                    "verse": metadata["verse"],
-                    "shloka": metadata["shloka"],
-                    "transliteration": metadata["transliteration"],
-                    "eng_meaning": metadata["eng_meaning"],
-                    "hin_meaning": metadata["hin_meaning"],
-                    "word_meaning": metadata["word_meaning"],
-                    "themes": [],  # Empty list for compatibility
-                    "similarity_score": similarity_score
-                }
-                verses.append(verse)
+            with span("search.retrieve"):
+                if (backend or self.backend) == "hybrid":
+                    verses = self._search_hybrid(query, query_embedding, n_results)
+                else:
+                    verses = self._search_by_embedding(
+                        query_embedding,
+                        n_results=n_results,
+                        backend=backend
+                    )
             
             # Apply emotion-based re-ranking if emotion is provided
             if emotion:
-                verses = self._rerank_by_emotion(verses, emotion)
+                with span("search.rerank"):
+                    verses = self._rerank_by_emotion(verses, emotion)
             
             # Return top_k results
-            return verses[:top_k]
+            verses = verses[:top_k]
+            if backend is None and verses:
+                self._remember_search(query, emotion, top_k, verses)
+            return verses
             
         except Exception as e:
             logger.error(f"Failed to search verses: {e}")
             return []
     
+    def encode_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query, sharing the encoder call with identical concurrent queries.
+        
+        Args:
+            query: Text to embed
+            
+        Returns:
+            Embedding vector of shape (d,); shared with other callers, do not modify
+        """
+        return self._encode_inflight.do(query, lambda: self.encoder.encode([query])[0])
+    
+    def _remember_search(self, query: str, emotion: Optional[str], top_k: int, verses: List[Dict]) -> None:
+        """Keep a copy of a search result for cached_search()."""
+        key = (" ".join(query.lower().split()), emotion, top_k)
+        stored = [dict(verse) for verse in verses]
+        with self._recent_lock:
+            self._recent_searches[key] = stored
+            self._recent_searches.move_to_end(key)
+            while len(self._recent_searches) > settings.RETRIEVAL_CACHE_MAX_ENTRIES:
+                self._recent_searches.popitem(last=False)
+            self._recent_by_emotion[emotion] = stored
+    
+    def cached_search(self, query: str, emotion: Optional[str] = None, top_k: int = 5) -> List[Dict]:
+        """
+        Serve verses from recent searches without encoding the query.
+        
+        Returns the earlier result of the same query if there is one, otherwise
+        the latest result for the same emotion (or the latest emotion-less
+        result when no emotion is given).
+        
+        Args:
+            query: User input text
+            emotion: Detected emotion (optional)
+            top_k: Number of verses to return
+            
+        Returns:
+            List of verse dictionaries, empty if nothing suitable is cached
+        """
+        key = (" ".join(query.lower().split()), emotion, top_k)
+        with self._recent_lock:
+            verses = self._recent_searches.get(key) or self._recent_by_emotion.get(emotion) or []
+            return [dict(verse) for verse in verses[:top_k]]
+    
+    def _search_by_embedding(
+        self,
+        query_embedding,
+        n_results: int,
+        backend: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Find the nearest verses for a precomputed query embedding.
+        
+        Uses the in-memory index for the exact backend or when compression is
+        enabled, otherwise ChromaDB's HNSW index. The exact backend always
+        scores full-precision embeddings.
+        
+        Args:
+            query_embedding: Query vector from the SentenceTransformer encoder
+            n_results: Number of verses to return
+            backend: Override the configured search backend (optional)
+            
+        Returns:
+            List of verse dictionaries with similarity scores
+        """
+        index = self._get_index(backend)
+        if index is not None:
+            return self._search_index(index, query_embedding, n_results)
+        
+        # Search in ChromaDB
+        results = self.collection.query(
+            query_embeddings=[query_embedding.tolist()],
+            n_results=n_results,
+            include=["metadatas", "distances"]
+        )
+        
+        # Convert results to list of dictionaries
+        verses = []
+        for i in range(len(results['ids'][0])):
+            metadata = results['metadatas'][0][i]
+            distance = results['distances'][0][i]
+            similarity_score = 1 - distance  # Convert distance to similarity
+            verses.append(self._metadata_to_verse(metadata, similarity_score))
+        
+        return verses
+    
+    def _search_index(self, index: EmbeddingIndex, query_embedding, n_results: int) -> List[Dict]:
+        """
+        Search the compressed index and rescore top candidates with full-precision vectors.
+        
+        Full-precision embeddings stay on disk in ChromaDB and are only fetched
+        for the rescored candidates.
+        """
+        fetched: Dict[str, tuple] = {}
+        
+        def fetch_vectors(ids: List[str]):
+            results = self.collection.get(ids=ids, include=["embeddings", "metadatas"])
+            for i, verse_id in enumerate(results['ids']):
+                fetched[verse_id] = (results['embeddings'][i], results['metadatas'][i])
+            return [fetched[verse_id][0] for verse_id in ids]
+        
+        # Uncompressed float32 scores are already exact, so skip rescoring
+        compressed = index.reduction != "none" or index.quantization != "none"
+        ranked = index.search(
+            query_embedding,
+            top_k=n_results,
+            rescore_candidates=self.rescore_candidates if compressed else 0,
+            fetch_vectors=fetch_vectors if compressed else None
+        )
+        
+        # Metadata is already fetched for rescored candidates
+        missing = [verse_id for verse_id, _ in ranked if verse_id not in fetched]
+        if missing:
+            results = self.collection.get(ids=missing, include=["metadatas"])
+            for i, verse_id in enumerate(results['ids']):
+                fetched[verse_id] = (None, results['metadatas'][i])
+        
+        return [
+            self._metadata_to_verse(fetched[verse_id][1], score)
+            for verse_id, score in ranked
+            if verse_id in fetched
+        ]
+    
+    def _search_hybrid(self, query: str, query_embedding, n_results: int) -> List[Dict]:
+        """
+        Fuse dense similarity with BM25 keyword scores over all verses.
+        
+        The combined score is (1 - w) * cosine + w * normalized BM25, where w is
+        HYBRID_LEXICAL_WEIGHT, so it stays on the same scale as semantic scores.
+        """
+        index = self._get_index("hybrid")
+        if index is None:
+            return []
+        
+        dense_scores = index.score(query_embedding)
+        lexical_scores = self._lexical_index.score(query)
+        max_lexical = float(lexical_scores.max()) if len(lexical_scores) else 0.0
+        if max_lexical > 0:
+            lexical_scores = lexical_scores / max_lexical
+        
+        combined = (1 - self.lexical_weight) * dense_scores + self.lexical_weight * lexical_scores
+        n_results = min(n_results, len(combined))
+        top_idx = np.argpartition(-combined, n_results - 1)[:n_results]
+        top_idx = top_idx[np.argsort(-combined[top_idx])]
+        
+        top_ids = [index.ids[i] for i in top_idx]
+        results = self.collection.get(ids=top_ids, include=["metadatas"])
+        metadata_by_id = dict(zip(results['ids'], results['metadatas']))
+        
+        return [
+            self._metadata_to_verse(metadata_by_id[index.ids[i]], float(combined[i]))
+            for i in top_idx
+            if index.ids[i] in metadata_by_id
+        ]
+    
+    def _get_index(self, backend: Optional[str] = None) -> Optional[EmbeddingIndex]:
+        """
+        Get the in-memory embedding index, building it from ChromaDB on first use.
+        
+        The hybrid backend also builds the BM25 index over the same verses.
+        The exact backend gets an uncompressed index, built separately when
+        compression is enabled, so it stays the ground truth for benchmarks.
+        
+        Args:
+            backend: Override the configured search backend (optional)
+            
+        Returns:
+            EmbeddingIndex or None if ChromaDB should be queried directly
+            or the collection is empty
+        """
+        backend = backend or self.backend
+        compressed = self.reduction != "none" or self.quantization != "none"
+        if backend == "chroma" and not compressed:
+            return None
+        
+        if backend == "exact" and compressed:
+            if self._exact_index is None:
+                results = self.collection.get(include=["embeddings"])
+                if not results['ids']:
+                    return None
+                self._exact_index = EmbeddingIndex().build(results['ids'], results['embeddings'])
+            return self._exact_index
+        
+        if self._index is None or (backend == "hybrid" and self._lexical_index is None):
+            results = self.collection.get(include=["embeddings", "documents"])
+            if not results['ids']:
+                return None
+            
+            self._index = EmbeddingIndex(
+                reduction=self.reduction,
+                reduced_dim=self.reduced_dim,
+                quantization=self.quantization
+            ).build(results['ids'], results['embeddings'])
+            self._lexical_index = LexicalIndex().build(results['ids'], results['documents'])
+        
+        return self._index
+    
+    def _metadata_to_verse(self, metadata: Dict, similarity_score: Optional[float] = None) -> Dict:
+        """Convert ChromaDB verse metadata to the verse dictionary format."""
+        verse = {
+            "id": metadata["id"],
+            "chapter": metadata["chapter"],
+            "verse": metadata["verse"],
+            "shloka": metadata["shloka"],
+            "transliteration": metadata["transliteration"],
+            "eng_meaning": metadata["eng_meaning"],
+            "hin_meaning": metadata["hin_meaning"],
+            "word_meaning": metadata["word_meaning"],
+            "themes": []  # Empty list for compatibility
+        }
+        if similarity_score is not None:
+            verse["similarity_score"] = similarity_score
+        return verse
+    
     def get_verse_by_id(self, verse_id: str) -> Optional[Dict]:
         """
         Retrieve specific verse by ID.
@@ -224,18 +487,7 @@ class VectorSearchService:
             )
             
             if results['ids'] and len(results['ids']) > 0:
-                metadata = results['metadatas'][0]
-                return {
-                    "id": metadata["id"],
-                    "chapter": metadata["chapter"],
-                    "verse": metadata["verse"],
-                    "shloka": metadata["shloka"],
-                    "transliteration": metadata["transliteration"],
-                    "eng_meaning": metadata["eng_meaning"],
-                    "hin_meaning": metadata["hin_meaning"],
-                    "word_meaning": metadata["word_meaning"],
-                    "themes": []  # Empty list for compatibility
-                }
+                return self._metadata_to_verse(results['metadatas'][0])
             
             return None
             
@@ -311,4 +563,29 @@ class VectorSearchService:
             
         except Exception as e:
             logger.error(f"Failed to get random verse: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+# Singleton instance shared by the chat and verse routers and the response cache
+_vector_search_service: Optional[VectorSearchService] = None
+
+
+def get_vector_search_service() -> VectorSearchService:
+    """
+    Get or create the singleton vector search service.
+    
+    Loads verses from Bhagwad_Gita.csv on first use if the collection is empty.
+    
+    Raises:
+        Exception: If the encoder or ChromaDB client cannot be initialized
+    """
+    global _vector_search_service
+    if _vector_search_service is None:
+        service = VectorSearchService()
+        # Initialize database if CSV file exists
+        try:
+            service.initialize_database("Bhagwad_Gita.csv")
+        except Exception as e:
+            logger.warning(f"Could not initialize database from CSV: {e}")
+        _vector_search_service = service
+    return _vector_search_service
@@ -0,0 +1,170 @@
+"""
+Pre-serialized verse and chapter responses.
+
+Verse text never changes while the server runs, so a verse or chapter
+response is serialized once (orjson) and compressed once (gzip, and brotli
+when the `brotli` package is installed) at the highest level. Later lookups
+pick the variant the client accepts and send the stored bytes; an unchanged
+ETag gets 304 without a body.
+
+The cache is per process and bounded in LRU order. Only successful lookups
+are stored, so a verse missing from one source is retried on the next request.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import gzip
+import hashlib
+import threading
+
+import orjson
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only without it
+    brotli = None
+
+# Encodings in order of preference when the client accepts several
+_PREFERRED_ENCODINGS = ("br", "gzip")
+
+
+class EncodedPayload:
+    """One JSON response body in every supported content encoding."""
+
+    __slots__ = ("identity", "gzip", "br", "etag")
+
+    def __init__(self, content: Any):
+        self.identity = orjson.dumps(content)
+        self.gzip = gzip.compress(self.identity, compresslevel=9)
+        self.br = brotli.compress(self.identity, quality=11) if brotli is not None else None
+        self.etag = f'"{hashlib.blake2b(self.identity, digest_size=16).hexdigest()}"'
+
+    def body(self, encoding: Optional[str]) -> bytes:
+        """Body for a content encoding ("br", "gzip" or None for identity)."""
+        if encoding == "br":
+            return self.br
+        if encoding == "gzip":
+            return self.gzip
+        return self.identity
+
+    def size(self) -> int:
+        return len(self.identity) + len(self.gzip) + len(self.br or b"")
+
+
+def _accepted_encodings(header: str) -> set:
+    """Codings of an Accept-Encoding header that are not refused with q=0."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def payload_response(request: Request, payload: EncodedPayload) -> Response:
+    """
+    Serve a payload in the best encoding the client accepts.
+
+    Args:
+        request: Incoming request (Accept-Encoding, If-None-Match)
+        payload: Pre-serialized response
+
+    Returns:
+        200 with the stored bytes, or 304 if the client has this version
+    """
+    headers = {
+        "ETag": payload.etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": f"public, max-age={settings.VERSE_PAYLOAD_MAX_AGE_SECONDS}",
+    }
+    if payload.etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    encoding = next(
+        (coding for coding in _PREFERRED_ENCODINGS if coding in accepted and payload.body(coding) is not None),
+        None
+    )
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=payload.body(encoding), media_type="application/json", headers=headers)
+
+
+class VersePayloadCache:
+    """Bounded cache of encoded verse and chapter responses in LRU order."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Args:
+            max_entries: Maximum number of cached responses
+        """
+        self.max_entries = max_entries or settings.VERSE_PAYLOAD_CACHE_MAX_ENTRIES
+        self._entries: "OrderedDict[Hashable, EncodedPayload]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[EncodedPayload]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: Hashable, content: Any) -> EncodedPayload:
+        """
+        Serialize and compress a response body and store it.
+
+        Args:
+            key: Cache key, e.g. ("verse", "BG2.47") or ("chapter", 2)
+            content: JSON-compatible response body
+
+        Returns:
+            The encoded payload
+        """
+        payload = EncodedPayload(content)
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def stats(self) -> Dict:
+        """Cache size and hit counters for health checks."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(payload.size() for payload in self._entries.values()),
+                "brotli": brotli is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+_verse_payload_cache: Optional[VersePayloadCache] = None
+
+
+def get_verse_payload_cache() -> Optional[VersePayloadCache]:
+    """Get or create the singleton payload cache, or None when it is disabled."""
+    global _verse_payload_cache
+    if not settings.VERSE_PAYLOAD_CACHE_ENABLED:
+        return None
+    if _verse_payload_cache is None:
+        _verse_payload_cache = VersePayloadCache()
+    return _verse_payload_cache
@@ -0,0 +1,20 @@
+-- Atomic message sequencing
+-- Migration: 002_atomic_message_sequence.sql
+--
+-- ConversationManager now reserves sequence numbers by incrementing
+-- conversation_sessions.message_count with UPDATE ... RETURNING, so the
+-- application owns the counter. The trigger from 001 incremented it a second
+-- time for every insert (double-counting), so it is dropped and the counter
+-- is resynchronized with the stored messages.
+
+DROP TRIGGER IF EXISTS trigger_update_message_count ON conversation_messages;
+DROP FUNCTION IF EXISTS update_session_message_count();
+
+-- message_count is the last allocated sequence number of the session
+UPDATE conversation_sessions s
+SET message_count = COALESCE(
+    (SELECT MAX(m.sequence_number) FROM conversation_messages m WHERE m.session_id = s.id),
+    0
+);
+
+ALTER TABLE conversation_sessions ALTER COLUMN message_count SET NOT NULL;
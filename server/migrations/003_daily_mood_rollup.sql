@@ -0,0 +1,24 @@
+-- Daily mood rollup
+-- Migration: 003_daily_mood_rollup.sql
+--
+-- One row per user and day, maintained by LoggingService.log_interaction in
+-- the same transaction as the emotion log. The mood calendar and emotion
+-- stats read these rows instead of scanning every emotion_logs row in range.
+-- Populate it for existing logs with: python -m scripts.backfill_mood_rollup
+
+CREATE TABLE daily_mood_rollup (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    log_date DATE NOT NULL,
+    dominant_emotion VARCHAR(50) NOT NULL, -- Emotion of the day's most recent log
+    emotion_confidence FLOAT NOT NULL,
+    emotion_emoji VARCHAR(10) NOT NULL,
+    emotion_color VARCHAR(20) NOT NULL,
+    all_emotions JSONB,
+    summary TEXT NOT NULL, -- First 100 characters of the most recent input
+    emotion_counts JSONB NOT NULL DEFAULT '{}', -- {emotion: interactions}
+    interaction_count INTEGER NOT NULL DEFAULT 0,
+    verse_ids TEXT[], -- Union of verse IDs shown that day
+    last_logged_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, log_date)
+);
@@ -0,0 +1,78 @@
+"""
+Rebuild the daily_mood_rollup table from emotion_logs.
+
+New logs update the rollup as they are written (LoggingService.log_interaction);
+this populates it for logs stored before the table existed, or repairs it.
+Each user's rollup rows are deleted and re-folded from their logs in one
+transaction, so the command is safe to re-run.
+
+Usage (from the server directory):
+    python -m scripts.backfill_mood_rollup
+    python -m scripts.backfill_mood_rollup --user-id 6f1c0d6e-8a0b-4a52-9d7e-1f2a3b4c5d6e
+"""
+import argparse
+import logging
+import uuid
+from typing import List, Optional
+
+from app.db.database import SessionLocal, create_tables
+from app.models.emotion_log import EmotionLog
+from app.models.mood_rollup import DailyMoodRollup
+from app.models.user import User
+from app.services.logging_service import apply_log_to_rollup
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_user(db, user_id: uuid.UUID) -> int:
+    """Recompute one user's rollup rows; returns the number of days written."""
+    db.query(DailyMoodRollup).filter(DailyMoodRollup.user_id == user_id).delete(synchronize_session=False)
+
+    rollups = {}
+    logs = db.query(EmotionLog).filter(
+        EmotionLog.user_id == user_id,
+        EmotionLog.created_at.isnot(None)
+    ).order_by(EmotionLog.created_at).yield_per(1000)
+    for log in logs:
+        rollup = rollups.get(log.log_date)
+        if rollup is None:
+            rollup = rollups[log.log_date] = DailyMoodRollup(user_id=user_id, log_date=log.log_date)
+        apply_log_to_rollup(rollup, log)
+
+    db.add_all(rollups.values())
+    db.commit()
+    return len(rollups)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild daily mood rollups from emotion logs")
+    parser.add_argument("--user-id", type=uuid.UUID, help="Only rebuild this user's rollups")
+    args = parser.parse_args(argv)
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        if args.user_id:
+            user_ids = [args.user_id]
+        else:
+            user_ids = [user_id for (user_id,) in db.query(User.id)]
+
+        total_days = 0
+        for user_id in user_ids:
+            try:
+                days = backfill_user(db, user_id)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to backfill rollups for user {user_id}: {e}")
+                continue
+            total_days += days
+            logger.info(f"User {user_id}: {days} days")
+
+        print(f"Rebuilt {total_days} daily rollups for {len(user_ids)} users")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
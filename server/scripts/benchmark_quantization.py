@@ -0,0 +1,189 @@
+"""
+Benchmark for verse index compression (dimensionality reduction + int8).
+
+Compares each EmbeddingIndex configuration against exact float32 search and
+reports memory per vector, queries per second and recall loss.
+
+Usage (from the server directory):
+    python -m scripts.benchmark_quantization
+    python -m scripts.benchmark_quantization --synthetic-size 50000 --top-k 5
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_index import EmbeddingIndex
+from app.services.vector_search import VectorSearchService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Representative user prompts used as benchmark queries
+BENCHMARK_QUERIES = [
+    "I'm feeling overwhelmed with all my responsibilities at work and home.",
+    "I am anxious about my exam results and can't sleep.",
+    "How do I stop worrying about the outcome of my efforts?",
+    "My father passed away and I can't stop grieving.",
+    "I feel angry at my friend for betraying me.",
+    "What does Krishna say about dharma?",
+    "What is the meaning of karma yoga?",
+    "How can I control my restless mind during meditation?",
+    "I feel guilty about the mistakes I made in the past.",
+    "Is it wrong to desire success and wealth?",
+    "What happens to the soul after death?",
+    "I don't know what my purpose in life is.",
+    "How do I stay calm when people criticize me?",
+    "I am jealous of my colleague's promotion.",
+    "What is true devotion according to the Gita?",
+    "I feel lonely even when surrounded by people.",
+]
+
+# (reduction, reduced_dim, quantization) configurations to compare
+DEFAULT_CONFIGS = [
+    ("none", None, "none"),
+    ("none", None, "int8"),
+    ("truncate", 384, "none"),
+    ("truncate", 384, "int8"),
+    ("truncate", 256, "int8"),
+    ("pca", 256, "none"),
+    ("pca", 256, "int8"),
+    ("pca", 128, "int8"),
+]
+
+
+def _recall(approx: List[str], exact: List[str]) -> float:
+    """Fraction of the exact top-k ids present in the approximate top-k."""
+    if not exact:
+        return 1.0
+    return len(set(approx) & set(exact)) / len(exact)
+
+
+def _synthetic_corpus(embeddings: np.ndarray, size: int, seed: int) -> np.ndarray:
+    """Grow the corpus to `size` vectors by jittering real verse embeddings."""
+    rng = np.random.default_rng(seed)
+    base = embeddings[rng.integers(0, len(embeddings), size)]
+    noise = rng.normal(0, 0.05, base.shape).astype(np.float32)
+    return base + noise
+
+
+def run_benchmark(
+    ids: List[str],
+    embeddings: np.ndarray,
+    query_embeddings: np.ndarray,
+    top_k: int,
+    rescore_candidates: int,
+    configs=DEFAULT_CONFIGS,
+    repeats: int = 5
+) -> Dict:
+    """
+    Benchmark each index configuration against exact float32 search.
+
+    Rescoring fetches full-precision vectors from an in-memory float32 store,
+    standing in for the ChromaDB lookup used by VectorSearchService.
+
+    Returns:
+        Dict with corpus details and one result row per configuration
+    """
+    exact_index = EmbeddingIndex().build(ids, embeddings)
+    exact_results = [
+        [verse_id for verse_id, _ in exact_index.search(q, top_k)]
+        for q in query_embeddings
+    ]
+
+    row_of = {verse_id: i for i, verse_id in enumerate(ids)}
+    full_vectors = np.asarray(embeddings, dtype=np.float32)
+
+    def fetch_vectors(candidate_ids: List[str]) -> np.ndarray:
+        return full_vectors[[row_of[verse_id] for verse_id in candidate_ids]]
+
+    rows = []
+    for reduction, reduced_dim, quantization in configs:
+        index = EmbeddingIndex(reduction, reduced_dim, quantization).build(ids, embeddings)
+
+        for rescore in sorted({0, rescore_candidates}):
+            fetch = fetch_vectors if rescore else None
+            recalls = []
+            start = time.perf_counter()
+            for _ in range(repeats):
+                for q, exact in zip(query_embeddings, exact_results):
+                    approx = index.search(q, top_k, rescore_candidates=rescore, fetch_vectors=fetch)
+                    recalls.append(_recall([verse_id for verse_id, _ in approx], exact))
+            elapsed = time.perf_counter() - start
+
+            rows.append({
+                "reduction": reduction,
+                "reduced_dim": index.dim,
+                "quantization": quantization,
+                "rescore_candidates": rescore,
+                "bytes_per_vector": round(index.bytes_per_vector, 1),
+                "index_bytes": index.memory_bytes,
+                "qps": round(repeats * len(query_embeddings) / elapsed, 1),
+                f"recall@{top_k}": round(float(np.mean(recalls)), 4),
+                "recall_loss": round(1.0 - float(np.mean(recalls)), 4),
+            })
+
+    return {
+        "corpus_size": len(ids),
+        "embedding_dim": int(np.asarray(embeddings).shape[1]),
+        "queries": len(query_embeddings),
+        "top_k": top_k,
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark verse index compression")
+    parser.add_argument("--db-path", default=settings.CHROMA_DB_PATH, help="ChromaDB path")
+    parser.add_argument("--csv-path", default="Bhagwad_Gita.csv", help="Verse CSV used if the collection is empty")
+    parser.add_argument("--top-k", type=int, default=5, help="Results per query")
+    parser.add_argument("--rescore", type=int, default=settings.EMBEDDING_RESCORE_CANDIDATES,
+                        help="Candidates rescored with float vectors")
+    parser.add_argument("--synthetic-size", type=int, default=0,
+                        help="Grow the corpus to this size with jittered copies (simulates commentary chunks)")
+    parser.add_argument("--repeats", type=int, default=5, help="Passes over the query set")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    service = VectorSearchService(db_path=args.db_path)
+    service.initialize_database(args.csv_path)
+
+    results = service.collection.get(include=["embeddings"])
+    ids = list(results["ids"])
+    embeddings = np.asarray(results["embeddings"], dtype=np.float32)
+
+    if args.synthetic_size > len(ids):
+        embeddings = _synthetic_corpus(embeddings, args.synthetic_size, args.seed)
+        ids = [f"synthetic-{i}" for i in range(len(embeddings))]
+
+    query_embeddings = service.encoder.encode(BENCHMARK_QUERIES)
+    report = run_benchmark(
+        ids, embeddings, query_embeddings,
+        top_k=args.top_k,
+        rescore_candidates=args.rescore,
+        repeats=args.repeats
+    )
+
+    recall_key = f"recall@{args.top_k}"
+    print(f"\nCorpus: {report['corpus_size']} vectors x {report['embedding_dim']} dims, "
+          f"{report['queries']} queries, top_k={args.top_k}\n")
+    print(f"{'reduction':<10}{'dim':>6}{'quant':>7}{'rescore':>9}{'B/vec':>9}{'QPS':>10}{recall_key:>12}")
+    for row in report["results"]:
+        print(f"{row['reduction']:<10}{row['reduced_dim']:>6}{row['quantization']:>7}"
+              f"{row['rescore_candidates']:>9}{row['bytes_per_vector']:>9.0f}"
+              f"{row['qps']:>10.1f}{row[recall_key]:>12.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Wrote results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
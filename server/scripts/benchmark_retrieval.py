@@ -0,0 +1,181 @@
+"""
+Offline retrieval quality and latency benchmark for VectorSearchService.
+
+Runs a fixed labelled query set (scripts/data/retrieval_queries.json) through
+search_verses for each backend and reports recall@k, MRR, latency percentiles
+and QPS. Results are written as JSON so runs can be diffed between releases.
+
+Usage (from the server directory):
+    python -m scripts.benchmark_retrieval
+    python -m scripts.benchmark_retrieval --backends exact hybrid --top-k 3 --output before.json
+"""
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.vector_search import VectorSearchService
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_SET = Path(__file__).parent / "data" / "retrieval_queries.json"
+
+
+def recall_at_k(retrieved: List[str], relevant: List[str]) -> float:
+    """Fraction of the relevant verses found in the retrieved list."""
+    if not relevant:
+        return 0.0
+    return len(set(retrieved) & set(relevant)) / len(relevant)
+
+
+def reciprocal_rank(retrieved: List[str], relevant: List[str]) -> float:
+    """1 / rank of the first relevant verse, 0 if none was retrieved."""
+    relevant_set = set(relevant)
+    for rank, verse_id in enumerate(retrieved, 1):
+        if verse_id in relevant_set:
+            return 1.0 / rank
+    return 0.0
+
+
+def _percentiles(latencies_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(latencies_ms)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "mean": round(float(values.mean()), 3),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def benchmark_backend(
+    service: VectorSearchService,
+    backend: str,
+    queries: List[Dict],
+    top_k: int,
+    repeats: int,
+    use_emotion: bool
+) -> Dict:
+    """
+    Run the labelled query set against one backend.
+
+    Quality metrics use the first pass; latency covers every pass.
+    """
+    # Warm up lazily-built indexes so they don't skew latency
+    service.search_verses("warm up", top_k=top_k, backend=backend)
+
+    per_query = []
+    latencies_ms = []
+    started = time.perf_counter()
+
+    for repeat in range(repeats):
+        for item in queries:
+            emotion = item.get("emotion") if use_emotion else None
+            t0 = time.perf_counter()
+            verses = service.search_verses(item["query"], emotion=emotion, top_k=top_k, backend=backend)
+            latencies_ms.append((time.perf_counter() - t0) * 1000)
+
+            if repeat == 0:
+                retrieved = [verse["id"] for verse in verses]
+                per_query.append({
+                    "id": item["id"],
+                    "category": item.get("category"),
+                    "retrieved": retrieved,
+                    "recall": round(recall_at_k(retrieved, item["relevant"]), 4),
+                    "reciprocal_rank": round(reciprocal_rank(retrieved, item["relevant"]), 4),
+                })
+
+    elapsed = time.perf_counter() - started
+
+    def _mean(key: str, category: Optional[str] = None) -> float:
+        values = [q[key] for q in per_query if category is None or q["category"] == category]
+        return round(float(np.mean(values)), 4) if values else 0.0
+
+    return {
+        "backend": backend,
+        f"recall@{top_k}": _mean("recall"),
+        "mrr": _mean("reciprocal_rank"),
+        "by_category": {
+            category: {f"recall@{top_k}": _mean("recall", category), "mrr": _mean("reciprocal_rank", category)}
+            for category in sorted({q["category"] for q in per_query if q["category"]})
+        },
+        "latency_ms": _percentiles(latencies_ms),
+        "qps": round(len(latencies_ms) / elapsed, 2),
+        "queries": per_query,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark verse retrieval quality and latency")
+    parser.add_argument("--backends", nargs="+", default=list(VectorSearchService.SEARCH_BACKENDS),
+                        choices=VectorSearchService.SEARCH_BACKENDS)
+    parser.add_argument("--query-set", default=str(DEFAULT_QUERY_SET), help="Labelled query set JSON")
+    parser.add_argument("--db-path", default=settings.CHROMA_DB_PATH, help="ChromaDB path")
+    parser.add_argument("--csv-path", default="Bhagwad_Gita.csv", help="Verse CSV used if the collection is empty")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=5, help="Passes over the query set for latency")
+    parser.add_argument("--with-emotion", action="store_true", help="Pass labelled emotions for re-ranking")
+    parser.add_argument("--output", default="retrieval_benchmark.json", help="JSON results path")
+    args = parser.parse_args(argv)
+
+    with open(args.query_set) as f:
+        query_set = json.load(f)
+    queries = query_set["queries"]
+
+    service = VectorSearchService(db_path=args.db_path)
+    service.initialize_database(args.csv_path)
+
+    results = [
+        benchmark_backend(service, backend, queries, args.top_k, args.repeats, args.with_emotion)
+        for backend in args.backends
+    ]
+
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "query_set": {"path": args.query_set, "version": query_set.get("version"), "size": len(queries)},
+        "config": {
+            "top_k": args.top_k,
+            "repeats": args.repeats,
+            "with_emotion": args.with_emotion,
+            "embedding_model": settings.EMBEDDING_MODEL,
+            "hybrid_lexical_weight": settings.HYBRID_LEXICAL_WEIGHT,
+            "embedding_reduction": service.reduction,
+            "embedding_quantization": service.quantization,
+            "verse_count": service.collection.count(),
+        },
+        "results": results,
+    }
+
+    recall_key = f"recall@{args.top_k}"
+    print(f"\n{'backend':<8}{recall_key:>11}{'MRR':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'QPS':>9}")
+    for row in results:
+        latency = row["latency_ms"]
+        print(f"{row['backend']:<8}{row[recall_key]:>11.3f}{row['mrr']:>8.3f}"
+              f"{latency['p50']:>9.2f}{latency['p95']:>9.2f}{latency['p99']:>9.2f}{row['qps']:>9.1f}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nWrote results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Check LoggingService.get_emotion_stats against a reference implementation.
+
+get_emotion_stats computes its aggregates in SQL over daily_mood_rollup.
+This script recomputes the same statistics in Python directly from the
+emotion_logs rows (the original implementation) and reports every user and
+time range whose results differ. Ties for a weekday's most common emotion
+may be broken differently, so only the winning count is compared there.
+
+Usage (from the server directory):
+    python -m scripts.verify_emotion_stats
+    python -m scripts.verify_emotion_stats --user-id 6f1c0d6e-8a0b-4a52-9d7e-1f2a3b4c5d6e --time-ranges week
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import uuid
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, select
+
+from app.db.async_database import AsyncSessionLocal, async_engine
+from app.models.emotion_log import EmotionLog
+from app.models.user import User
+from app.services.logging_service import LoggingService
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+TIME_RANGES = ["week", "month", "quarter"]
+
+
+def reference_emotion_stats(
+    emotion_logs: List[EmotionLog],
+    time_range: str,
+    start_date: date,
+    end_date: date
+) -> Dict[str, Any]:
+    """Emotion statistics computed in Python from individual emotion logs."""
+    if not emotion_logs:
+        return {
+            "emotion_counts": {},
+            "total_interactions": 0,
+            "time_range": time_range,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "weekly_trends": [],
+            "daily_averages": {}
+        }
+
+    emotion_counts = Counter(log.dominant_emotion for log in emotion_logs)
+
+    weekly_trends = []
+    current_date = start_date
+    while current_date <= end_date:
+        week_end = min(current_date + timedelta(days=6), end_date)
+        week_logs = [log for log in emotion_logs if current_date <= log.log_date <= week_end]
+        weekly_trends.append({
+            "week_start": current_date.isoformat(),
+            "week_end": week_end.isoformat(),
+            "emotions": dict(Counter(log.dominant_emotion for log in week_logs)),
+            "total_interactions": len(week_logs)
+        })
+        current_date = week_end + timedelta(days=1)
+
+    daily_emotions = defaultdict(list)
+    for log in emotion_logs:
+        daily_emotions[log.log_date.strftime('%A')].append(log.dominant_emotion)
+
+    daily_averages = {}
+    for day, emotions in daily_emotions.items():
+        most_common = Counter(emotions).most_common(1)
+        daily_averages[day] = {
+            "most_common_emotion": most_common[0][0],
+            "count": most_common[0][1],
+            "total_interactions": len(emotions)
+        }
+
+    return {
+        "emotion_counts": dict(emotion_counts),
+        "total_interactions": len(emotion_logs),
+        "time_range": time_range,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "weekly_trends": weekly_trends,
+        "daily_averages": daily_averages
+    }
+
+
+def compare_stats(expected: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    """Differences between two stats results, as readable messages."""
+    differences = [
+        f"{key}: expected {expected[key]!r}, got {actual.get(key)!r}"
+        for key in ("emotion_counts", "total_interactions", "start_date", "end_date", "weekly_trends")
+        if expected[key] != actual.get(key)
+    ]
+
+    actual_days = actual.get("daily_averages", {})
+    if set(expected["daily_averages"]) != set(actual_days):
+        differences.append(f"daily_averages days: expected {sorted(expected['daily_averages'])}, got {sorted(actual_days)}")
+    for day, expected_day in expected["daily_averages"].items():
+        actual_day = actual_days.get(day)
+        if actual_day is None:
+            continue
+        if (expected_day["count"], expected_day["total_interactions"]) != (actual_day["count"], actual_day["total_interactions"]):
+            differences.append(f"daily_averages[{day}]: expected {expected_day!r}, got {actual_day!r}")
+    return differences
+
+
+async def verify_user(user_id: uuid.UUID, time_ranges: List[str]) -> int:
+    """Compare both implementations for one user; returns the number of mismatching ranges."""
+    mismatches = 0
+    async with AsyncSessionLocal() as db:
+        service = LoggingService(db)
+        for time_range in time_ranges:
+            actual = await service.get_emotion_stats(user_id, time_range)
+            start_date = date.fromisoformat(actual["start_date"])
+            end_date = date.fromisoformat(actual["end_date"])
+            emotion_logs = (await db.scalars(
+                select(EmotionLog).where(
+                    and_(
+                        EmotionLog.user_id == user_id,
+                        EmotionLog.log_date >= start_date,
+                        EmotionLog.log_date <= end_date
+                    )
+                )
+            )).all()
+
+            differences = compare_stats(
+                reference_emotion_stats(emotion_logs, time_range, start_date, end_date), actual
+            )
+            if differences:
+                mismatches += 1
+                print(f"MISMATCH user {user_id} ({time_range}):")
+                for difference in differences:
+                    print(f"  {difference}")
+    return mismatches
+
+
+async def run(args) -> int:
+    try:
+        if args.user_id:
+            user_ids = [args.user_id]
+        else:
+            async with AsyncSessionLocal() as db:
+                user_ids = list(await db.scalars(select(User.id)))
+
+        mismatches = 0
+        for user_id in user_ids:
+            mismatches += await verify_user(user_id, args.time_ranges)
+    finally:
+        await async_engine.dispose()
+
+    print(f"Checked {len(user_ids)} users x {len(args.time_ranges)} time ranges: {mismatches} mismatches")
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Verify SQL emotion stats against the Python reference")
+    parser.add_argument("--user-id", type=uuid.UUID, help="Only check this user")
+    parser.add_argument("--time-ranges", nargs="+", choices=TIME_RANGES, default=TIME_RANGES)
+    args = parser.parse_args(argv)
+
+    if asyncio.run(run(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Shared test setup.
+
+Tests run against a throwaway SQLite database, so DATABASE_URL is pointed at
+a temporary file before any app module creates its engines.
+"""
+import os
+import sys
+import tempfile
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+_DB_DIR = tempfile.mkdtemp(prefix="geetamanthan-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
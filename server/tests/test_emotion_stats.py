@@ -0,0 +1,83 @@
+"""
+LoggingService.get_emotion_stats (SQL over daily_mood_rollup) against the
+Python reference in scripts/verify_emotion_stats.py.
+"""
+import asyncio
+import random
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import and_, select
+
+from app.db.async_database import AsyncSessionLocal, async_engine
+from app.db.database import SessionLocal, create_tables
+from app.models.emotion_log import EmotionLog
+from app.models.user import User
+from app.services.logging_service import LoggingService
+from scripts.verify_emotion_stats import TIME_RANGES, compare_stats, reference_emotion_stats
+
+EMOTIONS = ["sadness", "nervousness", "joy", "gratitude", "confusion", "neutral"]
+
+
+async def _seed_logs(user_id: uuid.UUID) -> None:
+    """Log interactions over the last 100 days, several per day, including range boundaries."""
+    rng = random.Random(42)
+    today = date.today()
+    days = sorted(set(rng.sample(range(100), 60)) | {0, 7, 8, 30, 31, 90, 91})
+    try:
+        async with AsyncSessionLocal() as db:
+            service = LoggingService(db)
+            for days_ago in days:
+                for _ in range(rng.randint(1, 4)):
+                    await service.log_interaction(
+                        user_id=user_id,
+                        user_input="test message",
+                        emotion_data={"dominant": {"label": rng.choice(EMOTIONS), "confidence": 0.8}},
+                        verse_ids=["BG2.47"],
+                        log_date=today - timedelta(days=days_ago)
+                    )
+    finally:
+        await async_engine.dispose()
+
+
+async def _differences(user_id: uuid.UUID, time_range: str):
+    try:
+        async with AsyncSessionLocal() as db:
+            actual = await LoggingService(db).get_emotion_stats(user_id, time_range)
+            start_date = date.fromisoformat(actual["start_date"])
+            end_date = date.fromisoformat(actual["end_date"])
+            emotion_logs = (await db.scalars(
+                select(EmotionLog).where(
+                    and_(
+                        EmotionLog.user_id == user_id,
+                        EmotionLog.log_date >= start_date,
+                        EmotionLog.log_date <= end_date
+                    )
+                )
+            )).all()
+            expected = reference_emotion_stats(emotion_logs, time_range, start_date, end_date)
+            assert expected["total_interactions"] > 0
+            return compare_stats(expected, actual)
+    finally:
+        await async_engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def user_id() -> uuid.UUID:
+    create_tables()
+    db = SessionLocal()
+    try:
+        user = User(firebase_uid=f"stats-{uuid.uuid4()}", email="stats@test.local", preferences={})
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    finally:
+        db.close()
+    asyncio.run(_seed_logs(user_id))
+    return user_id
+
+
+@pytest.mark.parametrize("time_range", TIME_RANGES)
+def test_emotion_stats_match_reference(user_id: uuid.UUID, time_range: str):
+    assert asyncio.run(_differences(user_id, time_range)) == []